@@ -0,0 +1,285 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from modelo import Ecosistema, Planta, Triceratops, TRexJugador, WORLD_PX_W, WORLD_PX_H
+from simulador import SimuladorSinPantalla
+
+"""
+BENCHMARK DEL NÚCLEO DE SIMULACIÓN
+Mide el tiempo por tick de cada fase (Ecosistema.paso, _actualizar_ia,
+_resolver_colisiones, agregar_planta_dispersada, limpiar_muertos) en mundos
+sembrados de distintos tamaños y estima su curva de crecimiento, para detectar
+regresiones cuadráticas. Resultados en JSON con --json.
+Con --memoria informa además de los bytes por entidad (animal y planta).
+Con --render mide también el render de la vista (sin ventana) por cada 1000
+entidades, enviando los sprites uno a uno y por lotes con Surface.blits().
+Uso: python -m benchmark --ticks 20 --json bench.json
+"""
+
+# (animales, plantas) por defecto
+TAMANOS = [(32, 60), (256, 500), (2000, 5000), (20000, 50000)]
+
+# Población de referencia del juego (mundo de WORLD_PX_W x WORLD_PX_H)
+BASE_ANIMALES = 32
+BASE_PLANTAS = 60
+
+FASES = ['paso', 'actualizar_ia', 'resolver_colisiones', 'agregar_planta_dispersada', 'limpiar_muertos']
+
+def _tamanos(texto: str):
+    res = []
+    for parte in texto.split(','):
+        animales, _, plantas = parte.partition(':')
+        res.append((int(animales), int(plantas) if plantas else int(animales) * 2))
+    return res
+
+def crear_mundo(animales: int, plantas: int, seed: int, ia_por_lotes: bool = False):
+    """Simulador con un mundo escalado para mantener la densidad del juego."""
+    escala = math.sqrt(max(1.0, animales / BASE_ANIMALES, plantas / BASE_PLANTAS))
+    sim = SimuladorSinPantalla(seed, ia_por_lotes=ia_por_lotes)
+    eco = Ecosistema(int(WORLD_PX_W * escala), int(WORLD_PX_H * escala))
+    sim.juego.ecosistema = eco
+    eco.max_animales = animales
+    eco.limites_especie = {nombre: animales for nombre in eco.especie_clase}
+    eco.min_plantas = plantas
+    eco.max_plantas = plantas
+    rnd = random.Random(seed)
+    for i in range(plantas):
+        eco.agregar_planta(Planta(f"Helecho_{i+1}", rnd.randint(0, eco.width), rnd.randint(0, eco.height)))
+    eco.agregar_animal(TRexJugador(eco.width // 2, eco.height // 2))
+    clases = list(eco.especie_clase.values())
+    for _ in range(animales - 1):
+        clase = rnd.choice(clases)
+        eco.agregar_animal(clase(rnd.randint(0, eco.width), rnd.randint(0, eco.height)))
+    return sim
+
+def _medir(fn):
+    t = time.perf_counter()
+    fn()
+    return time.perf_counter() - t
+
+def medir_tamano(animales: int, plantas: int, ticks: int, seed: int, calentamiento: int = 2,
+                 ia_por_lotes: bool = False) -> dict:
+    """Tiempos por tick (segundos) de cada fase para una población."""
+    sim = crear_mundo(animales, plantas, seed, ia_por_lotes)
+    juego = sim.juego
+    eco = juego.ecosistema
+    rnd = random.Random(seed + 1)
+    tiempos = {fase: [] for fase in FASES}
+    for tick in range(calentamiento + ticks):
+        medidas = {
+            'paso': _medir(eco.paso),
+            'actualizar_ia': _medir(juego._actualizar_ia),
+            'resolver_colisiones': _medir(juego._resolver_colisiones),
+        }
+
+        # Inserción de plantas: una colocación con los parámetros de paso(); se deshace después
+        medidas['agregar_planta_dispersada'] = _medir(
+            lambda: eco.agregar_planta_dispersada("Helecho", attempts=60, min_dist=55))
+        sobrantes = eco.plantas[plantas:]
+        for p in sobrantes:
+            p.ser_comida()
+            eco.marcar_planta_para_remover(p)
+        eco.limpiar_muertos()
+
+        # Limpieza: muere el 1% de animales y plantas; se reponen después
+        muertos = rnd.sample(eco.animales[1:], max(1, len(eco.animales) // 100)) if len(eco.animales) > 1 else []
+        for a in muertos:
+            a.morir()
+            eco.marcar_para_remover(a)
+        comidas = rnd.sample(eco.plantas, max(1, len(eco.plantas) // 100)) if eco.plantas else []
+        for p in comidas:
+            p.ser_comida()
+            eco.marcar_planta_para_remover(p)
+        medidas['limpiar_muertos'] = _medir(eco.limpiar_muertos)
+        for a in muertos:
+            eco.agregar_animal(eco.especie_clase[type(a).__name__](rnd.randint(0, eco.width), rnd.randint(0, eco.height)))
+        for _ in comidas:
+            eco.agregar_planta(Planta("Helecho", rnd.randint(0, eco.width), rnd.randint(0, eco.height)))
+
+        if tick >= calentamiento:
+            for fase, t in medidas.items():
+                tiempos[fase].append(t)
+
+    fases = {}
+    for fase, valores in tiempos.items():
+        valores.sort()
+        fases[fase] = {
+            'media_ms': statistics.fmean(valores) * 1000,
+            'mediana_ms': statistics.median(valores) * 1000,
+            'p95_ms': valores[min(len(valores) - 1, int(len(valores) * 0.95))] * 1000,
+        }
+    return {
+        'animales': animales,
+        'plantas': plantas,
+        'mundo': [eco.width, eco.height],
+        'ticks': ticks,
+        'animales_final': len(eco.animales),
+        'plantas_final': len(eco.plantas),
+        'fases': fases,
+        'total_ms': sum(f['media_ms'] for f in fases.values()),
+    }
+
+def _bytes_por_instancia(crear, n: int) -> float:
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    objetos = [crear(i) for i in range(n)]
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Sin contar la propia lista que los retiene
+    return (despues - antes - sys.getsizeof(objetos)) / n
+
+def medir_memoria(n: int = 10000) -> dict:
+    """Bytes por entidad (objeto y sus atributos) para animales y plantas."""
+    return {
+        'n': n,
+        'animal_bytes': _bytes_por_instancia(lambda i: Triceratops(float(i), float(i)), n),
+        'planta_bytes': _bytes_por_instancia(lambda i: Planta("Helecho", i, i), n),
+    }
+
+# Animales dibujados en el benchmark de render (con otras tantas plantas)
+TAMANOS_RENDER = [500, 2000, 8000]
+
+ESCENAS_RENDER = ['completo', 'movimiento', 'capa_plantas']
+
+_vista = None
+
+def _vista_sin_ventana():
+    """Vista única del proceso (pygame solo admite una ventana), con el driver de vídeo nulo."""
+    global _vista
+    if _vista is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        from vista import VistaEcosistema
+        _vista = VistaEcosistema(WORLD_PX_W, WORLD_PX_H)
+    return _vista
+
+def medir_render(animales: int, frames: int, seed: int, por_lotes: bool) -> dict:
+    """ms por frame de VistaEcosistema.render con 'animales' animales y otras tantas plantas:
+    - completo: repintado entero de la pantalla en cada frame.
+    - movimiento: todos los animales se mueven un poco (zonas sucias o repintado).
+    - capa_plantas: se recompone la capa de plantas sin cambios en la escena.
+    """
+    vista = _vista_sin_ventana()
+    vista.dibujo_por_lotes = por_lotes
+    rnd = random.Random(seed)
+    eco = Ecosistema(WORLD_PX_W, WORLD_PX_H)
+    for i in range(animales):
+        eco.agregar_planta(Planta(f"Helecho_{i+1}", rnd.randint(0, eco.width), rnd.randint(0, eco.height)))
+    clases = list(eco.especie_clase.values())
+    for _ in range(animales):
+        eco.agregar_animal(rnd.choice(clases)(rnd.randint(0, eco.width), rnd.randint(0, eco.height)))
+    intervalos = [0]
+
+    def completo():
+        vista.invalidar()
+
+    def movimiento():
+        for a in eco.animales:
+            a.x = max(0, min(eco.width, a.x + rnd.randint(-2, 2)))
+            a.y = max(0, min(eco.height, a.y + rnd.randint(-2, 2)))
+
+    def capa_plantas():
+        eco.version_plantas += 1
+
+    res = {}
+    for escena, preparar in (('completo', completo), ('movimiento', movimiento), ('capa_plantas', capa_plantas)):
+        vista.invalidar()
+        vista.render(eco, 1, 0, intervalos)
+        tiempos = []
+        for _ in range(frames):
+            preparar()
+            tiempos.append(_medir(lambda: vista.render(eco, 1, 0, intervalos)))
+        mediana = statistics.median(tiempos) * 1000
+        res[escena] = {'mediana_ms': mediana, 'ms_por_1k': mediana * 1000 / (2 * animales)}
+    return {'animales': animales, 'plantas': animales, 'por_lotes': por_lotes, 'escenas': res}
+
+def crecimiento(resultados: list) -> dict:
+    """Exponente de crecimiento entre tamaños consecutivos (1 ~ lineal, 2 ~ cuadrático)."""
+    curva = {fase: [] for fase in FASES}
+    for prev, sig in zip(resultados, resultados[1:]):
+        n0 = prev['animales'] + prev['plantas']
+        n1 = sig['animales'] + sig['plantas']
+        for fase in FASES:
+            t0 = prev['fases'][fase]['mediana_ms']
+            t1 = sig['fases'][fase]['mediana_ms']
+            exp = math.log(t1 / t0) / math.log(n1 / n0) if t0 > 0 and t1 > 0 and n1 != n0 else None
+            curva[fase].append({'desde': n0, 'hasta': n1, 'exponente': exp})
+    return curva
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmark", description="Benchmark de escalado del núcleo de simulación.")
+    parser.add_argument("--tamanos", type=_tamanos, default=TAMANOS,
+                        help="lista animales:plantas separada por comas (p. ej. 32:60,256:500)")
+    parser.add_argument("--ticks", type=int, default=10, help="ticks medidos por tamaño")
+    parser.add_argument("--calentamiento", type=int, default=2, help="ticks sin medir al inicio")
+    parser.add_argument("--seed", type=int, default=1234, help="semilla de los mundos")
+    parser.add_argument("--lotes", action="store_true", help="IA vectorizada por lotes (NumPy)")
+    parser.add_argument("--memoria", action="store_true", help="medir también los bytes por entidad")
+    parser.add_argument("--render", action="store_true", help="medir también el render de la vista")
+    parser.add_argument("--frames", type=int, default=60, help="frames medidos por escena de render")
+    parser.add_argument("--json", dest="salida_json", default=None, help="ruta del informe JSON ('-' = stdout)")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for animales, plantas in args.tamanos:
+        r = medir_tamano(animales, plantas, args.ticks, args.seed, args.calentamiento,
+                         ia_por_lotes=args.lotes)
+        resultados.append(r)
+        detalle = " | ".join(f"{fase}: {r['fases'][fase]['mediana_ms']:.3f}" for fase in FASES)
+        print(f"[{animales} animales / {plantas} plantas] total {r['total_ms']:.2f} ms/tick | {detalle}",
+              file=sys.stderr)
+
+    curva = crecimiento(resultados)
+    for fase, tramos in curva.items():
+        exps = ", ".join("-" if t['exponente'] is None else f"{t['exponente']:.2f}" for t in tramos)
+        print(f"Crecimiento {fase}: {exps}", file=sys.stderr)
+
+    memoria = None
+    if args.memoria:
+        memoria = medir_memoria()
+        print(f"Memoria: animal {memoria['animal_bytes']:.0f} B | planta {memoria['planta_bytes']:.0f} B",
+              file=sys.stderr)
+
+    render = None
+    if args.render:
+        render = []
+        for animales in TAMANOS_RENDER:
+            for por_lotes in (False, True):
+                r = medir_render(animales, args.frames, args.seed, por_lotes)
+                render.append(r)
+                detalle = " | ".join(f"{e}: {v['mediana_ms']:.2f} ms ({v['ms_por_1k']:.3f}/1k)"
+                                     for e, v in r['escenas'].items())
+                modo = "blits" if por_lotes else "blit"
+                print(f"Render [{2 * animales} entidades, {modo}] {detalle}", file=sys.stderr)
+
+    informe = {
+        'fecha': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'seed': args.seed,
+        'ia_por_lotes': args.lotes,
+        'resultados': resultados,
+        'crecimiento': curva,
+        'memoria': memoria,
+        'render': render,
+    }
+    if args.salida_json == '-':
+        json.dump(informe, sys.stdout, indent=2)
+        print()
+    elif args.salida_json:
+        with open(args.salida_json, 'w') as f:
+            json.dump(informe, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
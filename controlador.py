@@ -1,3 +1,4 @@
+import argparse
 import random
 import math
 import sys
@@ -7,36 +8,75 @@ from modelo import (
     Velociraptor, Dilofosaurio, Moshops,
     WORLD_PX_W, WORLD_PX_H, MOVE_SPEED, 
     SPEED_FLEE, SPEED_CHASE, SPEED_SEEK_PLANT, SPEED_PATROL, 
-    SPEED_SEEK_CORPSE, HUNGER_THRESHOLD, EAT_DURATION_TICKS
+    SPEED_SEEK_CORPSE, HUNGER_THRESHOLD, EAT_DURATION_TICKS, _planta_viva
 )
 from vista import VistaEcosistema, MARGIN_TOP
-from persistencia import Persistencia
+from persistencia import Persistencia, GuardadoEnSegundoPlano
+import ia_lotes
+from ia_lotes import IALotes
+from metricas import MedidorFases
 
 """
 CAPA DE CONTROLADOR
 Contiene la lógica de control, IA y el bucle principal del juego
 """
 
+COLISION_MIN_D = 24.0  # diámetro mínimo ~ 2*radio de colisión (12px)
+SIM_DT = 0.04  # 40 ms por paso lógico
+NUM_SLOTS = 3  # slots de guardado del menú
+
+def _slot_de_tecla(tecla: int) -> int | None:
+    """Slot que elige una tecla numérica (1..NUM_SLOTS), o None."""
+    if pg.K_1 <= tecla <= pg.K_9 and tecla - pg.K_0 <= NUM_SLOTS:
+        return tecla - pg.K_0
+    return None
+
+# Predicados para las consultas del índice espacial (_planta_viva viene de modelo)
+def _cadaver_disponible(c):
+    return c.eaten < 1.0
+
+def _es_presa(h):
+    return getattr(h, 'tipo', '') in ('herbivoro', 'omnivoro') and h.esta_vivo()
+
 class ControladorJuego:
-    def __init__(self):
+    def __init__(self, vista=None, ruta_tiempos: str | None = None,
+                 proceso_sim: bool = False, ia_por_lotes: bool = False):
+        """vista=None crea la ventana de Pygame; el modo sin pantalla pasa su propia vista.
+        ruta_tiempos: archivo .csv o .jsonl donde volcar los tiempos por fase de cada frame.
+        proceso_sim: simular en otro proceso y dibujar sus instantáneas (ver proceso_sim.py).
+        ia_por_lotes: IA vectorizada con NumPy (ver ia_lotes.py).
+        """
         self.persistencia = Persistencia()
+        # Autoguardado en un hilo aparte (uno en curso como mucho)
+        self.guardado = GuardadoEnSegundoPlano(self.persistencia)
         self.slot_activo = 1
         self.autosave_intervalos = [0, 300, 600, 1200]  # 0 es OFF
         self.autosave_idx = 0
         self.carga_pendiente = None
         self.ecosistema = Ecosistema()
-        self.vista = VistaEcosistema(WORLD_PX_W, WORLD_PX_H)
+        self.vista = vista if vista is not None else VistaEcosistema(WORLD_PX_W, WORLD_PX_H)
         self.corriendo = True
         self.player_atk_cd = 0
+        # IA vectorizada con NumPy para poblaciones grandes (ver ia_lotes.py)
+        self.ia_por_lotes = ia_por_lotes
+        self._ia_lotes = None
+        # Tiempos por fase (F3 muestra/oculta la línea en el HUD)
+        self.medidor = MedidorFases(activo=ruta_tiempos is not None, ruta_registro=ruta_tiempos)
 
         # Estados del juego: 'JUGANDO', 'PANTALLA_GUARDAR', 'PANTALLA_CARGAR'
         self.estado_juego = 'JUGANDO'
         self.slot_seleccionado = self.slot_activo
         self.metadatos_slots = {}
         
-        # Inicializar el ecosistema
-        self.ecosistema.poblar_inicial()
-        self._poblar_animales_adicionales()
+        # Simulación en otro proceso (el ecosistema local no se usa)
+        self.sim_remota = None
+        if proceso_sim:
+            from proceso_sim import SimulacionEnProceso
+            self.sim_remota = SimulacionEnProceso(random.randrange(1 << 30), ia_por_lotes=ia_por_lotes)
+        else:
+            # Inicializar el ecosistema
+            self.ecosistema.poblar_inicial()
+            self._poblar_animales_adicionales()
         
         # Mensaje inicial
         self.vista.mostrar_mensaje(f"Slot {self.slot_activo} seleccionado", 2)
@@ -87,64 +127,62 @@ class ControladorJuego:
         dy = by - ay
         return dx*dx + dy*dy
 
-    def _manejar_entrada_jugador(self):
-        """Manejar la entrada del jugador."""
+    def _leer_teclas(self) -> tuple:
+        """Entrada del jugador (dx, dy, ataque): WASD o flechas y SPACE."""
         keys = pg.key.get_pressed()
+        dx = dy = 0
+        if keys[pg.K_a] or keys[pg.K_LEFT]:
+            dx -= 1
+        if keys[pg.K_d] or keys[pg.K_RIGHT]:
+            dx += 1
+        if keys[pg.K_w] or keys[pg.K_UP]:
+            dy -= 1
+        if keys[pg.K_s] or keys[pg.K_DOWN]:
+            dy += 1
+        return dx, dy, bool(keys[pg.K_SPACE])
+
+    def _manejar_entrada_jugador(self, entrada: tuple | None = None):
+        """Manejar la entrada del jugador (la del teclado si no se pasa otra)."""
+        dx, dy, ataque = entrada if entrada is not None else self._leer_teclas()
         trex = self.ecosistema.jugador
         
         if trex and trex.esta_vivo():
-            # Movimiento (WASD + flechas)
-            dx = dy = 0
-            if keys[pg.K_a] or keys[pg.K_LEFT]:
-                dx -= 1
-            if keys[pg.K_d] or keys[pg.K_RIGHT]:
-                dx += 1
-            if keys[pg.K_w] or keys[pg.K_UP]:
-                dy -= 1
-            if keys[pg.K_s] or keys[pg.K_DOWN]:
-                dy += 1
-            
+            # Movimiento
             if dx != 0 or dy != 0:
                 if dx != 0 and dy != 0:
                     step = int(MOVE_SPEED / 1.41421356) or 1
                 else:
                     step = MOVE_SPEED
-                trex.x = max(0, min(WORLD_PX_W, trex.x + dx * step))
-                trex.y = max(0, min(WORLD_PX_H, trex.y + dy * step))
+                trex.x = max(0, min(self.ecosistema.width, trex.x + dx * step))
+                trex.y = max(0, min(self.ecosistema.height, trex.y + dy * step))
+                self.ecosistema.reubicar(trex)
 
             # Comer cadáver cercano automáticamente
-            for c in self.ecosistema.cadaveres:
-                if c['eaten'] >= 1.0:
-                    continue
-                if self._dist_sq(trex.x, MARGIN_TOP + trex.y, c['x'], c['y']) < 36*36:
-                    c['eaten'] += 1.0 / float(EAT_DURATION_TICKS)
-                    trex.energia = min(160, trex.energia + (40.0/float(EAT_DURATION_TICKS)))
-                    self.vista.spawn_eat_effect(c['x'], c['y'])
-                    if c['eaten'] >= 1.0:
-                        c['eaten'] = 1.0
-                        c['age'] = c['max_age']
-                    break
+            c = self.ecosistema.nearest('cadaver', trex.x, MARGIN_TOP + trex.y, 36, _cadaver_disponible)
+            if c is not None:
+                c.eaten = min(1.0, c.eaten + 1.0 / float(EAT_DURATION_TICKS))
+                trex.energia = min(160, trex.energia + (40.0/float(EAT_DURATION_TICKS)))
+                self.vista.spawn_eat_effect(c.x, c.y)
 
             # Ataque del jugador con SPACE
             if self.player_atk_cd > 0:
                 self.player_atk_cd -= 1
-            if keys[pg.K_SPACE] and self.player_atk_cd == 0:
-                target = None
-                dmin = 1e9
-                for a in self.ecosistema.animales:
-                    if a is trex or not a.esta_vivo():
-                        continue
-                    d_sq = self._dist_sq(trex.x, trex.y, a.x, a.y)
-                    if d_sq < dmin:
-                        dmin = d_sq
-                        target = a
-                if target and dmin < 24*24:
+            if ataque and self.player_atk_cd == 0:
+                target = self.ecosistema.nearest(
+                    'animal', trex.x, trex.y, 24,
+                    lambda a: a is not trex and a.esta_vivo())
+                if target is not None:
                     trex.atacar(target, self.ecosistema)
                     self.vista.spawn_hit_effect(int(target.x), MARGIN_TOP + int(target.y))
                     self.player_atk_cd = 15
 
     def _actualizar_ia(self):
         """Actualizar la IA de los animales."""
+        if self.ia_por_lotes:
+            if self._ia_lotes is None:
+                self._ia_lotes = IALotes(self)
+            self._ia_lotes.paso()
+            return
         jugador = self.ecosistema.jugador
         
         # Agrupar por especie: centroides para moverse en grupo
@@ -175,6 +213,7 @@ class ControladorJuego:
             # Muerte natural por energía
             if a.energia <= 0:
                 a.morir()
+                self.ecosistema.marcar_para_remover(a)
                 continue
             
             # Movimiento de agrupamiento (suave)
@@ -184,8 +223,8 @@ class ControladorJuego:
                 dxg, dyg = cx - a.x, cy - a.y
                 dg = math.hypot(dxg, dyg) or 1
                 if dg > 25:  # si está lejos del grupo, acércate un poco
-                    a.x = max(0, min(WORLD_PX_W, a.x + 0.6 * dxg/dg))
-                    a.y = max(0, min(WORLD_PX_H, a.y + 0.6 * dyg/dg))
+                    a.x = max(0, min(self.ecosistema.width, a.x + 0.6 * dxg/dg))
+                    a.y = max(0, min(self.ecosistema.height, a.y + 0.6 * dyg/dg))
 
             if t == 'herbivoro':
                 self._ia_herbivoro(a, jugador)
@@ -193,6 +232,7 @@ class ControladorJuego:
                 self._ia_carnivoro(a, jugador)
             elif t == 'omnivoro':
                 self._ia_omnivoro(a, jugador)
+            self.ecosistema.reubicar(a)
 
     def _ia_herbivoro(self, a, jugador):
         """IA para herbívoros."""
@@ -201,32 +241,31 @@ class ControladorJuego:
             dx = a.x - jugador.x
             dy = a.y - jugador.y
             d = math.hypot(dx, dy) or 1
-            a.x = max(0, min(WORLD_PX_W, a.x + SPEED_FLEE * dx/d))
-            a.y = max(0, min(WORLD_PX_H, a.y + SPEED_FLEE * dy/d))
+            a.x = max(0, min(self.ecosistema.width, a.x + SPEED_FLEE * dx/d))
+            a.y = max(0, min(self.ecosistema.height, a.y + SPEED_FLEE * dy/d))
             a.energia -= 0.0
         else:
             if a.energia < HUNGER_THRESHOLD:
                 # Buscar planta más cercana
-                vivos = [p for p in self.ecosistema.plantas if p.vida > 0]
-                if vivos:
-                    obj = min(vivos, key=lambda p: self._dist_sq(a.x, a.y, p.x, p.y))
+                obj = self.ecosistema.nearest('planta', a.x, a.y, predicate=_planta_viva)
+                if obj is not None:
                     dx = obj.x - a.x
                     dy = obj.y - a.y
                     d = math.hypot(dx, dy) or 1
-                    a.x = max(0, min(WORLD_PX_W, a.x + SPEED_SEEK_PLANT * dx/d))
-                    a.y = max(0, min(WORLD_PX_H, a.y + SPEED_SEEK_PLANT * dy/d))
+                    a.x = max(0, min(self.ecosistema.width, a.x + SPEED_SEEK_PLANT * dx/d))
+                    a.y = max(0, min(self.ecosistema.height, a.y + SPEED_SEEK_PLANT * dy/d))
                     a.energia -= 0.0
                     if self._dist_sq(a.x, a.y, obj.x, obj.y) < 16*16 and obj.vida > 0:
                         a.comer(obj, self.ecosistema)
                 else:
                     # Vagar si no hay comida
-                    a.x = max(0, min(WORLD_PX_W, a.x + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
-                    a.y = max(0, min(WORLD_PX_H, a.y + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
+                    a.x = max(0, min(self.ecosistema.width, a.x + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
+                    a.y = max(0, min(self.ecosistema.height, a.y + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
                     a.energia -= 0.0
             else:
                 # Saciado: deambular conservando energía
-                a.x = max(0, min(WORLD_PX_W, a.x + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
-                a.y = max(0, min(WORLD_PX_H, a.y + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
+                a.x = max(0, min(self.ecosistema.width, a.x + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
+                a.y = max(0, min(self.ecosistema.height, a.y + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
                 a.energia -= 0.0
 
     def _ia_carnivoro(self, a, jugador):
@@ -236,42 +275,33 @@ class ControladorJuego:
             return
         
         # Buscar cadáver más cercano
-        target_corpse = None
-        best_d = 1e9
-        for c in self.ecosistema.cadaveres:
-            if c['eaten'] >= 1.0:
-                continue
-            d_sq = self._dist_sq(a.x, MARGIN_TOP + a.y, c['x'], c['y'])
-            if d_sq < best_d:
-                best_d = d_sq
-                target_corpse = c
+        target_corpse = self.ecosistema.nearest('cadaver', a.x, MARGIN_TOP + a.y, predicate=_cadaver_disponible)
         
         if target_corpse is not None:
-            dx = target_corpse['x'] - a.x
-            dy = target_corpse['y'] - (MARGIN_TOP + a.y)
+            dx = target_corpse.x - a.x
+            dy = target_corpse.y - (MARGIN_TOP + a.y)
             d = math.hypot(dx, dy) or 1
-            a.x = max(0, min(WORLD_PX_W, a.x + SPEED_SEEK_CORPSE * dx/d))
-            a.y = max(0, min(WORLD_PX_H, a.y + SPEED_SEEK_CORPSE * dy/d))
+            a.x = max(0, min(self.ecosistema.width, a.x + SPEED_SEEK_CORPSE * dx/d))
+            a.y = max(0, min(self.ecosistema.height, a.y + SPEED_SEEK_CORPSE * dy/d))
             self._ai_comer_cadaver(a)
             return
         
         if a.energia <= HUNGER_THRESHOLD:
             # Con hambre: cazar
-            presas = [h for h in self.ecosistema.animales if getattr(h, 'tipo', '') in ('herbivoro', 'omnivoro') and h.esta_vivo()]
-            if presas:
-                obj = min(presas, key=lambda h: self._dist_sq(a.x, a.y, h.x, h.y))
+            obj = self.ecosistema.nearest('animal', a.x, a.y, predicate=_es_presa)
+            if obj is not None:
                 dx = obj.x - a.x
                 dy = obj.y - a.y
                 d = math.hypot(dx, dy) or 1
-                a.x = max(0, min(WORLD_PX_W, a.x + SPEED_CHASE * dx/d))
-                a.y = max(0, min(WORLD_PX_H, a.y + SPEED_CHASE * dy/d))
+                a.x = max(0, min(self.ecosistema.width, a.x + SPEED_CHASE * dx/d))
+                a.y = max(0, min(self.ecosistema.height, a.y + SPEED_CHASE * dy/d))
                 a.energia -= 0.0
                 if self._dist_sq(a.x, a.y, obj.x, obj.y) < 22*22:
                     self._intentar_ataque(a, obj)
         else:
             # Saciado: patrullar
-            a.x = max(0, min(WORLD_PX_W, a.x + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
-            a.y = max(0, min(WORLD_PX_H, a.y + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
+            a.x = max(0, min(self.ecosistema.width, a.x + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
+            a.y = max(0, min(self.ecosistema.height, a.y + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
             a.energia -= 0.0
             # Si patrullando encuentra cadáver, comer
             self._ai_comer_cadaver(a)
@@ -283,42 +313,33 @@ class ControladorJuego:
             return
         
         # Buscar cadáver más cercano
-        target_corpse = None
-        best_d = 1e9
-        for c in self.ecosistema.cadaveres:
-            if c['eaten'] >= 1.0:
-                continue
-            d_sq = self._dist_sq(a.x, MARGIN_TOP + a.y, c['x'], c['y'])
-            if d_sq < best_d:
-                best_d = d_sq
-                target_corpse = c
+        target_corpse = self.ecosistema.nearest('cadaver', a.x, MARGIN_TOP + a.y, predicate=_cadaver_disponible)
         
         if target_corpse is not None:
-            dx = target_corpse['x'] - a.x
-            dy = target_corpse['y'] - (MARGIN_TOP + a.y)
+            dx = target_corpse.x - a.x
+            dy = target_corpse.y - (MARGIN_TOP + a.y)
             d = math.hypot(dx, dy) or 1
-            a.x = max(0, min(WORLD_PX_W, a.x + SPEED_SEEK_CORPSE * dx/d))
-            a.y = max(0, min(WORLD_PX_H, a.y + SPEED_SEEK_CORPSE * dy/d))
+            a.x = max(0, min(self.ecosistema.width, a.x + SPEED_SEEK_CORPSE * dx/d))
+            a.y = max(0, min(self.ecosistema.height, a.y + SPEED_SEEK_CORPSE * dy/d))
             self._ai_comer_cadaver(a)
             return
         
         if a.energia < HUNGER_THRESHOLD:
             # Con hambre: buscar plantas
-            vivos = [p for p in self.ecosistema.plantas if p.vida > 0]
-            if vivos:
-                obj = min(vivos, key=lambda p: self._dist_sq(a.x, a.y, p.x, p.y))
+            obj = self.ecosistema.nearest('planta', a.x, a.y, predicate=_planta_viva)
+            if obj is not None:
                 dx = obj.x - a.x
                 dy = obj.y - a.y
                 d = math.hypot(dx, dy) or 1
-                a.x = max(0, min(WORLD_PX_W, a.x + SPEED_SEEK_PLANT * dx/d))
-                a.y = max(0, min(WORLD_PX_H, a.y + SPEED_SEEK_PLANT * dy/d))
+                a.x = max(0, min(self.ecosistema.width, a.x + SPEED_SEEK_PLANT * dx/d))
+                a.y = max(0, min(self.ecosistema.height, a.y + SPEED_SEEK_PLANT * dy/d))
                 a.energia -= 0.0
                 if self._dist_sq(a.x, a.y, obj.x, obj.y) < 16*16 and obj.vida > 0:
                     a.comer(obj, self.ecosistema)
         else:
             # Saciado: patrullar
-            a.x = max(0, min(WORLD_PX_W, a.x + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
-            a.y = max(0, min(WORLD_PX_H, a.y + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
+            a.x = max(0, min(self.ecosistema.width, a.x + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
+            a.y = max(0, min(self.ecosistema.height, a.y + random.uniform(-SPEED_PATROL, SPEED_PATROL)))
             a.energia -= 0.0
 
     def _ai_comer_cadaver(self, animal):
@@ -329,23 +350,16 @@ class ControladorJuego:
         EAT_DURATION_FRAMES = EAT_DURATION_TICKS
         E_PER_TICK = 40.0 / EAT_DURATION_FRAMES
         
-        for c in self.ecosistema.cadaveres:
-            if c['eaten'] >= 1.0:
-                continue
-            if self._dist_sq(animal.x, MARGIN_TOP + animal.y, c['x'], c['y']) < 36*36:
-                c['eaten'] += 1.0 / EAT_DURATION_FRAMES
-                animal.energia += E_PER_TICK
-                self.vista.spawn_eat_effect(c['x'], c['y'])
-                if c['eaten'] >= 1.0:
-                    c['eaten'] = 1.0
-                    c['age'] = c['max_age']
-                return True
-        return False
+        c = self.ecosistema.nearest('cadaver', animal.x, MARGIN_TOP + animal.y, 36, _cadaver_disponible)
+        if c is None:
+            return False
+        c.eaten = min(1.0, c.eaten + 1.0 / EAT_DURATION_FRAMES)
+        animal.energia += E_PER_TICK
+        self.vista.spawn_eat_effect(c.x, c.y)
+        return True
 
     def _intentar_ataque(self, attacker, victim):
         """Intentar realizar un ataque."""
-        if not hasattr(attacker, '_atk_cd'):
-            attacker._atk_cd = 0
         if attacker._atk_cd > 0:
             attacker._atk_cd -= 1
             return
@@ -362,36 +376,82 @@ class ControladorJuego:
         if len(vivos) < 2:
             return
         
-        min_d = 24.0  # diámetro mínimo ~ 2*radio de colisión (12px)
-        for i in range(len(vivos)):
-            a = vivos[i]
-            for j in range(i+1, len(vivos)):
-                b = vivos[j]
-                dx = b.x - a.x
-                dy = b.y - a.y
-                dist = math.hypot(dx, dy)
-                
-                if dist < 1e-6:
-                    # separar direcciones aleatorias pequeñas para evitar división por cero
-                    ang = random.random() * math.tau
-                    dx = math.cos(ang)
-                    dy = math.sin(ang)
-                    dist = 1.0
-                
-                if dist < min_d:
-                    overlap = (min_d - dist) * 0.5
-                    nx = dx / dist
-                    ny = dy / dist
-                    # Empujar ambos en direcciones opuestas
-                    a.x = max(0, min(WORLD_PX_W, a.x - nx * overlap))
-                    a.y = max(0, min(WORLD_PX_H, a.y - ny * overlap))
-                    b.x = max(0, min(WORLD_PX_W, b.x + nx * overlap))
-                    b.y = max(0, min(WORLD_PX_H, b.y + ny * overlap))
+        min_d = COLISION_MIN_D
+        # Fase amplia: rejilla de celdas de lado min_d, actualizada al empujar.
+        # Dos animales a menos de min_d están siempre en celdas vecinas (3x3).
+        celdas = {}
+        celda_de = []
+        for i, a in enumerate(vivos):
+            clave = (int(a.x // min_d), int(a.y // min_d))
+            celdas.setdefault(clave, set()).add(i)
+            celda_de.append(clave)
+
+        def recolocar(k):
+            b = vivos[k]
+            clave = (int(b.x // min_d), int(b.y // min_d))
+            if clave != celda_de[k]:
+                celdas[celda_de[k]].discard(k)
+                celdas.setdefault(clave, set()).add(k)
+                celda_de[k] = clave
+
+        # Mismo orden que el recorrido exhaustivo: para cada i, el siguiente j > i
+        # que solapa con la posición actual de a (a solo se mueve al solaparse).
+        movidos = set()
+        for i, a in enumerate(vivos):
+            ultimo = i
+            while True:
+                cx, cy = celda_de[i]
+                sig = None
+                for ox in (-1, 0, 1):
+                    for oy in (-1, 0, 1):
+                        for j in celdas.get((cx + ox, cy + oy), ()):
+                            if j > ultimo and (sig is None or j < sig):
+                                b = vivos[j]
+                                if math.hypot(b.x - a.x, b.y - a.y) < min_d:
+                                    sig = j
+                if sig is None:
+                    break
+                self._separar_par(a, vivos[sig], min_d)
+                recolocar(i)
+                recolocar(sig)
+                movidos.add(i)
+                movidos.add(sig)
+                ultimo = sig
+        for i in movidos:
+            self.ecosistema.reubicar(vivos[i])
+
+    def _separar_par(self, a, b, min_d):
+        """Empujar a y b en direcciones opuestas si se solapan. Devuelve True si se movieron."""
+        dx = b.x - a.x
+        dy = b.y - a.y
+        dist = math.hypot(dx, dy)
+        
+        if dist < 1e-6:
+            # separar direcciones aleatorias pequeñas para evitar división por cero
+            ang = random.random() * math.tau
+            dx = math.cos(ang)
+            dy = math.sin(ang)
+            dist = 1.0
+        
+        if dist < min_d:
+            overlap = (min_d - dist) * 0.5
+            nx = dx / dist
+            ny = dy / dist
+            # Empujar ambos en direcciones opuestas
+            a.x = max(0, min(self.ecosistema.width, a.x - nx * overlap))
+            a.y = max(0, min(self.ecosistema.height, a.y - ny * overlap))
+            b.x = max(0, min(self.ecosistema.width, b.x + nx * overlap))
+            b.y = max(0, min(self.ecosistema.height, b.y + ny * overlap))
+            return True
+        return False
 
     def _manejar_eventos(self):
         for event in pg.event.get():
             if event.type == pg.QUIT:
                 self.corriendo = False
+            elif event.type in (pg.VIDEOEXPOSE, pg.WINDOWEXPOSED, pg.WINDOWRESTORED):
+                # La ventana se ha vuelto a mostrar: volcarla entera
+                self.vista.invalidar()
             elif event.type == pg.KEYDOWN:
                 # --- Eventos globales ---
                 if event.key == pg.K_ESCAPE:
@@ -411,8 +471,8 @@ class ControladorJuego:
 
     def _manejar_eventos_jugando(self, event):
         # Selección de slot activo (ahora solo cambia el target del autosave)
-        if event.key in [pg.K_1, pg.K_2, pg.K_3]:
-            self.slot_activo = event.key - pg.K_0
+        if (slot := _slot_de_tecla(event.key)) is not None:
+            self.slot_activo = slot
             self.vista.mostrar_mensaje(f"Autoguardado en Slot {self.slot_activo}", 2)
         # Abrir pantalla de guardado
         elif event.key == pg.K_j:
@@ -430,33 +490,49 @@ class ControladorJuego:
             intervalo = self.autosave_intervalos[self.autosave_idx]
             msg = f"Autoguardado: {'OFF' if intervalo == 0 else f'Cada {intervalo} ciclos'}"
             self.vista.mostrar_mensaje(msg, 2)
+        # Tiempos por fase en el HUD
+        elif event.key == pg.K_F3:
+            activo = self.medidor.alternar()
+            self.vista.mostrar_mensaje(f"Tiempos por fase: {'ON' if activo else 'OFF'}", 1.5)
 
     def _manejar_eventos_menu(self, event):
         if event.key in [pg.K_UP, pg.K_w]:
             self.slot_seleccionado = max(1, self.slot_seleccionado - 1)
         elif event.key in [pg.K_DOWN, pg.K_s]:
-            self.slot_seleccionado = min(3, self.slot_seleccionado + 1)
-        elif event.key in [pg.K_1, pg.K_2, pg.K_3]:
-            self.slot_seleccionado = event.key - pg.K_0
+            self.slot_seleccionado = min(NUM_SLOTS, self.slot_seleccionado + 1)
+        elif (slot := _slot_de_tecla(event.key)) is not None:
+            self.slot_seleccionado = slot
         elif event.key == pg.K_RETURN:
+            slot_str = f"slot{self.slot_seleccionado}"
             if self.estado_juego == 'PANTALLA_GUARDAR':
-                slot_str = f"slot{self.slot_seleccionado}"
-                success, msg = self.persistencia.guardar_slot(slot_str, self.ecosistema, self.autosave_intervalos[self.autosave_idx])
-                self.vista.mostrar_mensaje(msg, 3)
-                self.estado_juego = 'JUGANDO'
+                if self.sim_remota is not None:
+                    self.sim_remota.guardar(slot_str)
+                else:
+                    self._guardar_slot(slot_str)
             elif self.estado_juego == 'PANTALLA_CARGAR':
-                slot_str = f"slot{self.slot_seleccionado}"
-                eco_cargado, msg = self.persistencia.cargar_slot(slot_str)
-                if eco_cargado:
-                    self.ecosistema = eco_cargado
-                    self.vista.mostrar_mensaje(msg, 3)
+                if self.sim_remota is not None:
+                    self.sim_remota.cargar(slot_str)
                 else:
-                    self.vista.mostrar_mensaje(f"{msg}. No se pudo cargar.", 4)
-                self.estado_juego = 'JUGANDO'
+                    self._cargar_slot(slot_str)
+            self.estado_juego = 'JUGANDO'
+
+    def _guardar_slot(self, slot_str: str):
+        self.guardado.esperar()
+        success, msg = self.persistencia.guardar_slot(slot_str, self.ecosistema, self.autosave_intervalos[self.autosave_idx])
+        self.vista.mostrar_mensaje(msg, 3)
+
+    def _cargar_slot(self, slot_str: str):
+        self.guardado.esperar()
+        eco_cargado, msg = self.persistencia.cargar_slot(slot_str)
+        if eco_cargado:
+            self.ecosistema = eco_cargado
+            self.vista.mostrar_mensaje(msg, 3)
+        else:
+            self.vista.mostrar_mensaje(f"{msg}. No se pudo cargar.", 4)
 
     def _cargar_metadatos_todos_slots(self):
         self.metadatos_slots = {}
-        for i in range(1, 4):
+        for i in range(1, NUM_SLOTS + 1):
             slot_str = f"slot{i}"
             meta, err = self.persistencia.cargar_metadatos(slot_str)
             if meta:
@@ -464,50 +540,118 @@ class ControladorJuego:
             else:
                 self.metadatos_slots[i] = {'error': err}
 
+    def paso_simulacion(self):
+        """Un paso lógico completo: modelo, IA y colisiones."""
+        medidor = self.medidor
+        with medidor.medir('paso'):
+            self.ecosistema.paso()
+        with medidor.medir('ia'):
+            self._actualizar_ia()
+        with medidor.medir('colisiones'):
+            self._resolver_colisiones()
+
+    def _avanzar_simulacion(self, sim_accum: float) -> float:
+        """Dar los pasos lógicos que quepan en sim_accum (con autoguardado); devuelve el resto."""
+        while sim_accum >= SIM_DT:
+            self.paso_simulacion()
+            sim_accum -= SIM_DT
+            
+            # Autoguardado: aquí solo se toma la instantánea; se escribe en segundo plano
+            # (si el anterior sigue en curso, este se omite)
+            intervalo = self.autosave_intervalos[self.autosave_idx]
+            if intervalo > 0 and self.ecosistema.ciclo > 0 and self.ecosistema.ciclo % intervalo == 0:
+                with self.medidor.medir('autosave'):
+                    slot_a_guardar = f"slot{self.slot_activo}"
+                    self.guardado.guardar(slot_a_guardar, self.ecosistema, intervalo, autoguardado=True)
+        return sim_accum
+
+    def _revisar_guardado(self):
+        """Avisar en la vista del autoguardado en segundo plano que haya terminado."""
+        res = self.guardado.resultado()
+        if res is None:
+            return
+        slot, exito, msg = res
+        if exito:
+            self.vista.mostrar_mensaje(f"Autoguardado en Slot {slot.removeprefix('slot')}", 1.5)
+        else:
+            self.vista.mostrar_mensaje(f"Autoguardado fallido: {msg}", 3)
+
+    def _sincronizar_remota(self):
+        """Enviar la entrada al proceso de simulación y recoger sus eventos e instantánea."""
+        sim = self.sim_remota
+        if not sim.vivo():
+            print("El proceso de simulación terminó inesperadamente.", file=sys.stderr)
+            self.corriendo = False
+            return
+        jugando = self.estado_juego == 'JUGANDO'
+        entrada = self._leer_teclas() if jugando else (0, 0, False)
+        sim.controlar(entrada, not jugando, self.slot_activo, self.autosave_idx)
+        for evento in sim.eventos():
+            tipo = evento[0]
+            if tipo == 'mensaje':
+                self.vista.mostrar_mensaje(*evento[1:])
+            elif tipo == 'hit':
+                self.vista.spawn_hit_effect(*evento[1:])
+            elif tipo == 'eat':
+                self.vista.spawn_eat_effect(*evento[1:])
+            elif tipo == 'ai':
+                self.vista.spawn_ai_attack_effect(*evento[1:])
+        sim.actualizar()
+
     def ejecutar(self):
         """Bucle principal del juego."""
-        SIM_DT = 0.04  # 40 ms por paso lógico
         sim_accum = 0.0
         
         while self.corriendo:
             dt = self.vista.clock.tick(120) / 1000.0  # limitar a ~120 FPS
             
             self._manejar_eventos()
+            if self.sim_remota is not None:
+                self._sincronizar_remota()
+            else:
+                self._revisar_guardado()
 
             # --- Lógica y renderizado condicional por estado ---
             if self.estado_juego == 'JUGANDO':
-                self._manejar_entrada_jugador()
-                
-                sim_accum += dt
-                while sim_accum >= SIM_DT:
-                    self.ecosistema.paso()
-                    self._actualizar_ia()
-                    self._resolver_colisiones()
-                    sim_accum -= SIM_DT
-                    
-                    # Autoguardado
-                    intervalo = self.autosave_intervalos[self.autosave_idx]
-                    if intervalo > 0 and self.ecosistema.ciclo > 0 and self.ecosistema.ciclo % intervalo == 0:
-                        slot_a_guardar = f"slot{self.slot_activo}"
-                        self.persistencia.guardar_slot(slot_a_guardar, self.ecosistema, intervalo, autoguardado=True)
-                        self.vista.mostrar_mensaje(f"Autoguardado en Slot {self.slot_activo}", 1.5)
+                if self.sim_remota is None:
+                    self._manejar_entrada_jugador()
+                    sim_accum = self._avanzar_simulacion(sim_accum + dt)
+                    eco = self.ecosistema
+                else:
+                    eco = self.sim_remota.ecosistema
                 
-                self.vista.update_corpses(self.ecosistema.cadaveres)
-                self.vista.render(self.ecosistema, self.slot_activo, self.autosave_idx, self.autosave_intervalos)
+                self.vista.texto_tiempos = self.medidor.texto_hud() if self.medidor.activo else None
+                with self.medidor.medir('render'):
+                    self.vista.render(eco, self.slot_activo, self.autosave_idx, self.autosave_intervalos)
+                    self.vista.presentar()
             
             elif self.estado_juego in ['PANTALLA_GUARDAR', 'PANTALLA_CARGAR']:
                 self.vista.render_menu_guardado(self.estado_juego, self.slot_seleccionado, self.metadatos_slots)
+                # El flip final de la pantalla lo hace cada método de renderizado
+                pg.display.flip()
             
-            # El flip final de la pantalla lo hace cada método de renderizado
-            pg.display.flip()
+            self.medidor.fin_frame()
         
         # Limpiar
+        if self.sim_remota is not None:
+            self.sim_remota.cerrar()
+        self.guardado.esperar()
+        self.medidor.cerrar()
         self.vista.limpiar()
 
-def main():
+def main(argv=None):
     """Función principal."""
+    parser = argparse.ArgumentParser(description="Simulación de ecosistema.")
+    parser.add_argument("--tiempos", default=None,
+                        help="volcar tiempos por fase de cada frame a un .csv o .jsonl (activa la medición)")
+    parser.add_argument("--proceso-sim", action="store_true",
+                        help="simular en un proceso aparte y dibujar sus instantáneas en memoria compartida")
+    parser.add_argument("--lotes", action="store_true", help="IA vectorizada por lotes (NumPy)")
+    args = parser.parse_args(argv)
+    if args.lotes and not ia_lotes.disponible():
+        parser.error("--lotes requiere NumPy")
     random.seed()
-    juego = ControladorJuego()
+    juego = ControladorJuego(ruta_tiempos=args.tiempos, proceso_sim=args.proceso_sim, ia_por_lotes=args.lotes)
     juego.ejecutar()
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+from typing import Dict, List, Tuple
+
+"""
+POOL DE EFECTOS VISUALES
+Efectos de vida limitada (golpes, comer, ataques de IA) guardados en arrays
+paralelos de capacidad fija: los activos ocupan las posiciones 0..n-1.
+- Crear con el pool lleno reemplaza, en orden circular, un efecto existente.
+- Un efecto que expira se retira moviendo el último a su hueco (O(1)).
+- Solo hay un efecto por posición: crear otro en el mismo píxel (x, y
+  enteros) mientras el anterior sigue vivo no añade nada y solo le alarga la
+  vida (un festín no inunda el frame). Efectos en píxeles vecinos no se unen.
+"""
+
+class PoolEfectos:
+    """Efectos activos en arrays de capacidad fija, uno por posición."""
+
+    def __init__(self, capacidad: int = 64):
+        self.capacidad = max(1, capacidad)
+        self.x: List[int] = [0] * self.capacidad
+        self.y: List[int] = [0] * self.capacidad
+        self.vida: List[int] = [0] * self.capacidad
+        self.extra: List[int] = [0] * self.capacidad  # dato propio del tipo de efecto
+        self.n = 0
+        self._siguiente = 0  # próxima posición a reemplazar con el pool lleno
+        self._en: Dict[Tuple[int, int], int] = {}  # (x, y) -> índice del efecto
+
+    def __len__(self) -> int:
+        return self.n
+
+    def crear(self, x, y, vida: int, extra: int = 0) -> int:
+        """Activar un efecto en (x, y) y devolver su índice. Si ya hay uno en el mismo
+        píxel se reutiliza, con la vida que le quede más larga."""
+        x = int(x)
+        y = int(y)
+        i = self._en.get((x, y))
+        if i is not None:
+            self.vida[i] = max(self.vida[i], vida)
+            return i
+        if self.n < self.capacidad:
+            i = self.n
+            self.n += 1
+        else:
+            i = self._siguiente
+            self._siguiente = (i + 1) % self.capacidad
+            del self._en[(self.x[i], self.y[i])]
+        self.x[i] = x
+        self.y[i] = y
+        self.vida[i] = vida
+        self.extra[i] = extra
+        self._en[(x, y)] = i
+        return i
+
+    def quitar(self, i: int):
+        """Retirar el efecto i moviendo el último activo a su hueco."""
+        del self._en[(self.x[i], self.y[i])]
+        ultimo = self.n - 1
+        if i != ultimo:
+            self.x[i] = self.x[ultimo]
+            self.y[i] = self.y[ultimo]
+            self.vida[i] = self.vida[ultimo]
+            self.extra[i] = self.extra[ultimo]
+            self._en[(self.x[i], self.y[i])] = i
+        self.n = ultimo
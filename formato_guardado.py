@@ -0,0 +1,579 @@
+import json
+import struct
+import sys
+import zlib
+from array import array
+from itertools import compress, count
+from operator import is_not, ne
+from typing import Any, Dict, List, Tuple
+
+from modelo import (
+    Ecosistema, Dinosaurio, Planta, Cadaver, TRexJugador, Triceratops, Stegosaurio,
+    Velociraptor, Dilofosaurio, Moshops, SIM_VERSION, _campos
+)
+
+"""
+FORMATO BINARIO DE GUARDADO
+Guarda el Ecosistema por columnas en lugar de serializar el grafo de objetos:
+- Cabecera fija (struct) con versión del formato, SIM_VERSION y un resumen
+  (ciclo y poblaciones): la versión se comprueba sin tocar el cuerpo.
+- Cuerpo con tablas (meta, animales, plantas, cadáveres y marcas) y, en cada
+  una, una columna por campo empaquetada con array ('q' enteros, 'd' reales,
+  'I' índices a la tabla de textos).
+- El cuerpo empieza por un directorio (tablas, columnas y, por columna,
+  dónde está, si va comprimida con zlib y su crc32); detrás van los datos de
+  cada columna, alineados a 8 bytes. Cada columna se comprime por separado y
+  solo si ahorra espacio. El crc de la cabecera es el del directorio, que
+  incluye los de las columnas.
+  Abierto con mmap (GuardadoMapeado), el directorio se lee al abrir y cada
+  columna al pedirla: se comprueba su crc la primera vez, se descomprime ella
+  sola si hace falta y, si no, es una vista sobre el archivo, sin copiarlo.
+- Diario de cambios: registros que se añaden al final de un archivo, cada uno
+  con lo que cambió desde el guardado anterior (altas, bajas y campos
+  modificados) y atado por su crc al checkpoint completo sobre el que se aplica.
+  El cuerpo de cada registro usa la misma disposición que el del checkpoint.
+Orden de bytes: little-endian.
+"""
+
+MAGIA = b'ECOS'
+MAGIA_DIARIO = b'ECDF'
+VERSION_FORMATO = 1
+ALINEACION = 8
+FLAG_ZLIB = 1
+# Una columna se guarda comprimida solo si ocupa como mucho esta fracción
+COMPRESION_UTIL = 0.9
+
+# magia, versión del formato, flags, SIM_VERSION, ciclo, animales, plantas, cadáveres,
+# vivos, plantas vivas, bytes del cuerpo guardado, bytes del cuerpo sin comprimir, crc32
+# del directorio
+CABECERA = struct.Struct('<4sHH16sqIIIIIQQI')
+# Columna en el directorio: typecode, flags, inicio en el cuerpo,
+# bytes guardados, bytes sin comprimir, crc32 de los bytes guardados
+COLUMNA = struct.Struct('<cBIIII')
+# magia, versión del formato, crc del checkpoint al que pertenece, bytes del cuerpo, crc32 del cuerpo
+REGISTRO = struct.Struct('<4sHIII')
+
+CLASES_ANIMAL = {c.__name__: c for c in (TRexJugador, Triceratops, Stegosaurio, Velociraptor, Dilofosaurio, Moshops)}
+
+# Campos por tabla (los textos se guardan como índice a la tabla de textos)
+CAMPOS_ANIMAL = _campos(Dinosaurio)
+CAMPOS_PLANTA = _campos(Planta)
+CAMPOS_CADAVER = tuple(c for c in _campos(Cadaver) if c != '_pos')
+# Tablas de entidades que el diario guarda por diferencias (el resto va entero)
+TABLAS_DIFERENCIALES = ('animales', 'plantas')
+
+_U32 = struct.Struct('<I')
+_U16 = struct.Struct('<H')
+
+class ErrorFormato(ValueError):
+    pass
+
+def es_binario(datos: bytes) -> bool:
+    return datos[:4] == MAGIA
+
+def _nativo(arr: array) -> array:
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+class _Textos:
+    """Tabla de textos: cada texto distinto se guarda una vez."""
+
+    def __init__(self):
+        self.lista: List[str] = []
+        self._indice: Dict[str, int] = {}
+
+    def indices(self, valores) -> array:
+        indice = self._indice
+        res = array('I')
+        for v in valores:
+            i = indice.get(v)
+            if i is None:
+                i = indice[v] = len(self.lista)
+                self.lista.append(v)
+            res.append(i)
+        return res
+
+def _columnas(campo: str, valores: list, textos: _Textos) -> List[Tuple[str, array]]:
+    """'I' si son textos, 'q' si todos son enteros y 'd' si no; en columnas mixtas,
+    una máscara '<campo>#int' marca las filas que eran int para devolverlas igual."""
+    if valores and all(type(v) is str for v in valores):
+        return [(campo, textos.indices(valores))]
+    enteros = [type(v) is int for v in valores]
+    if all(enteros):
+        return [(campo, array('q', valores))]
+    res = [(campo, array('d', valores))]
+    if any(enteros):
+        res.append((campo + '#int', array('B', enteros)))
+    return res
+
+def _nombre(texto: str) -> bytes:
+    b = texto.encode()
+    return bytes((len(b),)) + b
+
+def _tablas_codificadas(meta: dict, tablas: Dict[str, Dict[str, list]]) -> List[Tuple[str, int, List[Tuple[str, array]]]]:
+    """(nombre, filas, columnas en arrays) de cada tabla y, al final, la meta con los textos."""
+    textos = _Textos()
+    res = []
+    for nombre, columnas in tablas.items():
+        filas = len(next(iter(columnas.values()), ()))
+        codificadas = []
+        for campo, valores in columnas.items():
+            codificadas.extend(_columnas(campo, valores, textos))
+        res.append((nombre, filas, codificadas))
+    meta = dict(meta, textos=textos.lista)
+    res.append(('meta', 1, [('json', array('B', json.dumps(meta).encode()))]))
+    return res
+
+def _codificar(meta: dict, tablas: Dict[str, Dict[str, list]], comprimir: bool,
+               nivel: int) -> Tuple[bytes, int, int]:
+    """Cuerpo (directorio y columnas), bytes de su directorio y bytes que ocuparía sin comprimir."""
+    codificadas = _tablas_codificadas(meta, tablas)
+    n_directorio = _U32.size + _U16.size + sum(
+        len(_nombre(nombre)) + 6 + sum(len(_nombre(campo)) + COLUMNA.size for campo, _ in columnas)
+        for nombre, _, columnas in codificadas)
+    directorio = [_U32.pack(n_directorio), _U16.pack(len(codificadas))]
+    datos = []
+    pos = n_directorio
+    crudo_total = n_directorio
+    for nombre, filas, columnas in codificadas:
+        directorio.append(_nombre(nombre) + _U32.pack(filas) + _U16.pack(len(columnas)))
+        for campo, arr in columnas:
+            crudo = _nativo(arr).tobytes()
+            guardado, flags = crudo, 0
+            if comprimir:
+                comprimido = zlib.compress(crudo, nivel)
+                if len(comprimido) <= len(crudo) * COMPRESION_UTIL:
+                    guardado, flags = comprimido, FLAG_ZLIB
+            relleno = -pos % ALINEACION
+            datos.append(bytes(relleno))
+            pos += relleno
+            directorio.append(_nombre(campo) + COLUMNA.pack(arr.typecode.encode(), flags, pos, len(guardado),
+                                                            len(crudo), zlib.crc32(guardado)))
+            datos.append(guardado)
+            pos += len(guardado)
+            crudo_total += relleno + len(crudo)
+    return b''.join(directorio + datos), n_directorio, crudo_total
+
+def _leer_nombre(vista: memoryview, pos: int) -> Tuple[str, int]:
+    n = vista[pos]
+    return bytes(vista[pos + 1:pos + 1 + n]).decode(), pos + 1 + n
+
+_Entrada = Tuple[str, int, int, int | None, int]
+
+def _directorio(vista: memoryview) -> Dict[str, Tuple[int, Dict[str, _Entrada]]]:
+    """Directorio de un cuerpo: tabla -> (filas, campo -> (typecode, inicio, bytes
+    guardados, bytes sin comprimir o None si no va comprimida, crc32))."""
+    n_directorio = _U32.unpack_from(vista, 0)[0]
+    n_tablas = _U16.unpack_from(vista, 4)[0]
+    pos = 6
+    fin = n_directorio
+    tablas = {}
+    for _ in range(n_tablas):
+        nombre, pos = _leer_nombre(vista, pos)
+        filas = _U32.unpack_from(vista, pos)[0]
+        n_cols = _U16.unpack_from(vista, pos + 4)[0]
+        pos += 6
+        columnas = {}
+        for _ in range(n_cols):
+            campo, pos = _leer_nombre(vista, pos)
+            typecode, flags, inicio, n, crudo, crc = COLUMNA.unpack_from(vista, pos)
+            pos += COLUMNA.size
+            if inicio < n_directorio or inicio + n > len(vista):
+                raise ErrorFormato(f"Columna {nombre}.{campo} fuera del cuerpo")
+            columnas[campo] = (typecode.decode(), inicio, n, crudo if flags & FLAG_ZLIB else None, crc)
+            fin = max(fin, inicio + n)
+        tablas[nombre] = (filas, columnas)
+    if pos != n_directorio or fin != len(vista):
+        raise ErrorFormato("Cuerpo con columnas que no cuadran con su tamaño")
+    return tablas
+
+class _Columnas:
+    """Columnas de un cuerpo decodificadas al pedirlas y sin copiar los datos:
+    con orden de bytes little-endian son vistas (memoryview.cast) sobre el buffer,
+    o sobre la columna descomprimida si va comprimida. El crc de cada columna se
+    comprueba la primera vez que se lee."""
+
+    def __init__(self, vista: memoryview):
+        self._vista = vista
+        self._vistas: List[memoryview] = []
+        self._verificadas: set = set()
+        try:
+            self.directorio = _directorio(vista)
+            campos = self.directorio['meta'][1]
+            self.meta = json.loads(bytes(self._cruda(campos['json'])).decode())
+        except (struct.error, IndexError, KeyError, ValueError) as e:
+            self.cerrar()
+            if isinstance(e, ErrorFormato):
+                raise
+            raise ErrorFormato(f"Cuerpo ilegible: {e}") from e
+        self.textos = self.meta.pop('textos')
+
+    def _cruda(self, columna: _Entrada, propia: bool = False):
+        """Datos de una columna: una vista, o un array propio si propia=True (no
+        depende del buffer, que puede cerrarse después)."""
+        typecode, inicio, n, crudo, crc = columna
+        trozo = self._vista[inicio:inicio + n]
+        if inicio not in self._verificadas:
+            if zlib.crc32(trozo) != crc:
+                trozo.release()
+                raise ErrorFormato(f"Columna dañada (byte {inicio} del cuerpo)")
+            self._verificadas.add(inicio)
+        if crudo is not None:
+            try:
+                datos = zlib.decompress(trozo)
+            except zlib.error as e:
+                raise ErrorFormato(f"Columna ilegible (byte {inicio} del cuerpo): {e}") from e
+            finally:
+                trozo.release()
+            if len(datos) != crudo:
+                raise ErrorFormato(f"Columna con un tamaño distinto del anotado (byte {inicio} del cuerpo)")
+            # La columna descomprimida es suya: no hace falta soltarla al cerrar
+            trozo = memoryview(datos)
+        elif propia:
+            arr = array(typecode)
+            arr.frombytes(trozo)
+            trozo.release()
+            return _nativo(arr)
+        else:
+            self._vistas.append(trozo)
+        if sys.byteorder != 'little':
+            arr = array(typecode)
+            arr.frombytes(trozo)
+            arr.byteswap()
+            return arr
+        col = trozo.cast(typecode)
+        if crudo is None:
+            self._vistas.append(col)
+        return col
+
+    def filas(self, tabla: str) -> int:
+        return self.directorio[tabla][0]
+
+    def columna(self, tabla: str, campo: str, propia: bool = False):
+        """Valores de Python de una columna (una vista, o una lista si hay textos o máscara).
+        Con propia=True, un array que no depende del buffer en vez de una vista."""
+        campos = self.directorio[tabla][1]
+        col = self._cruda(campos[campo], propia)
+        if campos[campo][0] == 'I':
+            textos = self.textos
+            return [textos[i] for i in col]
+        mascara = campos.get(campo + '#int')
+        if mascara is not None:
+            return [int(v) if e else v for v, e in zip(col, self._cruda(mascara))]
+        return col
+
+    def tabla(self, tabla: str, propia: bool = False) -> Dict[str, Any]:
+        return {campo: self.columna(tabla, campo, propia)
+                for campo in self.directorio[tabla][1] if not campo.endswith('#int')}
+
+    def cerrar(self):
+        """Soltar las vistas (un mmap no se puede cerrar con vistas vivas)."""
+        for v in reversed(self._vistas):
+            if isinstance(v, memoryview):
+                v.release()
+        self._vistas = []
+
+def _decodificar(cuerpo: bytes) -> Tuple[dict, Dict[str, Dict[str, list]]]:
+    """(meta, tablas) con cada columna como lista de valores de Python."""
+    columnas = _Columnas(memoryview(cuerpo))
+    try:
+        tablas = {nombre: {campo: list(valores) for campo, valores in columnas.tabla(nombre).items()}
+                  for nombre in columnas.directorio if nombre != 'meta'}
+    finally:
+        columnas.cerrar()
+    return columnas.meta, tablas
+
+def _valores(objetos: list, campos: Tuple[str, ...]) -> Dict[str, list]:
+    return {campo: [getattr(o, campo) for o in objetos] for campo in campos}
+
+def serializar(eco: Ecosistema) -> dict:
+    """Copiar el estado a columnas de valores (en el hilo del juego).
+    Guarda también las listas de entidades: el diario las usa para saber qué
+    entidades siguen, cuáles son nuevas y cuáles se fueron desde el guardado anterior.
+    """
+    animales = list(eco.animales)
+    plantas = list(eco.plantas)
+    indice_animal = {id(a): i for i, a in enumerate(animales)}
+    indice_planta = {id(p): i for i, p in enumerate(plantas)}
+    columnas_animal = {'clase': [type(a).__name__ for a in animales]}
+    columnas_animal.update(_valores(animales, CAMPOS_ANIMAL))
+    tablas = {
+        'animales': columnas_animal,
+        'plantas': _valores(plantas, CAMPOS_PLANTA),
+        'cadaveres': _valores(eco.cadaveres, CAMPOS_CADAVER),
+        # Marcados para remover, en orden de marcado (índices en animales / plantas)
+        'marcas_animales': {'i': [indice_animal[id(a)] for a in eco._rem_anim.values()]},
+        'marcas_plantas': {'i': [indice_planta[id(p)] for p in eco._rem_pla.values()]},
+    }
+    meta = {
+        'ciclo': eco.ciclo,
+        'width': eco.width,
+        'height': eco.height,
+        'max_animales': eco.max_animales,
+        'min_plantas': eco.min_plantas,
+        'max_plantas': eco.max_plantas,
+        'limites_especie': dict(eco.limites_especie),
+        'especie_clase': {k: c.__name__ for k, c in eco.especie_clase.items()},
+        'jugador': indice_animal.get(id(eco.jugador), -1),
+    }
+    return {
+        'resumen': (eco.ciclo, len(animales), len(plantas), len(eco.cadaveres), eco.total_vivos, eco.plantas_vivas),
+        'meta': meta,
+        'tablas': tablas,
+        'objetos': {'animales': animales, 'plantas': plantas},
+    }
+
+def empaquetar(serializado: dict, comprimir: bool = True, nivel: int = 1) -> bytes:
+    """Cabecera + cuerpo (con las columnas que lo merecen comprimidas con zlib si se
+    pide); puede ir en otro hilo."""
+    cuerpo, n_directorio, n_crudo = _codificar(serializado['meta'], serializado['tablas'], comprimir, nivel)
+    cabecera = CABECERA.pack(MAGIA, VERSION_FORMATO, FLAG_ZLIB if comprimir else 0,
+                             SIM_VERSION.encode()[:16], *serializado['resumen'],
+                             len(cuerpo), n_crudo, zlib.crc32(memoryview(cuerpo)[:n_directorio]))
+    return cabecera + cuerpo
+
+def leer_cabecera(datos: bytes) -> dict:
+    """Cabecera de un guardado binario sin decodificar el cuerpo."""
+    if len(datos) < CABECERA.size or not es_binario(datos):
+        raise ErrorFormato("No es un guardado binario")
+    (_, formato, flags, version, ciclo, n_animales, n_plantas, n_cadaveres, vivos, plantas_vivas,
+     n_cuerpo, n_crudo, crc) = CABECERA.unpack_from(datos)
+    return {
+        'formato': formato,
+        'comprimido': bool(flags & FLAG_ZLIB),
+        'version_simulador': version.rstrip(b'\0').decode(),
+        'ciclo': ciclo,
+        'num_animales': n_animales,
+        'num_plantas': n_plantas,
+        'num_cadaveres': n_cadaveres,
+        'animales_vivos': vivos,
+        'plantas_vivas': plantas_vivas,
+        'bytes_cuerpo': n_cuerpo,
+        'bytes_crudo': n_crudo,
+        'crc32': crc,
+    }
+
+# --- Diario de cambios ---
+
+def diferencia(anterior: dict, actual: dict) -> dict | None:
+    """Cambios de 'anterior' a 'actual' (dos resultados de serializar()).
+    Por tabla de entidades: bajas ('<tabla>-', filas de 'anterior'), altas
+    ('<tabla>+', al final) y valores cambiados ('<tabla>~<campo>', filas de las que
+    siguen, o la columna entera de las que siguen si cambió casi toda). Las tablas pequeñas van enteras. None si el orden de las entidades no
+    se puede expresar así (hace falta un checkpoint).
+    """
+    tablas = {}
+    for nombre in TABLAS_DIFERENCIALES:
+        previos = anterior['objetos'][nombre]
+        posicion = {id(o): i for i, o in enumerate(previos)}
+        filas = [posicion.get(id(o), -1) for o in actual['objetos'][nombre]]
+        # Las que siguen conservan su orden relativo y las nuevas van al final
+        n_siguen = 0
+        while n_siguen < len(filas) and filas[n_siguen] >= 0:
+            n_siguen += 1
+        siguen = filas[:n_siguen]
+        if any(f >= 0 for f in filas[n_siguen:]) or any(b <= a for a, b in zip(siguen, siguen[1:])):
+            return None
+        quedan = set(siguen)
+        tablas[nombre + '-'] = {'i': [i for i in range(len(previos)) if i not in quedan]}
+        columnas = actual['tablas'][nombre]
+        tablas[nombre + '+'] = {campo: valores[n_siguen:] for campo, valores in columnas.items()}
+        for campo, valores in columnas.items():
+            antes = anterior['tablas'][nombre][campo]
+            if len(antes) != n_siguen:
+                antes = [antes[f] for f in siguen]
+            cambios = list(compress(count(), map(ne, antes, valores)))
+            # Un int que pasa a float igual (100 -> 100.0) también es un cambio
+            tipos_antes = list(map(type, antes))
+            tipos = list(map(type, valores[:n_siguen]))
+            if tipos_antes != tipos:
+                cambios = sorted(set(cambios).union(compress(count(), map(is_not, tipos_antes, tipos))))
+            if len(cambios) * 2 > n_siguen:
+                # Casi todas cambiaron (posiciones, edad): la columna entera sin índices
+                tablas[f'{nombre}~{campo}'] = {'v': valores[:n_siguen]}
+            elif cambios:
+                tablas[f'{nombre}~{campo}'] = {'i': cambios, 'v': [valores[k] for k in cambios]}
+    for nombre, columnas in actual['tablas'].items():
+        if nombre not in TABLAS_DIFERENCIALES:
+            tablas[nombre] = columnas
+    return {'meta': actual['meta'], 'tablas': tablas}
+
+def registro_diario(delta: dict, cadena: int, nivel: int = 1) -> bytes:
+    """Registro listo para añadir al diario del checkpoint con crc 'cadena'."""
+    cuerpo = _codificar(delta['meta'], delta['tablas'], True, nivel)[0]
+    return REGISTRO.pack(MAGIA_DIARIO, VERSION_FORMATO, cadena, len(cuerpo), zlib.crc32(cuerpo)) + cuerpo
+
+def leer_diario(datos: bytes, cadena: int) -> Tuple[List[bytes], int]:
+    """Cuerpos de los registros válidos de 'cadena' y bytes que ocupan.
+    Se para en el primer registro incompleto, dañado, de otro checkpoint o de otro formato."""
+    registros = []
+    pos = 0
+    while pos + REGISTRO.size <= len(datos):
+        magia, formato, de, n, crc = REGISTRO.unpack_from(datos, pos)
+        inicio = pos + REGISTRO.size
+        cuerpo = datos[inicio:inicio + n]
+        if (magia != MAGIA_DIARIO or formato != VERSION_FORMATO or de != cadena
+                or len(cuerpo) != n or zlib.crc32(cuerpo) != crc):
+            break
+        registros.append(cuerpo)
+        pos = inicio + n
+    return registros, pos
+
+def _aplicar(tablas: Dict[str, Dict[str, Any]], registro: bytes) -> dict:
+    """Aplicar un registro del diario (de leer_diario()) a las tablas; devuelve su meta.
+    Las columnas de las tablas que cambian se pasan a listas si aún no lo son."""
+    meta, delta = _decodificar(registro)
+    for nombre in TABLAS_DIFERENCIALES:
+        columnas = tablas[nombre]
+        bajas = set(delta[nombre + '-']['i'])
+        if bajas:
+            columnas = {campo: [v for i, v in enumerate(valores) if i not in bajas]
+                        for campo, valores in columnas.items()}
+        else:
+            columnas = {campo: v if isinstance(v, list) else list(v) for campo, v in columnas.items()}
+        prefijo = nombre + '~'
+        for clave, cambios in delta.items():
+            if clave.startswith(prefijo):
+                valores = columnas[clave[len(prefijo):]]
+                if 'i' not in cambios:
+                    valores[:len(cambios['v'])] = cambios['v']
+                    continue
+                for i, v in zip(cambios['i'], cambios['v']):
+                    valores[i] = v
+        for campo, altas in delta[nombre + '+'].items():
+            columnas[campo].extend(altas)
+        tablas[nombre] = columnas
+    for nombre, columnas in delta.items():
+        if nombre in tablas and nombre not in TABLAS_DIFERENCIALES:
+            tablas[nombre] = columnas
+    return meta
+
+# --- Reconstrucción ---
+
+def _crear(clases: list, columnas: Dict[str, list], campos) -> list:
+    objetos = [cls.__new__(cls) for cls in clases]
+    for campo in campos:
+        valores = columnas.get(campo)
+        if valores is None:
+            continue
+        for o, v in zip(objetos, valores):
+            setattr(o, campo, v)
+    return objetos
+
+def _construir(meta: dict, tablas: Dict[str, Dict[str, list]]) -> Ecosistema:
+    cols = tablas['animales']
+    animales = _crear([CLASES_ANIMAL[c] for c in cols['clase']], cols, CAMPOS_ANIMAL)
+    cols = tablas['plantas']
+    plantas = _crear([Planta] * len(cols['nombre']), cols, CAMPOS_PLANTA)
+    cols = tablas['cadaveres']
+    cadaveres = _crear([Cadaver] * len(cols['x']), cols, CAMPOS_CADAVER)
+
+    estado: Dict[str, Any] = {k: meta[k] for k in ('ciclo', 'width', 'height', 'max_animales',
+                                                    'min_plantas', 'max_plantas', 'limites_especie')}
+    estado.update({
+        'animales': animales,
+        'plantas': plantas,
+        'cadaveres': cadaveres,
+        '_rem_anim': [animales[i] for i in tablas['marcas_animales']['i']],
+        '_rem_pla': [plantas[i] for i in tablas['marcas_plantas']['i']],
+        'jugador': animales[meta['jugador']] if meta['jugador'] >= 0 else None,
+        'especie_clase': {k: CLASES_ANIMAL[v] for k, v in meta['especie_clase'].items()},
+    })
+    eco = Ecosistema.__new__(Ecosistema)
+    eco.__setstate__(estado)
+    return eco
+
+class GuardadoMapeado:
+    """Guardado binario abierto sobre un buffer (bytes o mmap) sin copiarlo.
+    La cabecera se lee al abrir y el directorio del cuerpo al pedir la primera
+    columna; cada columna se lee, se comprueba y se descomprime al pedirla. Con
+    un mmap solo se leen del disco las páginas de las columnas que se usan, y
+    las que no van comprimidas se quedan en el mapa, sin copiarse.
+    """
+
+    def __init__(self, buffer):
+        self._vista = memoryview(buffer)
+        self.cabecera = leer_cabecera(self._vista)
+        if self.cabecera['formato'] != VERSION_FORMATO:
+            self._vista.release()
+            raise ErrorFormato(f"Formato de guardado {self.cabecera['formato']} no soportado ({VERSION_FORMATO})")
+        self._cuerpo: memoryview | None = None
+        self._columnas: _Columnas | None = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
+
+    def verificar(self):
+        """Comprobar que el cuerpo está entero. El directorio se comprueba al abrirlo
+        y cada columna la primera vez que se lee."""
+        if len(self._vista) < CABECERA.size + self.cabecera['bytes_cuerpo']:
+            raise ErrorFormato("Guardado truncado o dañado")
+
+    @property
+    def columnas(self) -> _Columnas:
+        if self._columnas is None:
+            cab = self.cabecera
+            cuerpo = self._vista[CABECERA.size:CABECERA.size + cab['bytes_cuerpo']]
+            self._cuerpo = cuerpo
+            if len(cuerpo) != cab['bytes_cuerpo']:
+                raise ErrorFormato("Guardado truncado o dañado")
+            n_directorio = _U32.unpack_from(cuerpo)[0] if len(cuerpo) >= _U32.size else 0
+            if n_directorio > len(cuerpo):
+                raise ErrorFormato("Guardado truncado o dañado")
+            with cuerpo[:n_directorio] as directorio:
+                if zlib.crc32(directorio) != cab['crc32']:
+                    raise ErrorFormato("Directorio del guardado dañado")
+            self._columnas = _Columnas(cuerpo)
+        return self._columnas
+
+    def especies(self) -> Dict[str, int]:
+        """Animales por especie leyendo solo la columna de clases."""
+        conteo: Dict[str, int] = {}
+        for clase in self.columnas.columna('animales', 'clase'):
+            conteo[clase] = conteo.get(clase, 0) + 1
+        return conteo
+
+    def cerrar(self):
+        """Soltar las vistas sobre el buffer (antes de cerrar el mmap)."""
+        if self._columnas is not None:
+            self._columnas.cerrar()
+        if self._cuerpo is not None:
+            self._cuerpo.release()
+        self._vista.release()
+
+def _cargar(datos, registros: List[bytes] | None, con_base: bool) -> Tuple[Ecosistema, dict | None]:
+    with GuardadoMapeado(datos) as guardado:
+        guardado.verificar()
+        columnas = guardado.columnas
+        meta = dict(columnas.meta)
+        nombres = [n for n in columnas.directorio if n != 'meta']
+        # Sin diario ni base, las entidades se crean directamente de las vistas de las
+        # columnas. Si no, las columnas se copian a arrays propios (el buffer se suelta
+        # al volver); solo pasan a listas las tablas a las que se aplica un registro
+        propias = bool(registros) or con_base
+        tablas = {n: columnas.tabla(n, propias) for n in nombres}
+        if not propias:
+            return _construir(meta, tablas), None
+    for registro in registros or ():
+        meta = _aplicar(tablas, registro)
+    eco = _construir(meta, tablas)
+    base = None
+    if con_base:
+        base = {'meta': meta, 'tablas': tablas,
+                'objetos': {'animales': list(eco.animales), 'plantas': list(eco.plantas)}}
+    return eco, base
+
+def desempaquetar(datos, registros: List[bytes] | None = None) -> Ecosistema:
+    """Reconstruir el Ecosistema de un guardado binario (bytes o mmap) y aplicarle
+    los registros del diario (los de leer_diario() para su crc)."""
+    return _cargar(datos, registros, False)[0]
+
+def desempaquetar_con_base(datos, registros: List[bytes] | None = None) -> Tuple[Ecosistema, dict]:
+    """Como desempaquetar(), y además lo cargado en la forma de serializar(): la base
+    del próximo registro del diario sin volver a recorrer las entidades."""
+    return _cargar(datos, registros, True)
@@ -0,0 +1,276 @@
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usa la IA por animal
+    np = None
+
+from modelo import (
+    TRexJugador,
+    SPEED_FLEE, SPEED_CHASE, SPEED_SEEK_PLANT, SPEED_PATROL,
+    SPEED_SEEK_CORPSE, HUNGER_THRESHOLD,
+)
+from vista import MARGIN_TOP
+
+"""
+IA POR LOTES (opcional, requiere NumPy)
+Calcula en una sola pasada vectorizada, para todos los animales de cada dieta,
+la huida del jugador, el objetivo más cercano y el desplazamiento. Mantiene las
+prioridades de la IA por animal: cadáver, luego buscar comida o cazar con
+hambre, y si no patrullar. Comer y atacar se aplican después, uno a uno, solo
+para los animales que quedaron al alcance de su objetivo.
+"""
+
+# Código numérico de la dieta
+DIETAS = ('herbivoro', 'carnivoro', 'omnivoro')
+HERB, CARN, OMNI = (DIETAS.index('herbivoro'), DIETAS.index('carnivoro'), DIETAS.index('omnivoro'))
+
+# Por debajo de este número de objetivos se usa la matriz de distancias completa
+LOTE_MIN_REJILLA = 64
+# Tamaño máximo (elementos) de cada bloque de la matriz de distancias
+LOTE_BLOQUE = 1 << 20
+
+def disponible() -> bool:
+    return np is not None
+
+def agrupar_posiciones(x, y, esp, vivos, width, height, paso: float = 0.6, umbral: float = 25.0):
+    """Acercar a su centroide de especie (esp) a los vivos a más de 'umbral'. Modifica x, y
+    y devuelve la máscara de los que se movieron."""
+    if len(x) == 0:
+        return np.zeros(0, dtype=bool)
+    k = int(esp.max()) + 1
+    cnt = np.bincount(esp[vivos], minlength=k)
+    sx = np.bincount(esp[vivos], weights=x[vivos], minlength=k)
+    sy = np.bincount(esp[vivos], weights=y[vivos], minlength=k)
+    cnt_safe = np.maximum(cnt, 1)
+    dxg = (sx / cnt_safe)[esp] - x
+    dyg = (sy / cnt_safe)[esp] - y
+    dg = np.hypot(dxg, dyg)
+    mover = vivos & (dg > umbral)
+    x[mover] += paso * dxg[mover] / dg[mover]
+    y[mover] += paso * dyg[mover] / dg[mover]
+    np.clip(x, 0, width, out=x)
+    np.clip(y, 0, height, out=y)
+    return mover
+
+def mas_cercano(qx, qy, tx, ty):
+    """Para cada consulta (qx, qy), índice del objetivo (tx, ty) más cercano y su distancia².
+
+    Devuelve (-1, inf) para todas si no hay objetivos.
+    """
+    m = len(qx)
+    k = len(tx)
+    idx = np.full(m, -1, dtype=np.int64)
+    d2 = np.full(m, np.inf)
+    if m == 0 or k == 0:
+        return idx, d2
+    if k < LOTE_MIN_REJILLA:
+        paso = max(1, LOTE_BLOQUE // k)
+        for i in range(0, m, paso):
+            dx = qx[i:i+paso, None] - tx[None, :]
+            dy = qy[i:i+paso, None] - ty[None, :]
+            dd = dx*dx + dy*dy
+            j = dd.argmin(axis=1)
+            idx[i:i+paso] = j
+            d2[i:i+paso] = dd[np.arange(len(j)), j]
+        return idx, d2
+    return _mas_cercano_rejilla(qx, qy, tx, ty, idx, d2)
+
+def _mas_cercano_rejilla(qx, qy, tx, ty, idx, d2):
+    # Rejilla con ~1 objetivo por celda; se recorren anillos de celdas alrededor
+    # de todas las consultas a la vez hasta que ninguna pueda mejorar.
+    x0 = min(qx.min(), tx.min())
+    y0 = min(qy.min(), ty.min())
+    ancho = max(qx.max(), tx.max()) - x0 + 1
+    alto = max(qy.max(), ty.max()) - y0 + 1
+    celda = max(8.0, math.sqrt(ancho * alto / len(tx)))
+    ncx = int(ancho // celda) + 1
+    ncy = int(alto // celda) + 1
+    tcx = ((tx - x0) // celda).astype(np.int64)
+    tcy = ((ty - y0) // celda).astype(np.int64)
+    cid = tcy * ncx + tcx
+    orden = np.argsort(cid, kind='stable')
+    cuenta = np.bincount(cid, minlength=ncx * ncy)
+    inicio = np.cumsum(cuenta) - cuenta
+    qcx = ((qx - x0) // celda).astype(np.int64)
+    qcy = ((qy - y0) // celda).astype(np.int64)
+    activas = np.arange(len(qx))
+    for k in range(max(ncx, ncy) + 1):
+        if k > 1:
+            cota = ((k - 1) * celda) ** 2
+            activas = activas[d2[activas] > cota]
+        if len(activas) == 0:
+            break
+        if k == 0:
+            ox = np.zeros(1, dtype=np.int64)
+            oy = np.zeros(1, dtype=np.int64)
+        else:
+            r = np.arange(-k, k + 1)
+            lado = np.arange(-k + 1, k)
+            ox = np.concatenate([r, r, np.full(len(lado), -k), np.full(len(lado), k)])
+            oy = np.concatenate([np.full(len(r), -k), np.full(len(r), k), lado, lado])
+        cx = qcx[activas, None] + ox[None, :]
+        cy = qcy[activas, None] + oy[None, :]
+        dentro = (cx >= 0) & (cx < ncx) & (cy >= 0) & (cy < ncy)
+        q = np.broadcast_to(activas[:, None], cx.shape)[dentro]
+        c = (cy * ncx + cx)[dentro]
+        n = cuenta[c]
+        hay = n > 0
+        q, c, n = q[hay], c[hay], n[hay]
+        if len(q) == 0:
+            continue
+        # Expandir cada (consulta, celda) a sus objetivos
+        q = np.repeat(q, n)
+        desde = np.repeat(inicio[c] - (np.cumsum(n) - n), n)
+        cand = orden[desde + np.arange(len(q))]
+        dx = qx[q] - tx[cand]
+        dy = qy[q] - ty[cand]
+        dd = dx*dx + dy*dy
+        np.minimum.at(d2, q, dd)
+        gana = dd == d2[q]
+        idx[q[gana]] = cand[gana]
+    return idx, d2
+
+class IALotes:
+    """Paso de IA vectorizado para todos los animales no jugadores."""
+
+    def __init__(self, controlador):
+        if np is None:
+            raise ImportError("La IA por lotes requiere NumPy")
+        self.ctrl = controlador
+        # Generador propio sembrado desde 'random' para que --seed sea reproducible
+        self.rng = np.random.default_rng(random.getrandbits(64))
+
+    def paso(self):
+        eco = self.ctrl.ecosistema
+        jugador = eco.jugador
+        objs = [a for a in eco.animales if a is not jugador and a.esta_vivo()]
+        n = len(objs)
+        for a in objs:
+            # Muerte natural por energía
+            if a.energia <= 0:
+                a.morir()
+                eco.marcar_para_remover(a)
+        x = np.array([a.x for a in objs], dtype=float)
+        y = np.array([a.y for a in objs], dtype=float)
+        energia = np.array([a.energia for a in objs], dtype=float)
+        vivos = energia > 0
+        dieta = np.array([DIETAS.index(a.tipo) if a.tipo in DIETAS else -1 for a in objs], dtype=np.int8)
+        especies = {}
+        esp = np.array([especies.setdefault(type(a).__name__, len(especies)) for a in objs], dtype=np.int64)
+        agrupar_posiciones(x, y, esp, vivos, eco.width, eco.height, 0.6, 25)
+        if n == 0:
+            return
+
+        # Umbrales como en la IA por animal: herbívoros/omnívoros '<', carnívoros '<='
+        hambre = np.where(dieta == CARN, energia <= HUNGER_THRESHOLD, energia < HUNGER_THRESHOLD)
+        herb = vivos & (dieta == HERB)
+        carroneros = vivos & ((dieta == CARN) | (dieta == OMNI))
+        ceros = np.zeros(n)
+
+        # Herbívoros: huir del jugador si está a menos de 120 px
+        huyen = np.zeros(n, dtype=bool)
+        if jugador is not None:
+            dxj = x - jugador.x
+            dyj = y - jugador.y
+            huyen = herb & (dxj*dxj + dyj*dyj < 120*120)
+            self._mover(x, y, huyen, dxj, dyj, SPEED_FLEE)
+
+        # Carnívoros y omnívoros: prioridad absoluta al cadáver (comer o acercarse)
+        con_cadaver = np.zeros(n, dtype=bool)
+        cadaveres = [cd for cd in eco.cadaveres if cd.eaten < 1.0]
+        if cadaveres and carroneros.any():
+            cxs = np.array([cd.x for cd in cadaveres], dtype=float)
+            cys = np.array([cd.y for cd in cadaveres], dtype=float)
+            qi = np.flatnonzero(carroneros)
+            j, d2 = mas_cercano(x[qi], MARGIN_TOP + y[qi], cxs, cys)
+            con_cadaver[qi] = True
+            lejos = qi[d2 >= 36*36]
+            jl = j[d2 >= 36*36]
+            buscan = np.zeros(n, dtype=bool)
+            buscan[lejos] = True
+            dx = ceros.copy()
+            dy = ceros.copy()
+            dx[lejos] = cxs[jl] - x[lejos]
+            dy[lejos] = cys[jl] - (MARGIN_TOP + y[lejos])
+            self._mover(x, y, buscan, dx, dy, SPEED_SEEK_CORPSE)
+
+        libres = vivos & ~huyen & ~con_cadaver
+        patrulla = libres & ~hambre
+
+        # Con hambre: herbívoros y omnívoros buscan la planta más cercana
+        comen_planta = []
+        buscan_planta = libres & hambre & ((dieta == HERB) | (dieta == OMNI))
+        if buscan_planta.any():
+            plantas = [p for p in eco.plantas if p.vida > 0]
+            if plantas:
+                qi = np.flatnonzero(buscan_planta)
+                pxs = np.array([p.x for p in plantas], dtype=float)
+                pys = np.array([p.y for p in plantas], dtype=float)
+                j, _ = mas_cercano(x[qi], y[qi], pxs, pys)
+                dx = ceros.copy()
+                dy = ceros.copy()
+                dx[qi] = pxs[j] - x[qi]
+                dy[qi] = pys[j] - y[qi]
+                self._mover(x, y, buscan_planta, dx, dy, SPEED_SEEK_PLANT)
+                ddx = pxs[j] - x[qi]
+                ddy = pys[j] - y[qi]
+                al_alcance = ddx*ddx + ddy*ddy < 16*16
+                comen_planta = [(objs[i], plantas[k]) for i, k in zip(qi[al_alcance], j[al_alcance])]
+            else:
+                # Sin comida los herbívoros vagan; los omnívoros se quedan quietos
+                patrulla |= buscan_planta & (dieta == HERB)
+
+        # Con hambre: carnívoros cazan la presa (herbívoro u omnívoro) más cercana
+        ataques = []
+        cazan = libres & hambre & (dieta == CARN)
+        presas = np.flatnonzero(vivos & ((dieta == HERB) | (dieta == OMNI)))
+        if cazan.any() and len(presas):
+            qi = np.flatnonzero(cazan)
+            j, _ = mas_cercano(x[qi], y[qi], x[presas], y[presas])
+            objetivo = presas[j]
+            dx = ceros.copy()
+            dy = ceros.copy()
+            dx[qi] = x[objetivo] - x[qi]
+            dy[qi] = y[objetivo] - y[qi]
+            self._mover(x, y, cazan, dx, dy, SPEED_CHASE)
+            ddx = x[objetivo] - x[qi]
+            ddy = y[objetivo] - y[qi]
+            al_alcance = ddx*ddx + ddy*ddy < 22*22
+            ataques = [(objs[i], objs[k]) for i, k in zip(qi[al_alcance], objetivo[al_alcance])]
+
+        # Saciados: patrullar
+        m = int(patrulla.sum())
+        if m:
+            x[patrulla] += self.rng.uniform(-SPEED_PATROL, SPEED_PATROL, m)
+            y[patrulla] += self.rng.uniform(-SPEED_PATROL, SPEED_PATROL, m)
+        np.clip(x, 0, eco.width, out=x)
+        np.clip(y, 0, eco.height, out=y)
+
+        # Volcar posiciones y actualizar el índice espacial
+        for i, a in enumerate(objs):
+            a.x = float(x[i])
+            a.y = float(y[i])
+        for a in objs:
+            eco.reubicar(a)
+
+        # Efectos uno a uno, en el mismo orden de prioridad que la IA por animal
+        ctrl = self.ctrl
+        for i in np.flatnonzero(con_cadaver):
+            ctrl._ai_comer_cadaver(objs[i])
+        for a, planta in comen_planta:
+            if planta.vida > 0:
+                a.comer(planta, eco)
+        for a, presa in ataques:
+            if a.esta_vivo() and presa.esta_vivo() and not isinstance(presa, TRexJugador):
+                ctrl._intentar_ataque(a, presa)
+
+    def _mover(self, x, y, mascara, dx, dy, velocidad):
+        """Desplazar a 'velocidad' en la dirección (dx, dy) a los seleccionados por la máscara."""
+        if velocidad == 0 or not mascara.any():
+            return
+        d = np.hypot(dx[mascara], dy[mascara])
+        d[d == 0] = 1
+        x[mascara] += velocidad * dx[mascara] / d
+        y[mascara] += velocidad * dy[mascara] / d
@@ -0,0 +1,127 @@
+import json
+import time
+from collections import deque
+from typing import Dict, List
+
+"""
+MÉTRICAS DE TIEMPO POR FASE
+Mide cuánto tarda cada fase del bucle principal (paso, IA, colisiones,
+autoguardado, render) en cada frame, mantiene percentiles
+p50/p95/p99 sobre una ventana móvil y opcionalmente vuelca cada frame a un
+archivo CSV o JSON-lines para analizarlo después.
+Desactivado, medir() devuelve un contexto vacío compartido.
+"""
+
+FASES_FRAME = ['paso', 'ia', 'colisiones', 'autosave', 'render']
+
+class _ContextoNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULO = _ContextoNulo()
+
+class _Cronometro:
+    __slots__ = ('medidor', 'fase', 'inicio')
+
+    def __init__(self, medidor: 'MedidorFases', fase: str):
+        self.medidor = medidor
+        self.fase = fase
+        self.inicio = 0.0
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.medidor.acumulado[self.fase] += time.perf_counter() - self.inicio
+        return False
+
+class MedidorFases:
+    """Tiempos por fase y frame con percentiles móviles y volcado opcional."""
+
+    def __init__(self, fases: List[str] = FASES_FRAME, ventana: int = 240, activo: bool = False,
+                 ruta_registro: str | None = None, refresco: int = 30):
+        self.fases = list(fases)
+        self.activo = activo
+        self.ventana = ventana
+        self.refresco = refresco  # frames entre recálculos de percentiles
+        self.acumulado: Dict[str, float] = {f: 0.0 for f in self.fases}
+        self.historial: Dict[str, deque] = {f: deque(maxlen=ventana) for f in self.fases}
+        self._cronos = {f: _Cronometro(self, f) for f in self.fases}
+        self._percentiles: Dict[str, tuple] = {}
+        self.frames = 0
+        self.ruta_registro = ruta_registro
+        self._archivo = None
+
+    def alternar(self) -> bool:
+        self.activo = not self.activo
+        if not self.activo:
+            for f in self.fases:
+                self.acumulado[f] = 0.0
+        return self.activo
+
+    def medir(self, fase: str):
+        """Contexto que suma el tiempo de 'fase' al frame actual."""
+        if not self.activo:
+            return _NULO
+        return self._cronos[fase]
+
+    def fin_frame(self):
+        """Cerrar el frame: pasar los acumulados a la ventana y al registro."""
+        if not self.activo:
+            return
+        self.frames += 1
+        for f in self.fases:
+            self.historial[f].append(self.acumulado[f])
+        if self.ruta_registro:
+            self._registrar()
+        for f in self.fases:
+            self.acumulado[f] = 0.0
+        if self.frames % self.refresco == 0:
+            self._percentiles = {}
+
+    def percentiles(self, fase: str) -> tuple:
+        """(p50, p95, p99) en milisegundos sobre la ventana móvil."""
+        res = self._percentiles.get(fase)
+        if res is None:
+            valores = sorted(self.historial[fase])
+            if not valores:
+                res = (0.0, 0.0, 0.0)
+            else:
+                n = len(valores)
+                res = tuple(valores[min(n - 1, int(n * q))] * 1000 for q in (0.50, 0.95, 0.99))
+            self._percentiles[fase] = res
+        return res
+
+    def texto_hud(self) -> str:
+        partes = []
+        for f in self.fases:
+            p50, p95, p99 = self.percentiles(f)
+            partes.append(f"{f} {p50:.1f}/{p95:.1f}/{p99:.1f}")
+        return "ms p50/p95/p99: " + " | ".join(partes)
+
+    def _registrar(self):
+        if self._archivo is None:
+            self._archivo = open(self.ruta_registro, 'w', buffering=1 << 16)
+            if not self._es_jsonl():
+                self._archivo.write("frame,t," + ",".join(f"{f}_ms" for f in self.fases) + "\n")
+        ms = [self.acumulado[f] * 1000 for f in self.fases]
+        if self._es_jsonl():
+            fila = {'frame': self.frames, 't': time.time()}
+            fila.update({f: round(v, 4) for f, v in zip(self.fases, ms)})
+            self._archivo.write(json.dumps(fila) + "\n")
+        else:
+            self._archivo.write(f"{self.frames},{time.time():.3f}," + ",".join(f"{v:.4f}" for v in ms) + "\n")
+
+    def _es_jsonl(self) -> bool:
+        return self.ruta_registro.endswith(('.jsonl', '.json'))
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
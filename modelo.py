@@ -1,5 +1,7 @@
 import random
-from typing import List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
+
+from muestreo import MuestreoPoisson
 
 """
 CAPA DE LÓGICA (Modelo)
@@ -26,6 +28,8 @@ HUNGER_THRESHOLD = 50  # si la energía es menor al 50%, buscará comida/cazar
 REST_ENERGY_DECAY = 0.015  # gasto de energía al deambular sin hambre
 EAT_DURATION_TICKS = 400  # ~16 segundos a 0.04s por tick lógico
 ENERGY_DECAY_TICKS = 13  # cada ~0.52s reducir 1 de energía a todos
+CADAVER_VIDA_TICKS = 625  # ~25 s: un cadáver no comido desaparece
+CADAVER_CALAVERA_TICKS = 38  # ~1.5 s mostrando la calavera tras la muerte
 
 # Velocidades de comportamiento
 SPEED_FLEE = 2.0          # huir del jugador
@@ -34,7 +38,178 @@ SPEED_SEEK_PLANT = 1.3    # acercarse a plantas
 SPEED_PATROL = 0.5        # patrullar (más lento)
 SPEED_SEEK_CORPSE = 1.5   # ir hacia cadáver
 
+# Índice espacial: tamaño de celda (px) de la rejilla uniforme
+INDICE_CELDA = 64
+INDICE_MIN_LINEAL = 48  # por debajo de este número de entradas se recorre linealmente
+
+# Depuración: comprobar en cada paso los contadores de población contra un recuento completo
+# y que la limpieza no deje muertos sin marcar en las listas
+DEPURAR_CONTADORES = False
+
+class IndiceEspacial:
+    """Rejilla uniforme (spatial hash) de entidades por tipo ('animal', 'planta', 'cadaver').
+
+    Cada entrada guarda la última posición registrada; quien mueva una entidad
+    debe avisar con mover() para que las consultas sigan siendo exactas.
+    """
+    def __init__(self, width: int, height: int, celda: int = INDICE_CELDA):
+        self.celda = celda
+        self.max_cx = int(width) // celda
+        self.max_cy = int(height) // celda
+        # tipo -> celda -> id(obj) -> entrada [obj, x, y, tipo, celda]
+        self._celdas: Dict[str, Dict[Tuple[int, int], Dict[int, list]]] = {}
+        self._entradas: Dict[int, list] = {}
+        self._por_tipo: Dict[str, Dict[int, list]] = {}
+
+    def _clave(self, x, y) -> Tuple[int, int]:
+        return (int(x) // self.celda, int(y) // self.celda)
+
+    def insertar(self, tipo: str, obj: Any, x, y):
+        if id(obj) in self._entradas:
+            self.mover(obj, x, y)
+            return
+        clave = self._clave(x, y)
+        entrada = [obj, x, y, tipo, clave]
+        self._entradas[id(obj)] = entrada
+        self._por_tipo.setdefault(tipo, {})[id(obj)] = entrada
+        self._celdas.setdefault(tipo, {}).setdefault(clave, {})[id(obj)] = entrada
+
+    def quitar(self, obj: Any):
+        entrada = self._entradas.pop(id(obj), None)
+        if entrada is None:
+            return
+        del self._por_tipo[entrada[3]][id(obj)]
+        cubeta = self._celdas[entrada[3]].get(entrada[4])
+        if cubeta is not None:
+            cubeta.pop(id(obj), None)
+            if not cubeta:
+                del self._celdas[entrada[3]][entrada[4]]
+
+    def mover(self, obj: Any, x, y):
+        entrada = self._entradas.get(id(obj))
+        if entrada is None:
+            return
+        entrada[1] = x
+        entrada[2] = y
+        clave = self._clave(x, y)
+        if clave != entrada[4]:
+            celdas = self._celdas[entrada[3]]
+            cubeta = celdas[entrada[4]]
+            del cubeta[id(obj)]
+            if not cubeta:
+                del celdas[entrada[4]]
+            entrada[4] = clave
+            celdas.setdefault(clave, {})[id(obj)] = entrada
+
+    def nearest(self, tipo: str, x, y, radius: float | None = None,
+                predicate: Callable[[Any], bool] | None = None):
+        """Entidad más cercana de 'tipo' a (x, y), opcionalmente a distancia < radius."""
+        todas = self._por_tipo.get(tipo)
+        if not todas:
+            return None
+        mejor_d = float('inf') if radius is None else radius * radius
+        mejor = None
+        if len(todas) < INDICE_MIN_LINEAL:
+            for obj, ex, ey, _, _ in todas.values():
+                dx = ex - x
+                dy = ey - y
+                d = dx*dx + dy*dy
+                if d < mejor_d and (predicate is None or predicate(obj)):
+                    mejor_d = d
+                    mejor = obj
+            return mejor
+        celdas = self._celdas[tipo]
+        cx, cy = self._clave(x, y)
+        anillo_max = max(cx, cy, self.max_cx - cx, self.max_cy - cy)
+        if radius is not None:
+            anillo_max = min(anillo_max, int(radius) // self.celda + 1)
+        for k in range(anillo_max + 1):
+            # Cota inferior de distancia para cualquier punto del anillo k
+            if k > 1 and ((k - 1) * self.celda) ** 2 >= mejor_d:
+                break
+            for clave in self._anillo(cx, cy, k):
+                cubeta = celdas.get(clave)
+                if not cubeta:
+                    continue
+                for obj, ex, ey, _, _ in cubeta.values():
+                    dx = ex - x
+                    dy = ey - y
+                    d = dx*dx + dy*dy
+                    if d < mejor_d and (predicate is None or predicate(obj)):
+                        mejor_d = d
+                        mejor = obj
+        return mejor
+
+    def within(self, x, y, r: float, tipo: str | None = None) -> List[Any]:
+        """Entidades a distancia < r de (x, y), de un tipo o de todos."""
+        tipos = [tipo] if tipo is not None else list(self._celdas)
+        r_sq = r * r
+        x0, y0 = self._clave(x - r, y - r)
+        x1, y1 = self._clave(x + r, y + r)
+        res = []
+        for t in tipos:
+            celdas = self._celdas.get(t)
+            if not celdas:
+                continue
+            for i in range(x0, x1 + 1):
+                for j in range(y0, y1 + 1):
+                    cubeta = celdas.get((i, j))
+                    if not cubeta:
+                        continue
+                    for obj, ex, ey, _, _ in cubeta.values():
+                        dx = ex - x
+                        dy = ey - y
+                        if dx*dx + dy*dy < r_sq:
+                            res.append(obj)
+        return res
+
+    def _anillo(self, cx: int, cy: int, k: int) -> List[Tuple[int, int]]:
+        """Celdas dentro del mundo a distancia de Chebyshev exactamente k de (cx, cy)."""
+        if k == 0:
+            return [(cx, cy)]
+        x0 = max(0, cx - k)
+        x1 = min(self.max_cx, cx + k)
+        res = []
+        if cy - k >= 0:
+            res.extend((i, cy - k) for i in range(x0, x1 + 1))
+        if cy + k <= self.max_cy:
+            res.extend((i, cy + k) for i in range(x0, x1 + 1))
+        y0 = max(0, cy - k + 1)
+        y1 = min(self.max_cy, cy + k - 1)
+        if cx - k >= 0:
+            res.extend((cx - k, j) for j in range(y0, y1 + 1))
+        if cx + k <= self.max_cx:
+            res.extend((cx + k, j) for j in range(y0, y1 + 1))
+        return res
+
+# --- Estado de entidades con __slots__ (guardado y migración de guardados) ---
+_CAMPOS_CLASE: Dict[type, Tuple[str, ...]] = {}
+
+def _campos(cls: type) -> Tuple[str, ...]:
+    """Nombres de todos los slots de la jerarquía de 'cls'."""
+    campos = _CAMPOS_CLASE.get(cls)
+    if campos is None:
+        campos = tuple(c for k in reversed(cls.__mro__) for c in k.__dict__.get('__slots__', ()))
+        _CAMPOS_CLASE[cls] = campos
+    return campos
+
+def _estado_entidad(obj) -> dict:
+    return {c: getattr(obj, c) for c in _campos(type(obj)) if hasattr(obj, c)}
+
+def _restaurar_entidad(obj, estado):
+    # Guardados anteriores a __slots__ traen el __dict__ de la instancia; los
+    # campos que entonces se creaban bajo demanda toman su valor inicial
+    if isinstance(estado, tuple):
+        estado = {**(estado[0] or {}), **(estado[1] or {})}
+    campos = _campos(type(obj))
+    for campo, valor in {**obj._INICIALES, **estado}.items():
+        if campo in campos:
+            setattr(obj, campo, valor)
+
 class Entidad:
+    __slots__ = ('nombre', 'vida', 'energia', 'x', 'y')
+    _INICIALES: Dict[str, Any] = {}
+
     def __init__(self, nombre: str, vida: int, energia: int, x: int, y: int):
         self.nombre = nombre
         self.vida = vida
@@ -48,13 +223,31 @@ class Entidad:
     def posicion(self) -> Tuple[int, int]:
         return (self.x, self.y)
 
+    def __getstate__(self):
+        return _estado_entidad(self)
+
+    def __setstate__(self, estado):
+        _restaurar_entidad(self, estado)
+
 class PlantaBase:
+    __slots__ = ('nombre', 'vida', 'energia', 'x', 'y', 'edad', 'estado')
+    _INICIALES: Dict[str, Any] = {'edad': 0, 'estado': 'brote'}
+
     def __init__(self, nombre: str, x: int, y: int, vida: int = 20, energia: int = 0):
         self.nombre = nombre
         self.vida = vida
         self.energia = energia
         self.x = x
         self.y = y
+        self.edad = 0
+        # Estados: 'brote' -> 'adulta' -> 'marchita'
+        self.estado = 'brote'
+
+    def __getstate__(self):
+        return _estado_entidad(self)
+
+    def __setstate__(self, estado):
+        _restaurar_entidad(self, estado)
 
     def esta_viva(self) -> bool:
         return self.vida > 0
@@ -65,10 +258,6 @@ class PlantaBase:
     def envejecer(self):
         if self.vida <= 0:
             return
-        if not hasattr(self, 'edad'):
-            self.edad = 0
-        if not hasattr(self, 'estado'):
-            self.estado = 'brote'
         self.edad += 1
         # Transiciones de estado por edad
         # Tick ~40ms -> 1 min ~1500 ticks
@@ -82,10 +271,10 @@ class PlantaBase:
 
     def intentar_sembrar(self, ecosistema: 'Ecosistema'):
         """Generar una nueva planta cercana si es adulta y con baja probabilidad."""
-        if self.vida <= 0 or getattr(self, 'estado', 'brote') != 'adulta':
+        if self.vida <= 0 or self.estado != 'adulta':
             return
-        # Probabilidad baja de semilla, control de densidad (máximo 60)
-        if len(ecosistema.plantas) >= 60:
+        # Probabilidad baja de semilla, control de densidad (máximo max_plantas)
+        if len(ecosistema.plantas) >= ecosistema.max_plantas:
             return
         if random.random() < 0.02:  # 2% por tick
             # Usar distribución dispersa global para mantener uniformidad
@@ -97,49 +286,79 @@ class PlantaBase:
             )
 
 class Planta(PlantaBase):
+    __slots__ = ('nutricion',)
+    _INICIALES: Dict[str, Any] = {**PlantaBase._INICIALES, 'nutricion': ENERGY_PLANT_GAIN}
+
     def __init__(self, nombre: str, x: int, y: int, nutricion: int = ENERGY_PLANT_GAIN):
         super().__init__(nombre, x=x, y=y, vida=20, energia=0)
         self.nutricion = nutricion
-        self.edad = 0
-        # Estados: 'brote' -> 'adulta' -> 'marchita'
-        self.estado = 'brote'
+
+class Cadaver:
+    """Cadáver: lo envejece Ecosistema.paso(); la vista solo lo dibuja."""
+    # age y skull_timer en ticks lógicos; eaten en [0, 1]; _pos: índice en Ecosistema.cadaveres
+    __slots__ = ('x', 'y', 'age', 'eaten', 'skull_timer', '_pos')
+
+    def __init__(self, x=0, y=0):
+        self.reiniciar(x, y)
+        self._pos = -1
+
+    def reiniciar(self, x, y):
+        self.x = x
+        self.y = y
+        self.age = 0
+        self.eaten = 0.0
+        self.skull_timer = CADAVER_CALAVERA_TICKS
+
+    @classmethod
+    def desde_dict(cls, d: dict) -> 'Cadaver':
+        """Convertir un cadáver de guardados antiguos (dict con tiempos en frames)."""
+        c = cls(d['x'], d['y'])
+        max_age = d.get('max_age', 3000) or 1
+        c.age = int(d.get('age', 0) * CADAVER_VIDA_TICKS / max_age)
+        c.eaten = d.get('eaten', 0.0)
+        c.skull_timer = -(-d.get('skull_timer', 0) * CADAVER_CALAVERA_TICKS // 180)
+        return c
 
 class Dinosaurio(Entidad):
+    # _e_decay: ticks hacia el siguiente -1 de energía; _atk_cd: enfriamiento de ataque
+    __slots__ = ('tipo', 'edad', '_e_decay', '_atk_cd')
+    _INICIALES: Dict[str, Any] = {'edad': 0, '_e_decay': 0, '_atk_cd': 0}
+
     def __init__(self, nombre: str, tipo: str, vida: int, energia: int, x: int, y: int):
         super().__init__(nombre, vida, energia, x, y)
         self.tipo = tipo  # "herbivoro" | "carnivoro" | "omnivoro"
         self.edad = 0
+        self._e_decay = 0
+        self._atk_cd = 0
 
     # Movimiento con límites de mapa (en pixeles)
     def mover_arriba(self):
         if self.y > 0:
             self.y = max(0, self.y - MOVE_SPEED)
 
-    def mover_abajo(self):
-        if self.y < WORLD_PX_H:
-            self.y = min(WORLD_PX_H, self.y + MOVE_SPEED)
+    def mover_abajo(self, limite: int = WORLD_PX_H):
+        if self.y < limite:
+            self.y = min(limite, self.y + MOVE_SPEED)
 
     def mover_izquierda(self):
         if self.x > 0:
             self.x = max(0, self.x - MOVE_SPEED)
 
-    def mover_derecha(self):
-        if self.x < WORLD_PX_W:
-            self.x = min(WORLD_PX_W, self.x + MOVE_SPEED)
+    def mover_derecha(self, limite: int = WORLD_PX_W):
+        if self.x < limite:
+            self.x = min(limite, self.x + MOVE_SPEED)
 
-    def mover_aleatorio(self):
+    def mover_aleatorio(self, ancho: int = WORLD_PX_W, alto: int = WORLD_PX_H):
         direc = random.choice(["arriba", "abajo", "izquierda", "derecha", "quieto"])  # quieto no gasta
         if direc == "arriba": self.mover_arriba()
-        elif direc == "abajo": self.mover_abajo()
+        elif direc == "abajo": self.mover_abajo(alto)
         elif direc == "izquierda": self.mover_izquierda()
-        elif direc == "derecha": self.mover_derecha()
+        elif direc == "derecha": self.mover_derecha(ancho)
 
     def envejecer(self):
         self.edad += 1
         self.energia -= ENERGY_AGE_COST
         # Decaimiento periódico de energía: -1 cada ENERGY_DECAY_TICKS (~0.5s)
-        if not hasattr(self, '_e_decay'):
-            self._e_decay = 0
         self._e_decay += 1
         if self._e_decay >= ENERGY_DECAY_TICKS:
             self.energia -= 1
@@ -165,6 +384,11 @@ class Dinosaurio(Entidad):
         dano = random.randint(6, 18)
         otro.vida -= dano
         self.energia -= 2
+        if self.energia <= 0:
+            # El atacante agotado muere en el acto (el jugador sigue vivo tras morir())
+            self.morir()
+            if not self.esta_vivo():
+                ecosistema.marcar_para_remover(self)
         if not otro.esta_vivo():
             # REGLA: crear cadáver cuando la especie (clase) del atacante es distinta a la de la víctima
             if type(self).__name__ != type(otro).__name__:
@@ -194,50 +418,61 @@ class Dinosaurio(Entidad):
             if not ecosistema.puede_reproducir(self):
                 return
             self.energia -= 15
-            nx = min(WORLD_PX_W, max(0, self.x + random.choice([-15, 0, 15])))
-            ny = min(WORLD_PX_H, max(0, self.y + random.choice([-15, 0, 15])))
+            nx = min(ecosistema.width, max(0, self.x + random.choice([-15, 0, 15])))
+            ny = min(ecosistema.height, max(0, self.y + random.choice([-15, 0, 15])))
             cria = type(self)(nx, ny)
             ecosistema.agregar_animal(cria)
 
     def tick_ia(self, ecosistema: 'Ecosistema'):
         # Default: moverse aleatorio
-        self.mover_aleatorio()
+        self.mover_aleatorio(ecosistema.width, ecosistema.height)
 
 # Subclases ejemplo
 class Triceratops(Dinosaurio):
+    __slots__ = ()
+
     def __init__(self, x, y):
         super().__init__("Triceratops", "herbivoro", vida=110, energia=100, x=x, y=y)
 
 class Stegosaurio(Dinosaurio):
+    __slots__ = ()
+
     def __init__(self, x, y):
         super().__init__("Stegosaurio", "herbivoro", vida=105, energia=100, x=x, y=y)
 
 class Velociraptor(Dinosaurio):
+    __slots__ = ()
+
     def __init__(self, x, y):
         super().__init__("Velociraptor", "carnivoro", vida=80, energia=100, x=x, y=y)
 
     def tick_ia(self, ecosistema: 'Ecosistema'):
         # Perseguir herbívoros más cercanos si existen, si no, aleatorio
-        objetivos = [a for a in ecosistema.animales if a.tipo in ("herbivoro",) and a.esta_vivo()]
-        if objetivos:
-            target = min(objetivos, key=lambda a: abs(a.x - self.x) + abs(a.y - self.y))
+        target = ecosistema.nearest('animal', self.x, self.y, predicate=_es_herbivoro_vivo)
+        if target is not None:
             if target.x < self.x: self.mover_izquierda()
-            elif target.x > self.x: self.mover_derecha()
+            elif target.x > self.x: self.mover_derecha(ecosistema.width)
             if target.y < self.y: self.mover_arriba()
-            elif target.y > self.y: self.mover_abajo()
+            elif target.y > self.y: self.mover_abajo(ecosistema.height)
         else:
-            self.mover_aleatorio()
+            self.mover_aleatorio(ecosistema.width, ecosistema.height)
 
 class Dilofosaurio(Dinosaurio):
+    __slots__ = ()
+
     def __init__(self, x, y):
         super().__init__("Dilofosaurio", "carnivoro", vida=95, energia=100, x=x, y=y)
 
 class Moshops(Dinosaurio):
+    __slots__ = ()
+
     def __init__(self, x, y):
         super().__init__("Moshops", "omnivoro", vida=95, energia=100, x=x, y=y)
 
 class TRexJugador(Dinosaurio):
     """T-Rex controlado por el jugador."""
+    __slots__ = ()
+
     def __init__(self, x, y):
         super().__init__("T-Rex", "carnivoro", vida=160, energia=100, x=x, y=y)
 
@@ -262,23 +497,29 @@ class TRexJugador(Dinosaurio):
         if self.y > 0:
             self.y = max(0, self.y - MOVE_SPEED)
 
-    def mover_abajo(self):
-        if self.y < WORLD_PX_H:
-            self.y = min(WORLD_PX_H, self.y + MOVE_SPEED)
+    def mover_abajo(self, limite: int = WORLD_PX_H):
+        if self.y < limite:
+            self.y = min(limite, self.y + MOVE_SPEED)
 
     def mover_izquierda(self):
         if self.x > 0:
             self.x = max(0, self.x - MOVE_SPEED)
 
-    def mover_derecha(self):
-        if self.x < WORLD_PX_W:
-            self.x = min(WORLD_PX_W, self.x + MOVE_SPEED)
+    def mover_derecha(self, limite: int = WORLD_PX_W):
+        if self.x < limite:
+            self.x = min(limite, self.x + MOVE_SPEED)
 
     # Ignorar muerte
     def morir(self):
         self.vida = 160
         self.energia = max(self.energia, 70)
 
+def _es_herbivoro_vivo(a: Dinosaurio) -> bool:
+    return a.tipo == "herbivoro" and a.esta_vivo()
+
+def _planta_viva(p: Planta) -> bool:
+    return p.vida > 0
+
 class Ecosistema:
     def __init__(self, width=WORLD_PX_W, height=WORLD_PX_H):
         self.ciclo = 0
@@ -286,12 +527,16 @@ class Ecosistema:
         self.height = height
         self.animales: List[Dinosaurio] = []
         self.plantas: List[Planta] = []
-        self._rem_anim: List[Dinosaurio] = []
-        self._rem_pla: List[Planta] = []
+        # Marcados para remover, por identidad: id(obj) -> obj (en orden de marcado)
+        self._rem_anim: Dict[int, Dinosaurio] = {}
+        self._rem_pla: Dict[int, Planta] = {}
         self.jugador: TRexJugador | None = None
-        self.cadaveres: List[dict] = []  # Lista de cadáveres para la vista
+        self.cadaveres: List[Cadaver] = []  # Cadáveres activos (la vista solo los lee)
+        self._cadaveres_libres: List[Cadaver] = []  # registros reutilizables
         # Límites
         self.max_animales = 32
+        self.min_plantas = 40
+        self.max_plantas = 60
         self.limites_especie = {
             'Triceratops': 8,
             'Stegosaurio': 8,
@@ -307,28 +552,155 @@ class Ecosistema:
             'Dilofosaurio': Dilofosaurio,
             'Moshops': Moshops,
         }
-
-    def crear_cadaver(self, x: int, y: int):
-        """Crear un cadáver en la posición especificada."""
-        self.cadaveres.append({
-            'x': x,
-            'y': y,
-            'age': 0,
-            'max_age': 3000,
-            'eaten': 0.0,
-            'skull_timer': 180
-        })
+        self._indice = IndiceEspacial(width, height)
+        # Rejillas de muestreo de Poisson por distancia mínima (ver muestreo.py)
+        self._muestreos: Dict[float, MuestreoPoisson] = {}
+        # Sube con cada cambio visible de las plantas (altas, bajas y cambios de estado)
+        self.version_plantas = 0
+        # Contadores de vivos (total y por especie) mantenidos al agregar, morir y retirar
+        self.total_vivos = 0
+        self.vivos_especie: Dict[str, int] = {}
+        self._contados: Dict[int, str] = {}  # id(animal) -> especie de los que están contados
+
+    def __getstate__(self):
+        # El índice espacial se reconstruye al cargar
+        estado = self.__dict__.copy()
+        estado.pop('_indice', None)
+        for clave in ('total_vivos', 'vivos_especie', '_contados', '_cadaveres_libres', '_muestreos',
+                      'version_plantas'):
+            estado.pop(clave, None)
+        # Los id() no sobreviven a la carga: las marcas se guardan como listas
+        estado['_rem_anim'] = list(self._rem_anim.values())
+        estado['_rem_pla'] = list(self._rem_pla.values())
+        return estado
+
+    def __setstate__(self, estado):
+        # Guardados anteriores a los límites de plantas configurables
+        estado.setdefault('min_plantas', 40)
+        estado.setdefault('max_plantas', 60)
+        estado['_rem_anim'] = {id(a): a for a in estado.get('_rem_anim', [])}
+        estado['_rem_pla'] = {id(p): p for p in estado.get('_rem_pla', [])}
+        # Guardados con cadáveres como dict
+        estado['cadaveres'] = [Cadaver.desde_dict(c) if isinstance(c, dict) else c
+                               for c in estado.get('cadaveres', [])]
+        for i, c in enumerate(estado['cadaveres']):
+            c._pos = i
+        estado['_cadaveres_libres'] = []
+        estado['version_plantas'] = 0
+        self.__dict__.update(estado)
+        self._reconstruir_indice()
+        self._recontar()
+
+    def _reconstruir_indice(self):
+        self._indice = IndiceEspacial(self.width, self.height)
+        self._muestreos = {}
+        for a in self.animales:
+            self._indice.insertar('animal', a, a.x, a.y)
+        for p in self.plantas:
+            self._indice.insertar('planta', p, p.x, p.y)
+        for c in self.cadaveres:
+            self._indice.insertar('cadaver', c, c.x, c.y)
+
+    # --- Contadores de población ---
+    def _recontar(self):
+        """Reconstruir los contadores de vivos recorriendo la población."""
+        self.total_vivos = 0
+        self.vivos_especie = {}
+        self._contados = {}
+        for a in self.animales:
+            if id(a) not in self._rem_anim:
+                self._contar_alta(a)
+
+    def _contar_alta(self, a: Dinosaurio):
+        if a.esta_vivo() and id(a) not in self._contados:
+            nombre = type(a).__name__
+            self._contados[id(a)] = nombre
+            self.vivos_especie[nombre] = self.vivos_especie.get(nombre, 0) + 1
+            self.total_vivos += 1
+
+    def _contar_baja(self, a: Dinosaurio):
+        nombre = self._contados.pop(id(a), None)
+        if nombre is not None:
+            self.vivos_especie[nombre] -= 1
+            self.total_vivos -= 1
+
+    @property
+    def plantas_vivas(self) -> int:
+        """Plantas vivas: toda planta muerta queda marcada para remover hasta limpiar_muertos."""
+        return len(self.plantas) - len(self._rem_pla)
+
+    def verificar_contadores(self, limpio: bool = False):
+        """Comparar los contadores con un recuento completo (depuración).
+        limpio=True: además, tras limpiar_muertos no debe quedar ningún muerto en las listas.
+        """
+        especies: Dict[str, int] = {}
+        for a in self.animales:
+            if a.esta_vivo() and id(a) not in self._rem_anim:
+                nombre = type(a).__name__
+                especies[nombre] = especies.get(nombre, 0) + 1
+        contados = {k: v for k, v in self.vivos_especie.items() if v}
+        assert contados == especies and self.total_vivos == sum(especies.values()), (
+            f"Contadores desincronizados: {contados} (total {self.total_vivos}) != {especies}")
+        vivas = sum(1 for p in self.plantas if p.vida > 0)
+        assert self.plantas_vivas == vivas, f"Plantas vivas desincronizadas: {self.plantas_vivas} != {vivas}"
+        if limpio:
+            assert len(self.animales) == self.total_vivos, "Quedan animales muertos sin marcar"
+            assert all(p.vida > 0 for p in self.plantas), "Quedan plantas muertas sin marcar"
+
+    # --- Consultas espaciales ---
+    def nearest(self, kind: str, x, y, radius: float | None = None,
+                predicate: Callable[[Any], bool] | None = None):
+        """Entidad más cercana de tipo 'animal', 'planta' o 'cadaver' (o None)."""
+        return self._indice.nearest(kind, x, y, radius, predicate)
+
+    def within(self, x, y, r: float, kind: str | None = None) -> List[Any]:
+        """Entidades a distancia menor que r del punto (x, y)."""
+        return self._indice.within(x, y, r, kind)
+
+    def reubicar(self, a: Dinosaurio):
+        """Actualizar el índice tras mover un animal."""
+        self._indice.mover(a, a.x, a.y)
+
+    def crear_cadaver(self, x: int, y: int) -> Cadaver:
+        """Crear un cadáver en la posición especificada (reutilizando registros libres)."""
+        if self._cadaveres_libres:
+            cadaver = self._cadaveres_libres.pop()
+            cadaver.reiniciar(x, y)
+        else:
+            cadaver = Cadaver(x, y)
+        cadaver._pos = len(self.cadaveres)
+        self.cadaveres.append(cadaver)
+        self._indice.insertar('cadaver', cadaver, x, y)
+        return cadaver
+
+    def _retirar_cadaver(self, c: Cadaver):
+        # Intercambiar con el último: O(1), el orden de la lista no importa
+        ultimo = self.cadaveres.pop()
+        if ultimo is not c:
+            self.cadaveres[c._pos] = ultimo
+            ultimo._pos = c._pos
+        c._pos = -1
+        self._indice.quitar(c)
+        self._cadaveres_libres.append(c)
+
+    def avanzar_cadaveres(self):
+        """Envejecer los cadáveres un tick y retirar los comidos o caducados."""
+        for c in reversed(self.cadaveres):
+            c.age += 1
+            if c.skull_timer > 0:
+                c.skull_timer -= 1
+            if c.eaten >= 1.0 or c.age >= CADAVER_VIDA_TICKS:
+                self._retirar_cadaver(c)
 
     def contar_especie(self, nombre: str) -> int:
-        return sum(1 for a in self.animales if a.esta_vivo() and type(a).__name__ == nombre)
+        return self.vivos_especie.get(nombre, 0)
 
     def puede_reproducir(self, progenitor: Dinosaurio) -> bool:
         # Mantener único T-Rex
         if isinstance(progenitor, TRexJugador):
             return False
         # Límite global
-        vivos = sum(1 for a in self.animales if a.esta_vivo())
-        if vivos >= self.max_animales:
+        if self.total_vivos >= self.max_animales:
             return False
         # Límite por especie
         nombre = type(progenitor).__name__
@@ -350,8 +722,7 @@ class Ecosistema:
             if crear <= 0:
                 continue
             # Checar capacidad global restante
-            vivos_tot = sum(1 for a in self.animales if a.esta_vivo())
-            disp = max(0, self.max_animales - vivos_tot)
+            disp = max(0, self.max_animales - self.total_vivos)
             if disp <= 0:
                 break
             crear = min(crear, disp)
@@ -374,13 +745,23 @@ class Ecosistema:
         animal.x = max(0, min(self.width, animal.x))
         animal.y = max(0, min(self.height, animal.y))
         self.animales.append(animal)
+        self._indice.insertar('animal', animal, animal.x, animal.y)
+        self._contar_alta(animal)
         if isinstance(animal, TRexJugador):
             self.jugador = animal
 
+    def _retirar_animal(self, a: Dinosaurio):
+        self._indice.quitar(a)
+        self._contar_baja(a)
+
     def agregar_planta(self, planta: Planta):
         planta.x = max(0, min(self.width, planta.x))
         planta.y = max(0, min(self.height, planta.y))
         self.plantas.append(planta)
+        self.version_plantas += 1
+        self._indice.insertar('planta', planta, planta.x, planta.y)
+        for m in self._muestreos.values():
+            m.insertar(planta, planta.x, planta.y)
 
     # --- Utilidades de distribución ---
     def _dist_sq(self, x1, y1, x2, y2):
@@ -388,40 +769,44 @@ class Ecosistema:
         dy = y1 - y2
         return dx*dx + dy*dy
 
+    def _muestreo(self, min_dist: float) -> MuestreoPoisson:
+        """Rejilla de Poisson para 'min_dist', creada la primera vez con las plantas actuales."""
+        m = self._muestreos.get(min_dist)
+        if m is None:
+            m = MuestreoPoisson(self.width, self.height, min_dist, _planta_viva)
+            for p in self.plantas:
+                m.insertar(p, p.x, p.y)
+            self._muestreos[min_dist] = m
+        return m
+
     def agregar_planta_dispersada(self, nombre: str = "Helecho", attempts: int = 20, min_dist: int = 50,
                                    around: tuple | None = None, radius: int = 150):
         """Intentar ubicar una planta manteniendo una distancia mínima a las existentes.
         - around=(x,y): si se pasa, intenta colocar alrededor de ese punto dentro de 'radius'.
         - si no, distribuye global en el mapa.
         """
-        min_dist_sq = max(0, min_dist) ** 2
-        for _ in range(max(1, attempts)):
-            if around is None:
-                x = random.randint(0, self.width)
-                y = random.randint(0, self.height)
-            else:
-                ax, ay = around
-                ang = random.random() * 6.2831853
-                r = random.randint(0, max(10, radius))
-                x = int(max(0, min(self.width, ax + r * (random.random()*2-1))))
-                y = int(max(0, min(self.height, ay + r * (random.random()*2-1))))
-            ok = True
-            for p in self.plantas:
-                if p.vida > 0 and self._dist_sq(x, y, p.x, p.y) < min_dist_sq:
-                    ok = False
-                    break
-            if ok:
-                self.agregar_planta(Planta(nombre, x, y))
-                return True
-        return False
+        def colocar(x, y):
+            self.agregar_planta(Planta(nombre, x, y))
+        radio = None if around is None else max(10, radius)
+        return self._muestreo(max(0, min_dist)).llenar(1, colocar, around, radio, intentos=attempts) == 1
+
+    def rellenar_plantas(self, n: int, min_dist: int = 55, attempts: int = 60, numerar: bool = False) -> int:
+        """Colocar hasta n plantas dispersas de una vez en celdas libres del muestreo (ver
+        muestreo.py; con min_dist=55 el mundo base admite unas 75). Devuelve cuántas se colocaron."""
+        def colocar(x, y):
+            nombre = f"Helecho_{len(self.plantas)+1}" if numerar else "Helecho"
+            self.agregar_planta(Planta(nombre, x, y))
+        return self._muestreo(max(0, min_dist)).llenar(n, colocar, intentos=attempts)
 
     def marcar_para_remover(self, a: Dinosaurio):
-        if a not in self._rem_anim:
-            self._rem_anim.append(a)
+        if id(a) not in self._rem_anim:
+            self._rem_anim[id(a)] = a
+            self._contar_baja(a)
 
     def marcar_planta_para_remover(self, p: Planta):
-        if p not in self._rem_pla:
-            self._rem_pla.append(p)
+        if id(p) not in self._rem_pla:
+            self._rem_pla[id(p)] = p
+            self.version_plantas += 1
 
     def animales_en(self, x, y) -> List[Dinosaurio]:
         return [a for a in self.animales if a.esta_vivo() and a.x == x and a.y == y]
@@ -430,44 +815,37 @@ class Ecosistema:
         return [p for p in self.plantas if p.vida > 0 and p.x == x and p.y == y]
 
     def poblar_inicial(self):
-        # Plantas de fondo (distribución dispersa) mínimo 40
-        objetivo = 40
-        i = 0
-        while len(self.plantas) < objetivo and i < objetivo * 3:
-            i += 1
-            placed = self.agregar_planta_dispersada(f"Helecho_{len(self.plantas)+1}", attempts=60, min_dist=55)
-            if not placed:
-                # Fallback aleatorio si no encuentra hueco
-                x = random.randint(0, self.width)
-                y = random.randint(0, self.height)
-                self.agregar_planta(Planta(f"Helecho_{len(self.plantas)+1}", x, y))
+        # Plantas de fondo (distribución dispersa) mínimo min_plantas
+        objetivo = self.min_plantas
+        self.rellenar_plantas(objetivo - len(self.plantas), min_dist=55, numerar=True)
+        while len(self.plantas) < objetivo:
+            # Fallback aleatorio si no encuentra hueco
+            x = random.randint(0, self.width)
+            y = random.randint(0, self.height)
+            self.agregar_planta(Planta(f"Helecho_{len(self.plantas)+1}", x, y))
         # Solo jugador (T-Rex)
         self.agregar_animal(TRexJugador(self.width // 2, self.height // 2))
 
     def limpiar_muertos(self):
-        for a in list(self._rem_anim):
-            if a in self.animales:
-                try:
-                    self.animales.remove(a)
-                except ValueError:
-                    pass
-            try:
-                self._rem_anim.remove(a)
-            except ValueError:
-                pass
-        for p in list(self._rem_pla):
-            if p in self.plantas:
-                try:
-                    self.plantas.remove(p)
-                except ValueError:
-                    pass
-            try:
-                self._rem_pla.remove(p)
-            except ValueError:
-                pass
-        # hard clean
-        self.animales = [a for a in self.animales if a.esta_vivo()]
-        self.plantas = [p for p in self.plantas if p.vida > 0]
+        """Retirar lo marcado (en orden de marcado) y compactar las listas en una pasada.
+        Toda muerte se marca al producirse o al inicio de paso(), así que sin marcas no
+        hace falta recorrer la población.
+        """
+        if self._rem_anim:
+            rem = self._rem_anim
+            for a in rem.values():
+                self._retirar_animal(a)
+            self.animales = [a for a in self.animales if id(a) not in rem]
+            rem.clear()
+        if self._rem_pla:
+            rem = self._rem_pla
+            for p in rem.values():
+                self._indice.quitar(p)
+                for m in self._muestreos.values():
+                    m.quitar(p)
+            self.plantas = [p for p in self.plantas if id(p) not in rem]
+            rem.clear()
+            self.version_plantas += 1
 
     def interacciones_en_pos(self, x, y):
         animales = self.animales_en(x, y)
@@ -493,6 +871,7 @@ class Ecosistema:
 
     def paso(self):
         self.ciclo += 1
+        self.avanzar_cadaveres()
         # IA
         for a in list(self.animales):
             if not a.esta_vivo():
@@ -500,18 +879,22 @@ class Ecosistema:
                 continue
             if not isinstance(a, TRexJugador):
                 a.tick_ia(self)
+                self.reubicar(a)
             a.envejecer()
+            if not a.esta_vivo():
+                self.marcar_para_remover(a)
         # Ciclo de vida de plantas: envejecer y posibles semillas
         for p in list(self.plantas):
             if p.vida > 0:
+                estado = p.estado
                 p.envejecer()
+                if p.vida <= 0:
+                    self.marcar_planta_para_remover(p)
+                elif p.estado != estado:
+                    self.version_plantas += 1
                 p.intentar_sembrar(self)
-        # interacciones por posición
-        # Posiciones discretas ya no se usan para colisiones (movimiento libre),
-        # se omiten interacciones por celda.
-        posiciones = set()
-        for (x, y) in posiciones:
-            pass
+        if DEPURAR_CONTADORES:
+            self.verificar_contadores()
         # reproducción
         for a in list(self.animales):
             if a.esta_vivo():
@@ -519,9 +902,9 @@ class Ecosistema:
         # Asegurar mínimos por especie (p. ej. 2)
         self.asegurar_minimos_especie(minimo=2)
         # Recorte si excede el máximo global (no tocar T-Rex)
-        vivos = [a for a in self.animales if a.esta_vivo() and not isinstance(a, TRexJugador)]
-        excede = max(0, len([a for a in self.animales if a.esta_vivo()]) - self.max_animales)
+        excede = max(0, self.total_vivos - self.max_animales)
         if excede > 0:
+            vivos = [a for a in self.animales if a.esta_vivo() and not isinstance(a, TRexJugador)]
             # Ordenar por menor energía y mayor edad para recortar primero los más débiles
             vivos.sort(key=lambda a: (a.energia, -a.edad))
             for i in range(excede):
@@ -530,15 +913,15 @@ class Ecosistema:
             self.limpiar_muertos()
         # limpieza
         self.limpiar_muertos()
-        # Mantener entre 40 y 60 plantas: rellenar y limitar
-        min_obj = 40
-        max_obj = 60
+        if DEPURAR_CONTADORES:
+            self.verificar_contadores(limpio=True)
+        # Mantener entre min_plantas y max_plantas (40 y 60): rellenar y limitar
+        min_obj = self.min_plantas
+        max_obj = self.max_plantas
         # Top-up a mínimo
-        refill_attempts = 0
-        while len(self.plantas) < min_obj and refill_attempts < min_obj * 4:
-            refill_attempts += 1
-            placed = self.agregar_planta_dispersada("Helecho", attempts=60, min_dist=55)
-            if not placed:
+        if len(self.plantas) < min_obj:
+            self.rellenar_plantas(min_obj - len(self.plantas), min_dist=55)
+            while len(self.plantas) < min_obj:
                 # Fallback si no encuentra hueco tras varios intentos
                 self.agregar_planta(Planta("Helecho", random.randint(0, self.width), random.randint(0, self.height)))
         # Si excede el máximo, remover las más viejas/marchitas primero
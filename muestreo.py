@@ -0,0 +1,217 @@
+import math
+import random
+from typing import Any, Callable, Dict, List
+
+"""
+MUESTREO POR COBERTURA DE CELDAS LIBRES
+Coloca puntos separados al menos 'min_dist' entre sí (disco de Poisson).
+La rejilla tiene celdas de min_dist/√2: comprobar un candidato solo mira las
+21 celdas vecinas.
+Además se lleva, por celda, cuántos puntos cubren su centro (están a menos de
+min_dist). Las celdas con el centro descubierto forman el conjunto de celdas
+libres: colocar un punto es elegir una al azar (O(1)) y tomar un punto de la
+celda o, si no, su centro; si no queda ninguna, se sabe al instante que no hay sitio.
+Es conservador: un hueco que no contiene ningún centro de celda no se ofrece.
+Un mundo de 800x520 con min_dist=55 se satura con unas 75 plantas (75-79 según
+la semilla), frente a las ~92 de la búsqueda por anillo a la que sustituye.
+"""
+
+# Desplazamientos de celda a revisar: las esquinas de la ventana 5x5 quedan a
+# distancia >= min_dist y no pueden estar más cerca
+_VECINAS = [(i, j) for i in range(-2, 3) for j in range(-2, 3) if abs(i) + abs(j) < 4]
+
+class MuestreoPoisson:
+    """Rejilla de puntos con distancia mínima y conjunto de celdas libres."""
+
+    def __init__(self, width: int, height: int, min_dist: float,
+                 valido: Callable[[Any], bool] | None = None):
+        self.width = width
+        self.height = height
+        self.min_dist = float(min_dist)
+        self._r_sq = self.min_dist * self.min_dist
+        self.celda = max(1.0, self.min_dist / math.sqrt(2))
+        self.columnas = int(width / self.celda) + 1
+        self.filas = int(height / self.celda) + 1
+        # Solo bloquean los objetos para los que valido(obj) es cierto (p. ej. plantas vivas)
+        self.valido = valido
+        # Rejilla plana: celda -> lista de entradas (obj, x, y) o None
+        self._rejilla: List[list | None] = [None] * (self.columnas * self.filas)
+        self._celda_de: Dict[int, int] = {}
+        # Puntos que cubren el centro de cada celda y celdas libres (lista + posición)
+        # (solo cuentan las celdas con el centro dentro del mundo)
+        self._cobertura: List[int] = [0] * (self.columnas * self.filas)
+        self._pos_libre: List[int] = [-1] * (self.columnas * self.filas)
+        self._en_mundo: List[bool] = [False] * (self.columnas * self.filas)
+        cols = [i for i in range(self.columnas) if (i + 0.5) * self.celda <= width]
+        filas = [j for j in range(self.filas) if (j + 0.5) * self.celda <= height]
+        self._libres: List[int] = [i * self.filas + j for i in cols for j in filas]
+        for p, k in enumerate(self._libres):
+            self._pos_libre[k] = p
+            self._en_mundo[k] = True
+
+    def __len__(self) -> int:
+        return len(self._celda_de)
+
+    @property
+    def celdas_libres(self) -> int:
+        return len(self._libres)
+
+    def _centro(self, i: int):
+        cx, cy = divmod(i, self.filas)
+        return (cx + 0.5) * self.celda, (cy + 0.5) * self.celda
+
+    def _indice(self, x, y) -> int:
+        cx = min(self.columnas - 1, max(0, int(x / self.celda)))
+        cy = min(self.filas - 1, max(0, int(y / self.celda)))
+        return cx * self.filas + cy
+
+    def _cubrir(self, x, y, delta: int):
+        """Sumar 'delta' a las celdas cuyo centro está a menos de min_dist de (x, y)."""
+        cx = int(x / self.celda)
+        cy = int(y / self.celda)
+        celda = self.celda
+        filas = self.filas
+        columnas = self.columnas
+        r_sq = self._r_sq
+        cobertura = self._cobertura
+        for di, dj in _VECINAS:
+            i = cx + di
+            j = cy + dj
+            if i < 0 or j < 0 or i >= columnas or j >= filas:
+                continue
+            dx = (i + 0.5) * celda - x
+            dy = (j + 0.5) * celda - y
+            if dx*dx + dy*dy >= r_sq:
+                continue
+            k = i * filas + j
+            antes = cobertura[k]
+            cobertura[k] = antes + delta
+            if antes == 0:
+                self._sacar_libre(k)
+            elif antes + delta == 0 and self._en_mundo[k]:
+                self._pos_libre[k] = len(self._libres)
+                self._libres.append(k)
+
+    def _sacar_libre(self, k: int):
+        p = self._pos_libre[k]
+        if p < 0:
+            return
+        ultima = self._libres.pop()
+        if ultima != k:
+            self._libres[p] = ultima
+            self._pos_libre[ultima] = p
+        self._pos_libre[k] = -1
+
+    def insertar(self, obj: Any, x, y):
+        if id(obj) in self._celda_de:
+            return
+        i = self._indice(x, y)
+        cubeta = self._rejilla[i]
+        if cubeta is None:
+            cubeta = self._rejilla[i] = []
+        cubeta.append((obj, x, y))
+        self._celda_de[id(obj)] = i
+        self._cubrir(x, y, 1)
+
+    def quitar(self, obj: Any):
+        i = self._celda_de.pop(id(obj), None)
+        if i is None:
+            return
+        cubeta = self._rejilla[i]
+        for k, entrada in enumerate(cubeta):
+            if entrada[0] is obj:
+                del cubeta[k]
+                self._cubrir(entrada[1], entrada[2], -1)
+                break
+        if not cubeta:
+            self._rejilla[i] = None
+
+    def bloqueante(self, x, y):
+        """Un punto válido a distancia menor que min_dist de (x, y), o None si está libre."""
+        cx = int(x / self.celda)
+        cy = int(y / self.celda)
+        rejilla = self._rejilla
+        filas = self.filas
+        columnas = self.columnas
+        valido = self.valido
+        r_sq = self._r_sq
+        for di, dj in _VECINAS:
+            i = cx + di
+            j = cy + dj
+            if i < 0 or j < 0 or i >= columnas or j >= filas:
+                continue
+            cubeta = rejilla[i * filas + j]
+            if cubeta is None:
+                continue
+            for entrada in cubeta:
+                dx = entrada[1] - x
+                dy = entrada[2] - y
+                if dx*dx + dy*dy < r_sq and (valido is None or valido(entrada[0])):
+                    return entrada
+        return None
+
+    def libre(self, x, y) -> bool:
+        return self.bloqueante(x, y) is None
+
+    def llenar(self, n: int, colocar: Callable[[int, int], Any], centro: tuple | None = None,
+               radio: float | None = None, intentos: int = 8,
+               rng: random.Random | None = None) -> int:
+        """Colocar hasta n puntos nuevos en celdas libres; devuelve cuántos se colocaron.
+        colocar(x, y) crea la entidad y debe registrarla con insertar().
+        - centro=(x, y), radio: solo en celdas libres con el centro dentro de ese círculo.
+        - si no, en cualquier celda libre del mundo.
+        """
+        rng = rng or random
+        colocados = 0
+        fallos = 0
+        candidatas = None if centro is None else self._libres_en(centro, radio or 0)
+        while colocados < n and fallos < max(1, intentos):
+            if candidatas is None:
+                if not self._libres:
+                    break  # mundo lleno
+                k = self._libres[rng.randrange(len(self._libres))]
+            else:
+                # Las colocaciones anteriores pueden haber cubierto alguna candidata
+                candidatas = [k for k in candidatas if self._pos_libre[k] >= 0]
+                if not candidatas:
+                    break  # zona llena
+                k = candidatas[rng.randrange(len(candidatas))]
+            punto = self._punto_en(k, rng)
+            if punto is None:
+                fallos += 1
+                continue
+            colocar(*punto)
+            colocados += 1
+            fallos = 0
+        return colocados
+
+    def _libres_en(self, centro: tuple, radio: float) -> List[int]:
+        """Celdas libres con el centro dentro del círculo (centro, radio)."""
+        x, y = centro
+        c0 = max(0, int((x - radio) / self.celda))
+        c1 = min(self.columnas - 1, int((x + radio) / self.celda))
+        f0 = max(0, int((y - radio) / self.celda))
+        f1 = min(self.filas - 1, int((y + radio) / self.celda))
+        res = []
+        for i in range(c0, c1 + 1):
+            for j in range(f0, f1 + 1):
+                k = i * self.filas + j
+                if self._pos_libre[k] >= 0:
+                    dx = (i + 0.5) * self.celda - x
+                    dy = (j + 0.5) * self.celda - y
+                    if dx*dx + dy*dy <= radio * radio:
+                        res.append(k)
+        return res
+
+    def _punto_en(self, k: int, rng):
+        """Un punto entero libre dentro de la celda k (al azar o, si no, su centro)."""
+        cx, cy = divmod(k, self.filas)
+        x0 = cx * self.celda
+        y0 = cy * self.celda
+        ccx, ccy = self._centro(k)
+        for x, y in ((x0 + rng.random() * self.celda, y0 + rng.random() * self.celda), (ccx, ccy)):
+            x = min(self.width, int(round(x)))
+            y = min(self.height, int(round(y)))
+            if self.bloqueante(x, y) is None:
+                return x, y
+        return None
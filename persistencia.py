@@ -1,21 +1,49 @@
 import pickle
 import json
 import os
-import shutil
+import mmap
+import threading
+from typing import Dict
 from datetime import datetime
 from modelo import Ecosistema, SIM_VERSION
+import formato_guardado
 
 """
 CAPA DE PERSISTENCIA
 Contiene la lógica para guardar y cargar el estado del ecosistema.
+Los guardados usan el formato binario por columnas de formato_guardado; los
+.dat antiguos (pickle) se siguen pudiendo cargar.
+Los autoguardados van a un diario (slotN.jrn) con solo los cambios desde el
+guardado anterior del slot; cada MAX_DELTAS_DIARIO registros, o cuando el
+diario ocuparía más de LIMITE_DIARIO veces el propio .dat, se escribe un
+checkpoint completo y el diario vuelve a empezar. Al cargar se aplican los registros sobre el checkpoint.
+Los archivos se escriben en un temporal con fsync y se colocan con os.replace;
+las versiones anteriores pasan a .bak, .bak2... con enlaces duros y renombres
+(sin copiar).
+Los metadatos de todos los slots están en un único índice (saves/indice.json)
+que se reescribe de forma atómica en cada guardado y se guarda en memoria
+hasta que cambia en disco (inodo, mtime y tamaño). Se escribe el último y
+confirma el guardado: cada entrada lleva el crc del checkpoint y los bytes del
+diario, y al cargar solo se usa lo que confirma (si un guardado se cortó, la
+generación anterior). Los slots guardados antes del índice se leen de su slotN.json.
 """
 
 SAVE_DIR = "saves"
+MAX_DELTAS_DIARIO = 20
+LIMITE_DIARIO = 2.0
+GENERACIONES = 2  # versiones anteriores que se conservan de cada archivo
+INDICE = "indice.json"
 
 class Persistencia:
-    def __init__(self):
-        if not os.path.exists(SAVE_DIR):
-            os.makedirs(SAVE_DIR)
+    def __init__(self, comprimir: bool = True):
+        self.comprimir = comprimir  # columnas del guardado con zlib (las que lo merecen)
+        # Por slot, lo que hay en disco: última instantánea escrita (base del próximo
+        # registro), crc del checkpoint, registros y bytes del diario y bytes del .dat
+        self._diarios: Dict[str, dict] = {}
+        # Índice de slots en memoria y la firma (inodo, mtime, tamaño) del archivo leído
+        self._slots: Dict[str, dict] = {}
+        self._firma_indice: tuple | None = None
+        self._cerrojo_indice = threading.RLock()
 
     def _get_paths(self, slot: str):
         """Obtiene las rutas para los archivos de datos y metadatos de un slot."""
@@ -23,21 +51,67 @@ class Persistencia:
         meta_path = os.path.join(SAVE_DIR, f"{slot}.json")
         return data_path, meta_path
 
-    def _crear_backup(self, path: str):
-        """Crea un backup de un archivo si existe."""
-        if os.path.exists(path):
-            try:
-                shutil.copy(path, f"{path}.bak")
-                return True
-            except Exception as e:
-                print(f"Error al crear backup para {path}: {e}")
-                return False
-        return True
+    def _ruta_diario(self, slot: str) -> str:
+        return os.path.join(SAVE_DIR, f"{slot}.jrn")
+
+    def _ruta_indice(self) -> str:
+        return os.path.join(SAVE_DIR, INDICE)
+
+    def _ruta_generacion(self, path: str, n: int) -> str:
+        """Ruta de la generación n-ésima anterior de un archivo (.bak, .bak2...)."""
+        return f"{path}.bak" if n == 1 else f"{path}.bak{n}"
+
+    def _generaciones(self, path: str) -> list:
+        """El archivo actual seguido de sus generaciones anteriores."""
+        return [path] + [self._ruta_generacion(path, n) for n in range(1, GENERACIONES + 1)]
+
+    def _rotar_generaciones(self, path: str):
+        """Desplazar las generaciones anteriores y dejar la actual como .bak, sin copiar datos.
+        La actual se enlaza (enlace duro) para que siga en su sitio hasta el os.replace
+        del nuevo contenido; sin enlaces duros, se renombra."""
+        if not os.path.exists(path):
+            return
+        for n in range(GENERACIONES, 1, -1):
+            previa = self._ruta_generacion(path, n - 1)
+            if os.path.exists(previa):
+                os.replace(previa, self._ruta_generacion(path, n))
+        bak = self._ruta_generacion(path, 1)
+        enlace = f"{bak}.tmp"
+        try:
+            if os.path.exists(enlace):
+                os.remove(enlace)
+            os.link(path, enlace)
+            os.replace(enlace, bak)
+        except OSError:
+            os.replace(path, bak)
+
+    def _escribir_atomico(self, path: str, datos: bytes):
+        """Escribir en un temporal, fsync, rotar generaciones y colocarlo con os.replace."""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(datos)
+            f.flush()
+            os.fsync(f.fileno())
+        self._rotar_generaciones(path)
+        os.replace(tmp, path)
+
+    def _sincronizar_directorio(self):
+        """fsync del directorio para que los renombres sobrevivan a un corte (donde se pueda)."""
+        try:
+            fd = os.open(SAVE_DIR, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
 
     def _generar_metadatos(self, eco: Ecosistema, autoguardado: bool, intervalo_autosave: int) -> dict:
         """Genera un diccionario con los metadatos del estado actual del juego."""
-        num_animales = len([a for a in eco.animales if a.esta_vivo()])
-        num_plantas = len([p for p in eco.plantas if p.vida > 0])
+        num_animales = eco.total_vivos
+        num_plantas = eco.plantas_vivas
         
         estado = "Equilibrado"
         if num_plantas < 20:
@@ -58,40 +132,172 @@ class Persistencia:
 
     def guardar_slot(self, slot: str, eco: Ecosistema, intervalo_autosave: int, autoguardado: bool = False):
         """Guarda el estado completo del juego (ecosistema y cadáveres) en un slot."""
-        data_path, meta_path = self._get_paths(slot)
-
-        # Crear backups antes de sobrescribir
-        self._crear_backup(data_path)
-        self._crear_backup(meta_path)
+        return self.escribir_guardado(self.preparar_guardado(slot, eco, intervalo_autosave, autoguardado))
 
-        # Guardar estado completo del juego
-        estado = {
-            "ecosistema": eco,
-            "version_simulador": SIM_VERSION
-        }
+    def preparar_guardado(self, slot: str, eco: Ecosistema, intervalo_autosave: int,
+                          autoguardado: bool = False) -> dict:
+        """Instantánea consistente del juego para escribirla después (en el hilo del juego).
+        El ecosistema se copia aquí a columnas en memoria: es la copia más barata que
+        no cambia mientras se escribe. La compresión, los backups, la escritura y el
+        fsync quedan para escribir_guardado().
+        """
         try:
-            with open(data_path, 'wb') as f:
-                pickle.dump(estado, f)
+            datos = formato_guardado.serializar(eco)
         except Exception as e:
-            print(f"Error al guardar el estado del juego en {data_path}: {e}")
+            print(f"Error al serializar el estado del juego: {e}")
+            datos = None
+        return {
+            "slot": slot,
+            "datos": datos,
+            "metadatos": self._generar_metadatos(eco, autoguardado, intervalo_autosave),
+            "incremental": autoguardado,
+        }
+
+    def escribir_guardado(self, guardado: dict):
+        """Escribe en disco una instantánea de preparar_guardado() (puede ir en otro hilo)."""
+        slot = guardado["slot"]
+        if guardado["datos"] is None:
+            return False, "Error al guardar datos"
+        # La carpeta se crea con el primer guardado: sin guardar no se toca el disco
+        try:
+            os.makedirs(SAVE_DIR, exist_ok=True)
+        except OSError as e:
+            print(f"Error al crear la carpeta de guardados {SAVE_DIR}: {e}")
+            return False, "Error al guardar datos"
+        registro = self._registro_diario(guardado) if guardado.get("incremental") else None
+        if registro is not None:
+            exito = self._anadir_diario(slot, registro, guardado["datos"])
+        else:
+            exito = self._escribir_checkpoint(slot, guardado["datos"])
+        if not exito:
             return False, "Error al guardar datos"
 
-        # Guardar metadatos
+        # Guardar metadatos: confirman el checkpoint y el diario recién escritos
+        diario = self._diarios[slot]
+        metadatos = dict(guardado["metadatos"], crc32=diario["cadena"], bytes_diario=diario["bytes"])
         try:
-            metadatos = self._generar_metadatos(eco, autoguardado, intervalo_autosave)
-            with open(meta_path, 'w') as f:
-                json.dump(metadatos, f, indent=4)
+            self._actualizar_indice(slot, metadatos)
+            self._sincronizar_directorio()
         except Exception as e:
-            print(f"Error al guardar los metadatos en {meta_path}: {e}")
+            print(f"Error al guardar los metadatos en {self._ruta_indice()}: {e}")
             return False, "Error al guardar metadatos"
         
         return True, f"Juego guardado en slot '{slot}'"
 
+    def _registro_diario(self, guardado: dict) -> bytes | None:
+        """Registro con los cambios desde el último guardado del slot, o None si toca checkpoint."""
+        diario = self._diarios.get(guardado["slot"])
+        if diario is None or diario["deltas"] >= MAX_DELTAS_DIARIO:
+            return None
+        if not os.path.exists(self._ruta_diario(guardado["slot"])) and diario["bytes"] > 0:
+            return None
+        delta = formato_guardado.diferencia(diario["base"], guardado["datos"])
+        if delta is None:
+            return None
+        registro = formato_guardado.registro_diario(delta, diario["cadena"])
+        # Compactar cuando el diario ya ocuparía bastante más que un checkpoint
+        if diario["bytes"] + len(registro) > diario["bytes_checkpoint"] * LIMITE_DIARIO:
+            return None
+        return registro
+
+    def _anadir_diario(self, slot: str, registro: bytes, serializado: dict) -> bool:
+        """Añadir un registro al diario del slot tras los registros válidos."""
+        diario = self._diarios[slot]
+        ruta = self._ruta_diario(slot)
+        try:
+            with open(ruta, 'r+b' if os.path.exists(ruta) else 'wb') as f:
+                # Descartar una cola a medio escribir de un guardado que falló
+                f.seek(diario["bytes"])
+                f.write(registro)
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            print(f"Error al escribir el diario {ruta}: {e}")
+            self._diarios.pop(slot, None)  # el próximo guardado será un checkpoint
+            return False
+        diario["base"] = serializado
+        diario["deltas"] += 1
+        diario["bytes"] += len(registro)
+        return True
+
+    def _escribir_checkpoint(self, slot: str, serializado: dict) -> bool:
+        """Escribir el estado completo en el .dat y empezar un diario vacío."""
+        data_path, _ = self._get_paths(slot)
+        ruta_diario = self._ruta_diario(slot)
+        self._diarios.pop(slot, None)
+        try:
+            datos = formato_guardado.empaquetar(serializado, self.comprimir)
+        except Exception as e:
+            print(f"Error al empaquetar el estado del juego: {e}")
+            return False
+
+        # Guardar estado completo del juego (el anterior pasa a .bak)
+        try:
+            self._escribir_atomico(data_path, datos)
+        except Exception as e:
+            print(f"Error al guardar el estado del juego en {data_path}: {e}")
+            return False
+
+        # El diario anterior va con el checkpoint viejo: pasa a .bak y el nuevo empieza vacío
+        try:
+            self._rotar_generaciones(ruta_diario)
+            if os.path.exists(ruta_diario):
+                os.remove(ruta_diario)
+        except Exception as e:
+            print(f"Error al rotar el diario {ruta_diario}: {e}")
+        self._diarios[slot] = {
+            "base": serializado,
+            "cadena": formato_guardado.leer_cabecera(datos)["crc32"],
+            "deltas": 0,
+            "bytes": 0,
+            "bytes_checkpoint": len(datos),
+        }
+        return True
+
+    def _indice(self) -> Dict[str, dict]:
+        """Metadatos de todos los slots; el índice solo se relee si cambió en disco."""
+        try:
+            st = os.stat(self._ruta_indice())
+            firma = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            firma = None
+        with self._cerrojo_indice:
+            if firma != self._firma_indice:
+                self._slots = self._leer_indice() if firma is not None else {}
+                self._firma_indice = firma
+            return self._slots
+
+    def _leer_indice(self) -> Dict[str, dict]:
+        """Slots del índice (o de su generación anterior si el actual no se puede leer)."""
+        for ruta in self._generaciones(self._ruta_indice()):
+            try:
+                with open(ruta, 'r') as f:
+                    return json.load(f)["slots"]
+            except Exception:
+                continue
+        return {}
+
+    def _actualizar_indice(self, slot: str, metadatos: dict):
+        """Escribir el índice con los metadatos nuevos del slot (de forma atómica)."""
+        with self._cerrojo_indice:
+            slots = dict(self._indice())
+            slots[slot] = metadatos
+            ruta = self._ruta_indice()
+            self._escribir_atomico(ruta, json.dumps({"slots": slots}, indent=4).encode())
+            st = os.stat(ruta)
+            self._slots = slots
+            self._firma_indice = (st.st_ino, st.st_mtime_ns, st.st_size)
+
     def cargar_metadatos(self, slot: str):
         """Carga solo los metadatos de un slot para mostrarlos."""
+        metadatos = self._indice().get(slot)
+        if metadatos is not None:
+            return metadatos, None
+        # Slots guardados antes del índice
         _, meta_path = self._get_paths(slot)
         if not os.path.exists(meta_path):
-            return None, "Slot vacío"
+            return self._metadatos_de_cabecera(slot)
         try:
             with open(meta_path, 'r') as f:
                 metadatos = json.load(f)
@@ -101,23 +307,33 @@ class Persistencia:
 
     def cargar_slot(self, slot: str) -> tuple[Ecosistema | None, str]:
         """Carga el estado completo del juego desde un slot y valida la versión."""
-        data_path, meta_path = self._get_paths(slot)
+        data_path, _ = self._get_paths(slot)
         
-        if not os.path.exists(data_path) or not os.path.exists(meta_path):
-            return None, "El slot de guardado está vacío o corrupto."
-
-        # Validar versión
         metadatos, error = self.cargar_metadatos(slot)
         if error:
             return None, error
-        
+
+        try:
+            ruta, actual = self._buscar_checkpoint(data_path, metadatos.get("crc32"))
+            if ruta is None:
+                return None, "El slot de guardado está vacío o corrupto."
+            with open(ruta, 'rb') as f:
+                cabecera = f.read(formato_guardado.CABECERA.size)
+                # Formato binario: la versión está en la cabecera, se valida antes de leer el cuerpo
+                if formato_guardado.es_binario(cabecera):
+                    return self._cargar_binario(slot, f, formato_guardado.leer_cabecera(cabecera),
+                                                metadatos, actual)
+                datos = cabecera + f.read()
+        except Exception as e:
+            return None, f"Error al cargar el estado del juego: {e}"
+
+        # Guardados antiguos (pickle): validar versión con los metadatos
         if metadatos.get("version_simulador") != SIM_VERSION:
             return None, f'Versión incompatible (Juego: {SIM_VERSION}, Guardado: {metadatos.get("version_simulador", "??")})'
 
         # Cargar estado completo del juego
         try:
-            with open(data_path, 'rb') as f:
-                estado_cargado = pickle.load(f)
+            estado_cargado = pickle.loads(datos)
 
             # Compatibilidad con guardados antiguos que solo contenían el objeto Ecosistema
             if isinstance(estado_cargado, Ecosistema):
@@ -125,7 +341,7 @@ class Persistencia:
                 # La verificación de metadatos ya proporciona una barrera.
                 return estado_cargado, "Juego cargado (formato antiguo)."
 
-            # Para nuevos guardados (diccionarios)
+            # Para guardados con diccionario
             if isinstance(estado_cargado, dict):
                 if estado_cargado.get("version_simulador") != SIM_VERSION:
                     return None, f'Versión incompatible (Juego: {SIM_VERSION}, Guardado: {estado_cargado.get("version_simulador", "??")})'
@@ -136,3 +352,139 @@ class Persistencia:
 
         except Exception as e:
             return None, f"Error al cargar el estado del juego: {e}"
+
+    def _cargar_binario(self, slot: str, f, cabecera: dict, metadatos: dict, actual: bool):
+        """Cargar un checkpoint binario abierto en 'f' (ya leída la cabecera) y su diario.
+        El archivo se mapea en memoria y cada columna se lee (y se descomprime) por
+        separado; la base del diario se queda con copias de las columnas en arrays."""
+        if cabecera["version_simulador"] != SIM_VERSION:
+            return None, f'Versión incompatible (Juego: {SIM_VERSION}, Guardado: {cabecera["version_simulador"]})'
+        registros, bytes_diario, diario_actual = self._leer_diario(
+            slot, cabecera["crc32"], metadatos.get("bytes_diario"))
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            eco, base = formato_guardado.desempaquetar_con_base(mapa, registros)
+            bytes_checkpoint = len(mapa)
+        # Los próximos autoguardados de este slot siguen su diario (si lo cargado es
+        # lo actual y no una generación anterior); las bases de los demás slots son
+        # del mundo anterior y ya no sirven
+        self._diarios = {}
+        if actual and diario_actual:
+            self._diarios[slot] = {
+                "base": base,
+                "cadena": cabecera["crc32"],
+                "deltas": len(registros),
+                "bytes": bytes_diario,
+                "bytes_checkpoint": bytes_checkpoint,
+            }
+        return eco, "Juego cargado exitosamente."
+
+    def _buscar_checkpoint(self, data_path: str, crc: int | None) -> tuple[str | None, bool]:
+        """Ruta del checkpoint que confirman los metadatos y si es el archivo actual.
+        Si un guardado se cortó antes de escribir los metadatos, el .dat actual es más
+        nuevo que ellos y el confirmado es una generación anterior con ese crc.
+        Solo se leen las cabeceras."""
+        for i, ruta in enumerate(self._generaciones(data_path)):
+            if not os.path.exists(ruta):
+                continue
+            with open(ruta, 'rb') as f:
+                cabecera = f.read(formato_guardado.CABECERA.size)
+            if (crc is not None and formato_guardado.es_binario(cabecera)
+                    and formato_guardado.leer_cabecera(cabecera)["crc32"] != crc):
+                continue
+            return ruta, i == 0
+        return None, False
+
+    def resumen_slot(self, slot: str, especies: bool = False) -> dict | None:
+        """Resumen de un guardado binario (ciclo, poblaciones, versión) leyendo solo la
+        cabecera del .dat; con especies=True, también el conteo por especie, que solo
+        lee la columna de clases. None si el slot no tiene un guardado binario."""
+        data_path, _ = self._get_paths(slot)
+        if not os.path.exists(data_path):
+            return None
+        with open(data_path, 'rb') as f:
+            cabecera = f.read(formato_guardado.CABECERA.size)
+            if not formato_guardado.es_binario(cabecera):
+                return None
+            resumen = formato_guardado.leer_cabecera(cabecera)
+            if especies:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                    with formato_guardado.GuardadoMapeado(mapa) as guardado:
+                        resumen["especies"] = guardado.especies()
+        return resumen
+
+    def _metadatos_de_cabecera(self, slot: str):
+        """Metadatos para el menú de un .dat que no está en el índice (p. ej. si el índice se perdió)."""
+        data_path, _ = self._get_paths(slot)
+        try:
+            resumen = self.resumen_slot(slot)
+        except Exception as e:
+            return None, f"Error al leer metadatos: {e}"
+        if resumen is None:
+            return None, "Slot vacío"
+        return {
+            "fecha_hora": datetime.fromtimestamp(os.path.getmtime(data_path)).strftime("%Y-%m-%d %H:%M:%S"),
+            "ciclo": resumen["ciclo"],
+            "num_animales": resumen["animales_vivos"],
+            "num_plantas": resumen["plantas_vivas"],
+            "version_simulador": resumen["version_simulador"],
+        }, None
+
+    def _leer_diario(self, slot: str, cadena: int, limite: int | None) -> tuple[list, int, bool]:
+        """Registros del diario del checkpoint 'cadena' hasta los bytes confirmados ('limite'),
+        bytes que ocupan y si salen del diario actual (o de una generación anterior)."""
+        if limite == 0:
+            return [], 0, True
+        mejor = ([], 0, limite is None)
+        for i, ruta in enumerate(self._generaciones(self._ruta_diario(slot))):
+            if not os.path.exists(ruta):
+                continue
+            with open(ruta, 'rb') as f:
+                datos = f.read() if limite is None else f.read(limite)
+            registros, n = formato_guardado.leer_diario(datos, cadena)
+            if limite is None or n == limite:
+                return registros, n, i == 0
+            if n > mejor[1]:
+                mejor = (registros, n, False)
+        return mejor
+
+class GuardadoEnSegundoPlano:
+    """Escribe guardados en un hilo aparte, con como mucho uno en curso.
+    guardar() toma la instantánea en el hilo que llama y vuelve enseguida;
+    resultado() entrega (slot, éxito, mensaje) de cada guardado terminado.
+    """
+
+    def __init__(self, persistencia: Persistencia):
+        self.persistencia = persistencia
+        self._hilo: threading.Thread | None = None
+        self._resultado: tuple | None = None
+
+    def ocupado(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def guardar(self, slot: str, eco: Ecosistema, intervalo_autosave: int, autoguardado: bool = True) -> bool:
+        """Lanzar un guardado; devuelve False (y no hace nada) si ya hay uno en curso."""
+        if self.ocupado():
+            return False
+        guardado = self.persistencia.preparar_guardado(slot, eco, intervalo_autosave, autoguardado)
+        self._hilo = threading.Thread(target=self._escribir, args=(guardado,), name="guardado", daemon=True)
+        self._hilo.start()
+        return True
+
+    def _escribir(self, guardado: dict):
+        try:
+            exito, msg = self.persistencia.escribir_guardado(guardado)
+        except Exception as e:
+            exito, msg = False, f"Error al guardar: {e}"
+        self._resultado = (guardado["slot"], exito, msg)
+
+    def resultado(self) -> tuple | None:
+        """(slot, éxito, mensaje) del último guardado si terminó y no se había entregado."""
+        if self.ocupado():
+            return None
+        res, self._resultado = self._resultado, None
+        return res
+
+    def esperar(self):
+        """Esperar a que termine el guardado en curso (antes de guardar o cargar a mano, o al salir)."""
+        if self._hilo is not None:
+            self._hilo.join()
@@ -0,0 +1,429 @@
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+from array import array
+from multiprocessing import shared_memory
+from typing import List
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from modelo import CADAVER_VIDA_TICKS, Ecosistema, TRexJugador, Triceratops, Stegosaurio, Velociraptor, Dilofosaurio, Moshops
+
+"""
+SIMULACIÓN EN UN PROCESO APARTE
+El Ecosistema, la IA y las colisiones corren en un proceso trabajador y el
+proceso de Pygame solo dibuja y lee el teclado, cada uno en su núcleo.
+- El trabajador publica en memoria compartida (multiprocessing.shared_memory)
+  instantáneas de posiciones y estado con doble búfer: escribe siempre en el
+  búfer que no está publicado y luego lo publica. Cada búfer lleva un contador
+  de secuencia (impar mientras se escribe) para descartar lecturas a medias.
+- El proceso de render copia la última instantánea completa a objetos ligeros
+  (siempre los mismos por posición) que la vista dibuja como el Ecosistema.
+- Teclas, pausa, autoguardado y guardar/cargar van al trabajador por una cola;
+  mensajes y efectos vuelven por otra.
+- Los búferes se dimensionan con los límites del mundo (max_animales,
+  max_plantas y, para los cadáveres, lo que pueden llegar a acumularse en su
+  vida). Si aun así una instantánea no cabe (límites cambiados al cargar), la
+  cabecera lleva los totales reales y el render cuenta el recorte y pasa al
+  trabajador un bloque mayor (el recorte dura como mucho unos frames).
+"""
+
+ESPECIES = [TRexJugador, Triceratops, Stegosaurio, Velociraptor, Dilofosaurio, Moshops]
+ESTADOS_PLANTA = ['brote', 'adulta', 'marchita']
+
+# Cabecera de cada búfer: secuencia y contadores (n_*: escritos; total_*: los del
+# ecosistema, mayores si la instantánea no cupo)
+CABECERA = ['seq', 'ciclo', 'n_animales', 'n_plantas', 'n_cadaveres', 'total_vivos',
+            'plantas_vivas', 'version_plantas', 'generacion', 'max_animales',
+            'total_animales', 'total_plantas', 'total_cadaveres']
+_H = len(CABECERA)
+# Valores por entidad: animal (x, y, especie), planta (x, y, estado), cadáver (x, y, eaten, skull_timer)
+_VA, _VP, _VC = 3, 3, 4
+
+FRAME_DT = 1.0 / 120  # el trabajador aplica la entrada al ritmo de frames del juego
+
+def capacidades(eco) -> tuple:
+    """Capacidades (animales, plantas, cadáveres) para las instantáneas de 'eco'."""
+    # Al publicar, paso() ya ha recortado a max_animales (jugador incluido) y a max_plantas
+    plantas = max(eco.max_plantas, eco.min_plantas)
+    # Un cadáver dura como mucho CADAVER_VIDA_TICKS y en un tick mueren como mucho todos
+    # los animales salvo el jugador
+    cadaveres = CADAVER_VIDA_TICKS * max(1, eco.max_animales - 1)
+    return eco.max_animales, plantas, cadaveres
+
+class CanalInstantaneas:
+    """Doble búfer de instantáneas sobre un bloque de memoria de float64.
+    Posición 0: índice del búfer publicado; después, los dos búferes.
+    """
+
+    def __init__(self, buf, cap_animales: int, cap_plantas: int, cap_cadaveres: int):
+        self.cap_animales = cap_animales
+        self.cap_plantas = cap_plantas
+        self.cap_cadaveres = cap_cadaveres
+        self._mem = memoryview(buf).cast('d')
+        self._ini_plantas = _H + _VA * cap_animales
+        self._ini_cadaveres = self._ini_plantas + _VP * cap_plantas
+        self._largo = self._ini_cadaveres + _VC * cap_cadaveres
+        self._ultima_seq = -1.0
+        self.totales = (0, 0, 0)  # totales reales de la última instantánea leída
+
+    @staticmethod
+    def tamano(cap_animales: int, cap_plantas: int, cap_cadaveres: int) -> int:
+        """Bytes necesarios para el bloque compartido."""
+        return 8 * (1 + 2 * (_H + _VA * cap_animales + _VP * cap_plantas + _VC * cap_cadaveres))
+
+    def _base(self, b: int) -> int:
+        return 1 + b * self._largo
+
+    def publicar(self, eco, generacion: int):
+        """Escribir el estado de 'eco' en el búfer libre y publicarlo (lado del trabajador)."""
+        mem = self._mem
+        b = 1 - int(mem[0])
+        base = self._base(b)
+        seq = mem[base] + 1
+        mem[base] = seq  # impar: escribiendo
+
+        # Lo que no cabe no se escribe, pero se cuenta en los totales
+        animales = array('d')
+        n_a = 0
+        for a in eco.animales:
+            if a.esta_vivo():
+                if n_a < self.cap_animales:
+                    animales.extend((a.x, a.y, _CODIGO_ESPECIE[type(a)]))
+                n_a += 1
+        plantas = array('d')
+        n_p = 0
+        for p in eco.plantas:
+            if p.vida > 0:
+                if n_p < self.cap_plantas:
+                    plantas.extend((p.x, p.y, _CODIGO_ESTADO[p.estado]))
+                n_p += 1
+        cadaveres = array('d')
+        for c in eco.cadaveres[:self.cap_cadaveres]:
+            cadaveres.extend((c.x, c.y, c.eaten, c.skull_timer))
+
+        cabecera = array('d', (seq, eco.ciclo, len(animales) // _VA, len(plantas) // _VP,
+                               len(cadaveres) // _VC, eco.total_vivos, eco.plantas_vivas,
+                               eco.version_plantas, generacion, eco.max_animales,
+                               n_a, n_p, len(eco.cadaveres)))
+        mem[base + 1:base + _H] = cabecera[1:]
+        ini = base + _H
+        mem[ini:ini + len(animales)] = animales
+        ini = base + self._ini_plantas
+        mem[ini:ini + len(plantas)] = plantas
+        ini = base + self._ini_cadaveres
+        mem[ini:ini + len(cadaveres)] = cadaveres
+        mem[base] = seq + 1  # par: completo
+        mem[0] = b
+
+    def leer(self, destino: 'EcosistemaInstantanea', intentos: int = 3) -> bool:
+        """Copiar la última instantánea completa a 'destino' (lado del render).
+        Devuelve False si no hay una nueva o el trabajador la pisó mientras se leía.
+        """
+        mem = self._mem
+        for _ in range(intentos):
+            base = self._base(int(mem[0]))
+            seq = mem[base]
+            if seq == self._ultima_seq or seq == 0:
+                return False  # nada nuevo, o aún no se ha publicado nada
+            if int(seq) % 2:
+                continue
+            cab = mem[base:base + _H].tolist()
+            n_a, n_p, n_c = int(cab[2]), int(cab[3]), int(cab[4])
+            animales = mem[base + _H:base + _H + _VA * n_a].tolist()
+            ini = base + self._ini_plantas
+            plantas = mem[ini:ini + _VP * n_p].tolist()
+            ini = base + self._ini_cadaveres
+            cadaveres = mem[ini:ini + _VC * n_c].tolist()
+            if mem[base] != seq:
+                continue  # el trabajador reescribió este búfer durante la lectura
+            self._ultima_seq = seq
+            self.totales = (int(cab[10]), int(cab[11]), int(cab[12]))
+            destino.actualizar(cab, animales, plantas, cadaveres)
+            return True
+        return False
+
+    def cabe(self) -> bool:
+        """Si la última instantánea leída estaba completa."""
+        return (self.totales[0] <= self.cap_animales and self.totales[1] <= self.cap_plantas
+                and self.totales[2] <= self.cap_cadaveres)
+
+    def cerrar(self):
+        """Soltar la vista sobre el bloque (necesario antes de cerrarlo)."""
+        self._mem.release()
+
+_CODIGO_ESPECIE = {clase: i for i, clase in enumerate(ESPECIES)}
+_CODIGO_ESTADO = {estado: i for i, estado in enumerate(ESTADOS_PLANTA)}
+
+class AnimalInstantanea:
+    """Animal de una instantánea; su clase se cambia a la de la especie (la vista usa el nombre)."""
+    __slots__ = ('x', 'y')
+
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+
+    def esta_vivo(self) -> bool:
+        return True
+
+# Una subclase por especie con el mismo nombre que la del modelo
+_CLASES_INSTANTANEA = [type(clase.__name__, (AnimalInstantanea,), {'__slots__': ()}) for clase in ESPECIES]
+
+class PlantaInstantanea:
+    __slots__ = ('x', 'y', 'estado', 'vida')
+
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.estado = 'brote'
+        self.vida = 1
+
+class CadaverInstantanea:
+    __slots__ = ('x', 'y', 'eaten', 'skull_timer')
+
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.eaten = 0.0
+        self.skull_timer = 0
+
+class EcosistemaInstantanea:
+    """Lo que la vista lee del Ecosistema, reconstruido desde la última instantánea.
+    Los objetos de cada lista se reutilizan por posición para que la vista los reconozca
+    entre frames y solo redibuje los que cambiaron.
+    """
+
+    def __init__(self):
+        self.ciclo = 0
+        self.total_vivos = 0
+        self.plantas_vivas = 0
+        self.max_animales = 0
+        self.version_plantas = (0, 0)  # (generación del ecosistema, versión de plantas)
+        self.animales: List[AnimalInstantanea] = []
+        self.plantas: List[PlantaInstantanea] = []
+        self.cadaveres: List[CadaverInstantanea] = []
+        self._animales: List[AnimalInstantanea] = []
+        self._plantas: List[PlantaInstantanea] = []
+        self._cadaveres: List[CadaverInstantanea] = []
+
+    @staticmethod
+    def _reservar(pool: list, n: int, clase):
+        while len(pool) < n:
+            pool.append(clase())
+
+    def actualizar(self, cab: list, animales: list, plantas: list, cadaveres: list):
+        self.ciclo = int(cab[1])
+        self.total_vivos = int(cab[5])
+        self.plantas_vivas = int(cab[6])
+        self.version_plantas = (int(cab[8]), int(cab[7]))
+        self.max_animales = int(cab[9])
+
+        n = len(animales) // _VA
+        self._reservar(self._animales, n, AnimalInstantanea)
+        for i in range(n):
+            a = self._animales[i]
+            k = i * _VA
+            a.x = animales[k]
+            a.y = animales[k + 1]
+            clase = _CLASES_INSTANTANEA[int(animales[k + 2])]
+            if a.__class__ is not clase:
+                a.__class__ = clase
+        self.animales = self._animales[:n]
+
+        n = len(plantas) // _VP
+        self._reservar(self._plantas, n, PlantaInstantanea)
+        for i in range(n):
+            p = self._plantas[i]
+            k = i * _VP
+            p.x = plantas[k]
+            p.y = plantas[k + 1]
+            p.estado = ESTADOS_PLANTA[int(plantas[k + 2])]
+        self.plantas = self._plantas[:n]
+
+        n = len(cadaveres) // _VC
+        self._reservar(self._cadaveres, n, CadaverInstantanea)
+        for i in range(n):
+            c = self._cadaveres[i]
+            k = i * _VC
+            c.x = cadaveres[k]
+            c.y = cadaveres[k + 1]
+            c.eaten = cadaveres[k + 2]
+            c.skull_timer = int(cadaveres[k + 3])
+        self.cadaveres = self._cadaveres[:n]
+
+class VistaRemota:
+    """Vista del trabajador: acumula mensajes y efectos para enviarlos al render."""
+
+    def __init__(self):
+        self.eventos = []
+
+    def mostrar_mensaje(self, texto: str, duracion_seg: float):
+        self.eventos.append(('mensaje', texto, duracion_seg))
+
+    def spawn_hit_effect(self, x, y, life: int = 10):
+        self.eventos.append(('hit', x, y, life))
+
+    def spawn_eat_effect(self, x, y, life: int = 12):
+        self.eventos.append(('eat', x, y, life))
+
+    def spawn_ai_attack_effect(self, x, y, life: int = 10, spokes: int = 8):
+        self.eventos.append(('ai', x, y, life, spokes))
+
+    def enviar(self, cola):
+        if self.eventos:
+            cola.put(self.eventos)
+            self.eventos = []
+
+    def limpiar(self):
+        pass
+
+def _trabajador(nombre: str, caps: tuple, entrada, salida, seed, ia_por_lotes: bool):
+    """Bucle del proceso de simulación."""
+    from controlador import ControladorJuego, SIM_DT
+
+    # El bloque lo crea y lo libera el proceso de render
+    mem = shared_memory.SharedMemory(name=nombre)
+    canal = CanalInstantaneas(mem.buf, *caps)
+    random.seed(seed)
+    remota = VistaRemota()
+    juego = ControladorJuego(vista=remota, ia_por_lotes=ia_por_lotes)
+    eco = juego.ecosistema
+    generacion = 0
+    entrada_jugador = (0, 0, False)
+    pausado = False
+    sim_accum = 0.0
+    anterior = time.perf_counter()
+    try:
+        while True:
+            # Órdenes del proceso de render
+            while True:
+                try:
+                    orden = entrada.get_nowait()
+                except queue.Empty:
+                    break
+                tipo = orden[0]
+                if tipo == 'salir':
+                    return
+                if tipo == 'control':
+                    _, dx, dy, ataque, pausado, juego.slot_activo, juego.autosave_idx = orden
+                    entrada_jugador = (dx, dy, ataque)
+                elif tipo == 'guardar':
+                    juego._guardar_slot(orden[1])
+                elif tipo == 'cargar':
+                    juego._cargar_slot(orden[1])
+                elif tipo == 'canal':
+                    # Bloque mayor del render: el anterior lo libera él
+                    canal.cerrar()
+                    mem.close()
+                    mem = shared_memory.SharedMemory(name=orden[1])
+                    canal = CanalInstantaneas(mem.buf, *orden[2])
+
+            ahora = time.perf_counter()
+            dt = ahora - anterior
+            anterior = ahora
+            if not pausado:
+                juego._manejar_entrada_jugador(entrada_jugador)
+                sim_accum = juego._avanzar_simulacion(sim_accum + dt)
+            juego._revisar_guardado()
+            if juego.ecosistema is not eco:
+                eco = juego.ecosistema
+                generacion += 1
+            canal.publicar(eco, generacion)
+            remota.enviar(salida)
+
+            resto = FRAME_DT - (time.perf_counter() - ahora)
+            if resto > 0:
+                time.sleep(resto)
+    finally:
+        juego.guardado.esperar()
+        canal.cerrar()
+        mem.close()
+
+class SimulacionEnProceso:
+    """Lado del render: arranca el trabajador, le envía órdenes y lee sus instantáneas."""
+
+    def __init__(self, seed: int | None = None, ia_por_lotes: bool = False,
+                 capacidades_iniciales: tuple | None = None):
+        """capacidades_iniciales: (animales, plantas, cadáveres) de los búferes; por defecto,
+        las de un Ecosistema nuevo (ver capacidades()). Crecen si una instantánea no cabe."""
+        if capacidades_iniciales is None:
+            capacidades_iniciales = capacidades(Ecosistema())
+        self._mem, self.canal = self._crear_canal(capacidades_iniciales)
+        self.recortes = 0  # instantáneas leídas que no cabían en los búferes
+        self.ecosistema = EcosistemaInstantanea()
+        # 'spawn': el hijo no hereda el estado de Pygame (ventana, display) del proceso padre
+        ctx = mp.get_context('spawn')
+        self._entrada = ctx.Queue()
+        self._salida = ctx.Queue()
+        self._ultimo_control = None
+        self.proceso = ctx.Process(
+            target=_trabajador, name="simulacion", daemon=True,
+            args=(self._mem.name, capacidades_iniciales, self._entrada, self._salida, seed, ia_por_lotes))
+        self.proceso.start()
+
+    @staticmethod
+    def _crear_canal(caps: tuple):
+        mem = shared_memory.SharedMemory(create=True, size=CanalInstantaneas.tamano(*caps))
+        mem.buf[:] = bytes(mem.size)
+        return mem, CanalInstantaneas(mem.buf, *caps)
+
+    def _ampliar_canal(self):
+        """Pasar a un bloque donde quepa la última instantánea (con margen) y enviárselo al trabajador."""
+        canal = self.canal
+        actuales = (canal.cap_animales, canal.cap_plantas, canal.cap_cadaveres)
+        caps = tuple(max(cap, total + total // 2) for cap, total in zip(actuales, canal.totales))
+        mem, self.canal = self._crear_canal(caps)
+        self._entrada.put(('canal', mem.name, caps))
+        # El trabajador puede seguir escribiendo en el bloque anterior hasta leer la orden:
+        # desenlazarlo ya es seguro, la memoria dura mientras alguien la tenga abierta
+        canal.cerrar()
+        self._mem.close()
+        self._mem.unlink()
+        self._mem = mem
+
+    def vivo(self) -> bool:
+        return self.proceso.is_alive()
+
+    def controlar(self, entrada: tuple, pausado: bool, slot_activo: int, autosave_idx: int):
+        """Enviar teclas, pausa y autoguardado (solo si cambiaron)."""
+        control = ('control', *entrada, pausado, slot_activo, autosave_idx)
+        if control != self._ultimo_control:
+            self._entrada.put(control)
+            self._ultimo_control = control
+
+    def guardar(self, slot: str):
+        self._entrada.put(('guardar', slot))
+
+    def cargar(self, slot: str):
+        self._entrada.put(('cargar', slot))
+
+    def eventos(self) -> list:
+        """Mensajes y efectos enviados por el trabajador desde la última llamada."""
+        res = []
+        while True:
+            try:
+                res.extend(self._salida.get_nowait())
+            except queue.Empty:
+                return res
+
+    def actualizar(self) -> bool:
+        """Copiar la última instantánea a self.ecosistema (False si no había una nueva).
+        Si venía recortada, se dibuja igual y se amplían los búferes para las siguientes."""
+        if not self.canal.leer(self.ecosistema):
+            return False
+        if not self.canal.cabe():
+            self.recortes += 1
+            self._ampliar_canal()
+        return True
+
+    def cerrar(self):
+        if self.proceso.is_alive():
+            self._entrada.put(('salir',))
+            self.proceso.join(2.0)
+            if self.proceso.is_alive():
+                self.proceso.terminate()
+        self.canal.cerrar()
+        self._mem.close()
+        self._mem.unlink()
@@ -0,0 +1,90 @@
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from controlador import ControladorJuego
+
+"""
+SIMULACIÓN SIN PANTALLA
+Avanza el ecosistema (modelo, IA y colisiones) tan rápido como permita la CPU,
+sin ventana, sin límite de FPS y sin efectos visuales.
+Uso: python -m simulador --ticks 10000 --seed 42
+"""
+
+class VistaNula:
+    """Vista sin pantalla: descarta mensajes y efectos."""
+
+    def mostrar_mensaje(self, texto: str, duracion_seg: float):
+        pass
+
+    def spawn_hit_effect(self, x, y, life: int = 10):
+        pass
+
+    def spawn_eat_effect(self, x, y, life: int = 12):
+        pass
+
+    def spawn_ai_attack_effect(self, x, y, life: int = 10, spokes: int = 8):
+        pass
+
+    def limpiar(self):
+        pass
+
+class SimuladorSinPantalla:
+    """Ejecuta pasos lógicos del ControladorJuego sin ventana."""
+
+    def __init__(self, seed: int | None = None, ia_por_lotes: bool = False):
+        random.seed(seed)
+        self.vista = VistaNula()
+        self.juego = ControladorJuego(vista=self.vista, ia_por_lotes=ia_por_lotes)
+
+    @property
+    def ecosistema(self):
+        return self.juego.ecosistema
+
+    def paso(self):
+        self.juego.paso_simulacion()
+
+    def ejecutar(self, ticks: int) -> float:
+        """Avanzar 'ticks' pasos y devolver los segundos empleados."""
+        inicio = time.perf_counter()
+        for _ in range(ticks):
+            self.paso()
+        return time.perf_counter() - inicio
+
+    def poblaciones(self) -> dict:
+        eco = self.juego.ecosistema
+        especies = Counter(type(a).__name__ for a in eco.animales if a.esta_vivo())
+        return {
+            "ciclo": eco.ciclo,
+            "animales": sum(especies.values()),
+            "especies": dict(sorted(especies.items())),
+            "plantas": sum(1 for p in eco.plantas if p.vida > 0),
+            "cadaveres": len(eco.cadaveres),
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="simulador", description="Simulación del ecosistema sin pantalla.")
+    parser.add_argument("--ticks", type=int, default=1000, help="pasos lógicos a simular")
+    parser.add_argument("--seed", type=int, default=None, help="semilla aleatoria")
+    parser.add_argument("--lotes", action="store_true", help="IA vectorizada por lotes (NumPy)")
+    args = parser.parse_args(argv)
+
+    sim = SimuladorSinPantalla(args.seed, ia_por_lotes=args.lotes)
+    segundos = sim.ejecutar(args.ticks)
+    pob = sim.poblaciones()
+
+    tps = args.ticks / segundos if segundos > 0 else float('inf')
+    print(f"Ticks: {args.ticks} en {segundos:.3f} s ({tps:.1f} ticks/s)")
+    print(f"Ciclo final: {pob['ciclo']}")
+    print(f"Animales: {pob['animales']} | Plantas: {pob['plantas']} | Cadáveres: {pob['cadaveres']}")
+    for nombre, n in pob['especies'].items():
+        print(f"  {nombre}: {n}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Fase amplia de ControladorJuego._resolver_colisiones contra el recorrido
+exhaustivo O(n²): mismos empujes, en el mismo orden, en mundos sembrados.
+"""
+import os
+import random
+
+import pytest
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from controlador import ControladorJuego, COLISION_MIN_D
+from modelo import Ecosistema, TRexJugador, Triceratops, Velociraptor, Moshops
+from simulador import VistaNula
+
+def resolver_fuerza_bruta(juego: ControladorJuego):
+    """Referencia: separar cada par (i, j > i) en el orden de la lista."""
+    vivos = [a for a in juego.ecosistema.animales if a.esta_vivo()]
+    for i in range(len(vivos)):
+        for j in range(i + 1, len(vivos)):
+            juego._separar_par(vivos[i], vivos[j], COLISION_MIN_D)
+    for a in vivos:
+        juego.ecosistema.reubicar(a)
+
+def _juego(posiciones, width=400, height=300) -> ControladorJuego:
+    juego = ControladorJuego(vista=VistaNula())
+    eco = Ecosistema(width, height)
+    eco.agregar_animal(TRexJugador(width // 2, height // 2))
+    clases = (Triceratops, Velociraptor, Moshops)
+    for k, (x, y) in enumerate(posiciones):
+        eco.agregar_animal(clases[k % len(clases)](x, y))
+    juego.ecosistema = eco
+    return juego
+
+def _resolver_ambos(posiciones, seed, **tam):
+    """Posiciones finales (y estado de random) con la fase amplia y con fuerza bruta."""
+    res = []
+    for resolver in (ControladorJuego._resolver_colisiones, resolver_fuerza_bruta):
+        juego = _juego(posiciones, **tam)
+        random.seed(seed)
+        resolver(juego)
+        res.append(([(a.x, a.y) for a in juego.ecosistema.animales], random.random()))
+    return res
+
+def _aleatorias(seed, n, width, height):
+    rnd = random.Random(seed)
+    return [(rnd.uniform(0, width), rnd.uniform(0, height)) for _ in range(n)]
+
+@pytest.mark.parametrize("seed", range(8))
+def test_mundos_sembrados(seed):
+    # Densidad alta: muchos solapes encadenados
+    amplia, bruta = _resolver_ambos(_aleatorias(seed, 150, 400, 300), seed)
+    assert amplia == bruta
+
+@pytest.mark.parametrize("seed", range(3))
+def test_mundo_grande(seed):
+    amplia, bruta = _resolver_ambos(_aleatorias(100 + seed, 400, 1200, 800), seed, width=1200, height=800)
+    assert amplia == bruta
+
+def test_pares_coincidentes():
+    # Distancia 0: la dirección del empuje sale de random y debe consumirse igual
+    posiciones = [(100, 100), (100, 100), (100, 100), (250, 40), (250, 40), (0, 0), (0, 0)]
+    amplia, bruta = _resolver_ambos(posiciones, 7)
+    assert amplia == bruta
+
+def test_pares_en_bordes_de_celda():
+    d = COLISION_MIN_D
+    posiciones = [
+        (d - 0.01, 50), (d + 0.01, 50),          # a ambos lados de un borde vertical
+        (2 * d, 3 * d - 0.5), (2 * d, 3 * d),    # borde horizontal
+        (5 * d - 0.1, 5 * d - 0.1), (5 * d, 5 * d),  # esquina (celdas en diagonal)
+        (8 * d, 60), (9 * d - 0.001, 60),        # casi a min_d, en celdas contiguas
+        (10 * d, 100), (11 * d, 100),            # justo a min_d: no se tocan
+        (0, 0), (0.5, 0.5),                      # borde del mundo
+        (400, 300), (399.5, 299.5),
+    ]
+    amplia, bruta = _resolver_ambos(posiciones, 3)
+    assert amplia == bruta
+
+def test_indice_al_dia():
+    juego = _juego(_aleatorias(5, 150, 400, 300))
+    juego._resolver_colisiones()
+    eco = juego.ecosistema
+    for a in eco.animales:
+        assert a in eco.within(a.x, a.y, 0.5, 'animal')
@@ -0,0 +1,165 @@
+"""
+Contadores de población incrementales (total_vivos, vivos_especie y
+plantas_vivas) comparados con un recuento completo.
+"""
+import os
+import pickle
+
+import pytest
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import modelo
+from modelo import Ecosistema, TRexJugador, Triceratops, Stegosaurio, Velociraptor
+from simulador import SimuladorSinPantalla
+
+def _sin_ceros(especies: dict) -> dict:
+    return {k: v for k, v in especies.items() if v}
+
+def _recuento(eco: Ecosistema) -> dict:
+    especies = {}
+    for a in eco.animales:
+        if a.esta_vivo() and id(a) not in eco._rem_anim:
+            especies[type(a).__name__] = especies.get(type(a).__name__, 0) + 1
+    return especies
+
+@pytest.mark.parametrize("lotes", [False, True], ids=["objetos", "lotes"])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_simulacion_sembrada(seed, lotes, monkeypatch):
+    # Con DEPURAR_CONTADORES, paso() comprueba a mitad del paso y tras limpiar
+    monkeypatch.setattr(modelo, "DEPURAR_CONTADORES", True)
+    sim = SimuladorSinPantalla(seed, ia_por_lotes=lotes)
+    for _ in range(400):
+        sim.paso()
+        # Después de la IA y las colisiones también deben cuadrar
+        sim.ecosistema.verificar_contadores()
+
+def test_marcar_dos_veces_descuenta_una():
+    eco = Ecosistema()
+    animales = [Triceratops(10, 10), Triceratops(20, 20), Velociraptor(30, 30)]
+    for a in animales:
+        eco.agregar_animal(a)
+    assert eco.total_vivos == 3
+    animales[0].morir()
+    eco.marcar_para_remover(animales[0])
+    eco.marcar_para_remover(animales[0])
+    assert eco.total_vivos == 2
+    assert eco.contar_especie('Triceratops') == 1
+    eco.limpiar_muertos()
+    assert eco.total_vivos == 2
+    eco.verificar_contadores(limpio=True)
+
+def test_muerte_por_ataque():
+    eco = Ecosistema()
+    raptor = Velociraptor(10, 10)
+    presa = Stegosaurio(12, 10)
+    eco.agregar_animal(raptor)
+    eco.agregar_animal(presa)
+    presa.vida = 1
+    raptor.atacar(presa, eco)
+    assert eco.contar_especie('Stegosaurio') == 0
+    assert eco.total_vivos == 1
+    eco.verificar_contadores()
+
+def test_atacante_agotado_se_retira():
+    eco = Ecosistema()
+    raptor = Velociraptor(10, 10)
+    presa = Stegosaurio(12, 10)
+    eco.agregar_animal(raptor)
+    eco.agregar_animal(presa)
+    raptor.energia = 2
+    presa.vida = 100
+    raptor.atacar(presa, eco)
+    assert not raptor.esta_vivo()
+    assert id(raptor) in eco._rem_anim
+    assert eco.contar_especie('Velociraptor') == 0
+    assert eco.total_vivos == 1
+    eco.verificar_contadores()
+    eco.limpiar_muertos()
+    assert eco.animales == [presa]
+
+def test_jugador_cuenta_y_no_se_retira():
+    eco = Ecosistema()
+    eco.poblar_inicial()
+    assert eco.contar_especie('TRexJugador') == 1
+    eco.jugador.morir()  # el jugador es inmortal
+    eco.marcar_para_remover(Triceratops(0, 0))  # no estaba contado
+    assert eco.total_vivos == 1
+    eco.verificar_contadores()
+
+def test_plantas_vivas():
+    eco = Ecosistema()
+    eco.poblar_inicial()
+    n = len(eco.plantas)
+    p = eco.plantas[0]
+    p.ser_comida()
+    eco.marcar_planta_para_remover(p)
+    eco.marcar_planta_para_remover(p)
+    assert eco.plantas_vivas == n - 1
+    eco.verificar_contadores()
+    eco.limpiar_muertos()
+    assert eco.plantas_vivas == len(eco.plantas) == n - 1
+
+def test_recuento_al_cargar():
+    sim = SimuladorSinPantalla(4)
+    sim.juego.ecosistema.max_animales = 40
+    for _ in range(300):
+        sim.paso()
+    eco = sim.ecosistema
+    # Un muerto marcado y sin limpiar no debe volver a contarse al cargar
+    victima = next(a for a in eco.animales if not isinstance(a, TRexJugador))
+    victima.morir()
+    eco.marcar_para_remover(victima)
+    cargado = pickle.loads(pickle.dumps(eco))
+    assert cargado.total_vivos == eco.total_vivos
+    assert _sin_ceros(cargado.vivos_especie) == _sin_ceros(eco.vivos_especie) == _recuento(cargado)
+    cargado.verificar_contadores()
+
+# --- limpiar_muertos ---
+
+def _ecosistema_con(n_animales: int) -> Ecosistema:
+    eco = Ecosistema()
+    eco.poblar_inicial()
+    for i in range(n_animales):
+        eco.agregar_animal((Triceratops, Velociraptor)[i % 2](20 + 15 * i, 40 + 7 * i))
+    return eco
+
+def test_limpiar_conserva_orden_e_indice():
+    eco = _ecosistema_con(12)
+    muertos = [eco.animales[k] for k in (9, 2, 5)]
+    for a in muertos:
+        a.morir()
+        eco.marcar_para_remover(a)
+    plantas = [eco.plantas[k] for k in (3, 0)]
+    for p in plantas:
+        p.ser_comida()
+        eco.marcar_planta_para_remover(p)
+    esperados = [a for a in eco.animales if a not in muertos]
+    esperadas = [p for p in eco.plantas if p not in plantas]
+    eco.limpiar_muertos()
+    assert eco.animales == esperados
+    assert eco.plantas == esperadas
+    assert not eco._rem_anim and not eco._rem_pla
+    for a in muertos:
+        assert a not in eco.within(a.x, a.y, 1, 'animal')
+    for p in plantas:
+        assert p not in eco.within(p.x, p.y, 1, 'planta')
+    eco.verificar_contadores(limpio=True)
+
+def test_limpiar_sin_marcas_no_toca_las_listas():
+    eco = _ecosistema_con(5)
+    animales, plantas, version = eco.animales, eco.plantas, eco.version_plantas
+    eco.limpiar_muertos()
+    assert eco.animales is animales and eco.plantas is plantas
+    assert eco.version_plantas == version
+
+def test_planta_retirada_libera_su_sitio():
+    eco = Ecosistema()
+    eco.poblar_inicial()
+    muestreo = eco._muestreo(55)
+    p = eco.plantas[0]
+    assert not muestreo.libre(p.x, p.y)
+    p.ser_comida()
+    eco.marcar_planta_para_remover(p)
+    eco.limpiar_muertos()
+    assert len(muestreo) == len(eco.plantas)
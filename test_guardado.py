@@ -0,0 +1,290 @@
+"""
+Guardado y carga: ida y vuelta exacta del formato binario, estructuras que se
+reconstruyen al cargar y rechazo de guardados dañados o de otra versión.
+"""
+import mmap
+import os
+import pickle
+import random
+
+import pytest
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import formato_guardado
+import persistencia
+from modelo import Ecosistema, SIM_VERSION, _campos
+from persistencia import Persistencia
+from simulador import SimuladorSinPantalla
+
+@pytest.fixture(autouse=True)
+def _en_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(persistencia, "SAVE_DIR", str(tmp_path / "saves"))
+
+def estado(eco: Ecosistema) -> tuple:
+    """Todo lo que define la partida, comparable con ==."""
+    def campos(o, excluir=('_pos',)):
+        return (type(o).__name__,) + tuple((c, getattr(o, c)) for c in _campos(type(o)) if c not in excluir)
+    animales = eco.animales
+    return (
+        eco.ciclo, eco.width, eco.height, eco.max_animales, eco.min_plantas, eco.max_plantas,
+        dict(eco.limites_especie), {k: c.__name__ for k, c in eco.especie_clase.items()},
+        [campos(a) for a in animales],
+        [campos(p) for p in eco.plantas],
+        [campos(c) for c in eco.cadaveres],
+        [animales.index(a) for a in eco._rem_anim.values()],
+        [eco.plantas.index(p) for p in eco._rem_pla.values()],
+        animales.index(eco.jugador) if eco.jugador is not None else -1,
+        eco.total_vivos, {k: v for k, v in eco.vivos_especie.items() if v},
+    )
+
+def simulacion(seed: int, ticks: int) -> SimuladorSinPantalla:
+    sim = SimuladorSinPantalla(seed)
+    sim.ejecutar(ticks)
+    return sim
+
+def con_marcas(eco: Ecosistema) -> Ecosistema:
+    """Dejar un animal y una planta marcados sin limpiar (el guardado los conserva)."""
+    a = eco.animales[-1]
+    a.morir()
+    eco.marcar_para_remover(a)
+    p = eco.plantas[1]
+    p.ser_comida()
+    eco.marcar_planta_para_remover(p)
+    return eco
+
+@pytest.mark.parametrize("comprimir", [True, False])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_ida_y_vuelta_exacta(seed, comprimir):
+    eco = con_marcas(simulacion(seed, 400).ecosistema)
+    datos = formato_guardado.empaquetar(formato_guardado.serializar(eco), comprimir)
+    assert estado(formato_guardado.desempaquetar(datos)) == estado(eco)
+
+def test_sin_guardar_no_toca_el_disco(tmp_path):
+    sim = simulacion(2, 50)
+    Persistencia().cargar_slot("slot1")
+    assert not (tmp_path / "saves").exists()
+    assert Persistencia().guardar_slot("slot1", sim.ecosistema, 0)[0]
+    assert (tmp_path / "saves" / "slot1.dat").exists()
+
+def test_cabecera_sin_cuerpo():
+    eco = simulacion(2, 300).ecosistema
+    datos = formato_guardado.empaquetar(formato_guardado.serializar(eco))
+    cab = formato_guardado.leer_cabecera(datos[:formato_guardado.CABECERA.size])
+    assert cab['version_simulador'] == SIM_VERSION
+    assert (cab['ciclo'], cab['animales_vivos'], cab['plantas_vivas']) == (eco.ciclo, eco.total_vivos, eco.plantas_vivas)
+
+def test_slot_ida_y_vuelta():
+    eco = con_marcas(simulacion(3, 300).ecosistema)
+    p = Persistencia()
+    assert p.guardar_slot("slot1", eco, 0)[0]
+    cargado, msg = Persistencia().cargar_slot("slot1")
+    assert cargado is not None, msg
+    assert estado(cargado) == estado(eco)
+
+def test_estructuras_derivadas():
+    # El índice espacial, los muestreos y los contadores se reconstruyen al cargar
+    sim = simulacion(5, 300)
+    eco = sim.ecosistema
+    Persistencia().guardar_slot("slot1", eco, 0)
+    cargado, _ = Persistencia().cargar_slot("slot1")
+    rnd = random.Random(1)
+    for _ in range(50):
+        x, y = rnd.uniform(0, eco.width), rnd.uniform(0, eco.height)
+        for tipo in ('animal', 'planta', 'cadaver'):
+            a, b = eco.nearest(tipo, x, y), cargado.nearest(tipo, x, y)
+            assert (a is None) == (b is None)
+            if a is not None:
+                assert (a.x - x) ** 2 + (a.y - y) ** 2 == (b.x - x) ** 2 + (b.y - y) ** 2
+    original, nuevo = eco._muestreo(55), cargado._muestreo(55)
+    assert original._cobertura == nuevo._cobertura
+    assert sorted(original._libres) == sorted(nuevo._libres)
+    # Y la partida cargada sigue avanzando con los contadores al día
+    otra = SimuladorSinPantalla(5)
+    otra.juego.ecosistema = cargado
+    for _ in range(200):
+        otra.paso()
+        cargado.verificar_contadores()
+
+def test_version_incompatible(monkeypatch):
+    Persistencia().guardar_slot("slot1", simulacion(1, 50).ecosistema, 0)
+    monkeypatch.setattr(persistencia, "SIM_VERSION", "9.9.9")
+    eco, msg = Persistencia().cargar_slot("slot1")
+    assert eco is None and "Versión incompatible" in msg
+
+def test_guardado_danado():
+    eco = simulacion(1, 50).ecosistema
+    datos = bytearray(formato_guardado.empaquetar(formato_guardado.serializar(eco)))
+    datos[len(datos) // 2] ^= 0xFF
+    with pytest.raises(formato_guardado.ErrorFormato):
+        formato_guardado.desempaquetar(bytes(datos))
+    with pytest.raises(formato_guardado.ErrorFormato):
+        formato_guardado.desempaquetar(bytes(datos[:len(datos) - 10]))
+
+def test_guardado_pickle_antiguo():
+    eco = simulacion(4, 200).ecosistema
+    p = Persistencia()
+    data_path, meta_path = p._get_paths("slot2")
+    os.makedirs(os.path.dirname(data_path))
+    with open(data_path, 'wb') as f:
+        pickle.dump({"version_simulador": SIM_VERSION, "ecosistema": eco}, f)
+    with open(meta_path, 'w') as f:
+        f.write('{"version_simulador": "%s", "ciclo": %d}' % (SIM_VERSION, eco.ciclo))
+    cargado, msg = Persistencia().cargar_slot("slot2")
+    assert cargado is not None, msg
+    assert estado(cargado) == estado(eco)
+
+# --- Diario de cambios ---
+
+def _autoguardados(p: Persistencia, sim: SimuladorSinPantalla, n: int, ticks: int = 10):
+    for _ in range(n):
+        sim.ejecutar(ticks)
+        assert p.guardar_slot("slot1", sim.ecosistema, 0, autoguardado=True)[0]
+
+def test_diario_se_reaplica_exacto(monkeypatch):
+    # En el mundo base cada registro ocupa casi lo que un checkpoint: sin subir
+    # LIMITE_DIARIO se compactaría cada dos
+    monkeypatch.setattr(persistencia, "LIMITE_DIARIO", 100.0)
+    sim = simulacion(6, 100)
+    p = Persistencia()
+    p.guardar_slot("slot1", sim.ecosistema, 0)
+    _autoguardados(p, sim, 5)
+    assert p._diarios["slot1"]["deltas"] == 5
+    cargado, msg = Persistencia().cargar_slot("slot1")
+    assert cargado is not None, msg
+    assert estado(cargado) == estado(sim.ecosistema)
+
+def test_diario_ignora_cola_rota():
+    sim = simulacion(7, 100)
+    p = Persistencia()
+    p.guardar_slot("slot1", sim.ecosistema, 0)
+    _autoguardados(p, sim, 2)
+    esperado = estado(sim.ecosistema)
+    # Medio registro de un guardado que no llegó a confirmarse
+    sim.ejecutar(10)
+    diario = p._diarios["slot1"]
+    delta = formato_guardado.diferencia(diario["base"], formato_guardado.serializar(sim.ecosistema))
+    registro = formato_guardado.registro_diario(delta, diario["cadena"])
+    with open(p._ruta_diario("slot1"), 'ab') as f:
+        f.write(registro[:len(registro) // 2])
+    cargado, msg = Persistencia().cargar_slot("slot1")
+    assert cargado is not None, msg
+    assert estado(cargado) == esperado
+
+def test_diario_se_compacta(monkeypatch):
+    monkeypatch.setattr(persistencia, "MAX_DELTAS_DIARIO", 3)
+    monkeypatch.setattr(persistencia, "LIMITE_DIARIO", 100.0)
+    sim = simulacion(8, 100)
+    p = Persistencia()
+    p.guardar_slot("slot1", sim.ecosistema, 0)
+    cadena = p._diarios["slot1"]["cadena"]
+    _autoguardados(p, sim, 4)
+    # El cuarto autoguardado fue un checkpoint nuevo con el diario vacío
+    assert p._diarios["slot1"]["cadena"] != cadena
+    assert p._diarios["slot1"]["deltas"] == 0
+    _autoguardados(p, sim, 1)
+    assert p._diarios["slot1"]["deltas"] == 1
+    cargado, msg = Persistencia().cargar_slot("slot1")
+    assert cargado is not None, msg
+    assert estado(cargado) == estado(sim.ecosistema)
+
+def test_formato_desconocido():
+    sim = simulacion(9, 100)
+    base = formato_guardado.serializar(sim.ecosistema)
+    datos = bytearray(formato_guardado.empaquetar(base))
+    formato_guardado._U16.pack_into(datos, 4, formato_guardado.VERSION_FORMATO + 1)
+    with pytest.raises(formato_guardado.ErrorFormato):
+        formato_guardado.desempaquetar(bytes(datos))
+    # Un registro de otro formato corta el diario como uno dañado
+    sim.ejecutar(10)
+    delta = formato_guardado.diferencia(base, formato_guardado.serializar(sim.ecosistema))
+    registro = formato_guardado.registro_diario(delta, 7)
+    otro = bytearray(registro)
+    formato_guardado._U16.pack_into(otro, 4, formato_guardado.VERSION_FORMATO + 1)
+    registros, leidos = formato_guardado.leer_diario(registro + bytes(otro), 7)
+    assert (len(registros), leidos) == (1, len(registro))
+
+# --- Lectura perezosa por columnas ---
+
+def test_especies_solo_lee_las_clases():
+    eco = con_marcas(simulacion(12, 200).ecosistema)
+    datos = formato_guardado.empaquetar(formato_guardado.serializar(eco))
+    with formato_guardado.GuardadoMapeado(datos) as guardado:
+        assert guardado.especies() == _por_especie(eco)
+        columnas = guardado.columnas
+        leidas = {columnas.directorio[t][1][c][1] for t, c in (('meta', 'json'), ('animales', 'clase'))}
+        assert columnas._verificadas == leidas
+
+def _por_especie(eco: Ecosistema) -> dict:
+    # especies() cuenta también los muertos sin limpiar
+    conteo = {}
+    for a in eco.animales:
+        conteo[type(a).__name__] = conteo.get(type(a).__name__, 0) + 1
+    return conteo
+
+def _columna(datos: bytes, tabla: str, campo: str) -> tuple:
+    with formato_guardado.GuardadoMapeado(datos) as guardado:
+        return guardado.columnas.directorio[tabla][1][campo]
+
+@pytest.mark.parametrize("comprimir", [True, False])
+def test_columna_danada_se_detecta_al_leerla(comprimir):
+    eco = simulacion(13, 200).ecosistema
+    datos = bytearray(formato_guardado.empaquetar(formato_guardado.serializar(eco), comprimir))
+    _, inicio, n, _, _ = _columna(bytes(datos), 'animales', 'x')
+    datos[formato_guardado.CABECERA.size + inicio + n // 2] ^= 0xFF
+    datos = bytes(datos)
+    with formato_guardado.GuardadoMapeado(datos) as guardado:
+        # El resto de columnas se sigue leyendo
+        assert sum(guardado.especies().values()) == len(eco.animales)
+        assert list(guardado.columnas.columna('animales', 'y')) == [a.y for a in eco.animales]
+        with pytest.raises(formato_guardado.ErrorFormato):
+            guardado.columnas.columna('animales', 'x')
+    with pytest.raises(formato_guardado.ErrorFormato):
+        formato_guardado.desempaquetar(datos)
+
+def test_directorio_danado():
+    datos = bytearray(formato_guardado.empaquetar(formato_guardado.serializar(simulacion(13, 50).ecosistema)))
+    datos[formato_guardado.CABECERA.size + 10] ^= 0xFF
+    with formato_guardado.GuardadoMapeado(bytes(datos)) as guardado:
+        with pytest.raises(formato_guardado.ErrorFormato):
+            guardado.especies()
+
+def test_columnas_sin_comprimir_son_vistas(tmp_path):
+    eco = simulacion(14, 200).ecosistema
+    ruta = tmp_path / "mapa.dat"
+    ruta.write_bytes(formato_guardado.empaquetar(formato_guardado.serializar(eco), comprimir=False))
+    with open(ruta, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        with formato_guardado.GuardadoMapeado(mapa) as guardado:
+            x = guardado.columnas.columna('animales', 'x')
+            assert isinstance(x, memoryview) and x.obj is mapa
+            assert list(x) == [a.x for a in eco.animales]
+        # Sin vistas vivas el mapa se puede cerrar
+        assert estado(formato_guardado.desempaquetar(mapa)) == estado(eco)
+
+def test_columnas_comprimidas_solo_si_compensa():
+    eco = simulacion(14, 200).ecosistema
+    datos = formato_guardado.empaquetar(formato_guardado.serializar(eco))
+    with formato_guardado.GuardadoMapeado(datos) as guardado:
+        entradas = [c for _, columnas in guardado.columnas.directorio.values() for c in columnas.values()]
+    comprimidas = [e for e in entradas if e[3] is not None]
+    assert comprimidas and len(comprimidas) < len(entradas)
+    assert all(e[2] <= e[3] * formato_guardado.COMPRESION_UTIL for e in comprimidas)
+
+def test_base_de_columnas_sigue_el_diario(monkeypatch):
+    # La base del diario sale de las columnas cargadas (arrays, no listas) y el
+    # siguiente autoguardado se calcula contra ella
+    monkeypatch.setattr(persistencia, "LIMITE_DIARIO", 100.0)
+    sim = simulacion(15, 100)
+    Persistencia().guardar_slot("slot1", sim.ecosistema, 0)
+    p = Persistencia()
+    cargado, msg = p.cargar_slot("slot1")
+    assert cargado is not None, msg
+    columnas = p._diarios["slot1"]["base"]["tablas"]["animales"].values()
+    assert any(not isinstance(v, list) for v in columnas)
+    otra = SimuladorSinPantalla(15)
+    otra.juego.ecosistema = cargado
+    _autoguardados(p, otra, 3)
+    assert p._diarios["slot1"]["deltas"] == 3
+    final, msg = Persistencia().cargar_slot("slot1")
+    assert final is not None, msg
+    assert estado(final) == estado(cargado)
@@ -0,0 +1,43 @@
+"""
+Slots de guardado: teclas de selección y metadatos de todos los slots del índice.
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg
+
+from controlador import NUM_SLOTS
+from simulador import SimuladorSinPantalla
+
+@pytest.fixture
+def juego():
+    sim = SimuladorSinPantalla(0)
+    sim.juego.estado_juego = 'PANTALLA_CARGAR'
+    return sim.juego
+
+def _tecla(juego, tecla):
+    juego._manejar_eventos_menu(pg.event.Event(pg.KEYDOWN, key=tecla))
+
+def test_recorre_todos_los_slots(juego):
+    for _ in range(NUM_SLOTS + 2):
+        _tecla(juego, pg.K_DOWN)
+    assert juego.slot_seleccionado == NUM_SLOTS
+    for _ in range(NUM_SLOTS + 2):
+        _tecla(juego, pg.K_UP)
+    assert juego.slot_seleccionado == 1
+
+def test_teclas_numericas(juego):
+    _tecla(juego, pg.K_0 + NUM_SLOTS)
+    assert juego.slot_seleccionado == NUM_SLOTS
+    # Las teclas de slots que no existen no hacen nada
+    _tecla(juego, pg.K_0 + NUM_SLOTS + 1)
+    assert juego.slot_seleccionado == NUM_SLOTS
+    juego._manejar_eventos_jugando(pg.event.Event(pg.KEYDOWN, key=pg.K_2))
+    assert juego.slot_activo == 2
+
+def test_metadatos_de_todos_los_slots(juego):
+    juego._cargar_metadatos_todos_slots()
+    assert sorted(juego.metadatos_slots) == list(range(1, NUM_SLOTS + 1))
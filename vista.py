@@ -3,6 +3,8 @@ import os
 import math
 from typing import List, Dict, Any
 
+from efectos import PoolEfectos
+
 """
 CAPA DE VISTA (Pygame)
 Contiene toda la lógica de renderizado y efectos visuales
@@ -11,6 +13,13 @@ Contiene toda la lógica de renderizado y efectos visuales
 # Constantes de visualización
 CELL_SIZE = 20
 MARGIN_TOP = 40
+FONDO = (25, 25, 25)
+HUD_COLOR = (230, 230, 230)
+HUD_CONTROLES = "[J] Guardar | [R] Cargar | [H] Auto-save | [1-3] Sel. Slot | [ESC] Salir"
+# Si las zonas sucias cubren más de esta fracción de la ventana se repinta entera
+FRACCION_SUCIA_MAX = 0.5
+# Efectos simultáneos de cada tipo (golpe, comer, ataque de IA)
+CAPACIDAD_EFECTOS = 64
 
 class VistaEcosistema:
     def __init__(self, world_width: int, world_height: int):
@@ -28,15 +37,41 @@ class VistaEcosistema:
         # Cargar sprites
         self.sprites: Dict[str, pg.Surface] = {}
         self._load_sprites()
+        # Sprite, media anchura, media altura, anchura y altura por clave (evita get_rect por entidad)
+        self._medidas: Dict[str, tuple] = {}
+        for key, spr in self.sprites.items():
+            w, h = spr.get_size()
+            self._medidas[key] = (spr, w // 2, h // 2, w, h)
+        self._medidas_planta = {estado: self._medidas['Planta_' + estado]
+                                for estado in ('brote', 'adulta', 'marchita')}
+        # Enviar los sprites de cada zona en un solo Surface.blits()
+        self.dibujo_por_lotes = True
         
         # Efectos visuales
-        self.hit_effects: List[Dict[str, Any]] = []
-        self.eat_effects: List[Dict[str, Any]] = []
-        self.ai_attack_effects: List[Dict[str, Any]] = []
+        self.hit_effects = PoolEfectos(CAPACIDAD_EFECTOS)
+        self.eat_effects = PoolEfectos(CAPACIDAD_EFECTOS)
+        self.ai_attack_effects = PoolEfectos(CAPACIDAD_EFECTOS)
         
         # Mensajes en pantalla
         self.mensaje_temporal = None
         self.mensaje_carga_datos = None
+        # Línea de tiempos por fase (None = oculta)
+        self.texto_tiempos: str | None = None
+        # Últimos valores y superficie de cada segmento de texto (HUD y mensajes)
+        self._textos: Dict[str, tuple] = {}
+
+        # Renderizado por zonas sucias: clave -> (rect, firma) del frame anterior,
+        # zonas de los efectos ya dibujados y rects a volcar en presentar() (None = todo)
+        self._previos: Dict[Any, tuple] = {}
+        self._rects_efimeros: List[pg.Rect] = []
+        self._rects_pantalla: List[pg.Rect] | None = None
+        self._completo = True
+
+        # Capa de plantas sobre el fondo: se recompone solo cuando cambia
+        # Ecosistema.version_plantas (o el ecosistema, al cargar partida)
+        self._capa_plantas = pg.Surface((self.window_w, self.window_h)).convert()
+        self._capa_de: tuple | None = None  # (ecosistema, version_plantas) de la capa
+        self._plantas_previas: Dict[int, tuple] = {}
         
     def _safe_load(self, path: str, size: tuple[int, int] | None = None) -> pg.Surface | None:
         """Cargar una imagen de forma segura con fallback."""
@@ -85,60 +120,63 @@ class VistaEcosistema:
 
     def spawn_hit_effect(self, x: int, y: int, life: int = 10):
         """Crear efecto de golpe."""
-        self.hit_effects.append({'x': x, 'y': y, 'life': life})
-
-    def _render_hit_effects(self, surface):
-        """Renderizar efectos de golpe."""
-        remove = []
-        for e in self.hit_effects:
-            r = max(4, 16 - (10 - e['life']))
-            pg.draw.circle(surface, (255, 0, 0), (int(e['x']), int(e['y'])), r, 2)
-            pg.draw.circle(surface, (255, 255, 255), (int(e['x']), int(e['y'])), max(2, r//2), 1)
-            e['life'] -= 1
-            if e['life'] <= 0:
-                remove.append(e)
-        for e in remove:
-            self.hit_effects.remove(e)
+        self.hit_effects.crear(x, y, life)
+
+    def _render_hit_effects(self, surface, rects: List[pg.Rect] | None = None):
+        """Renderizar efectos de golpe (añade a 'rects' la zona que ocupan)."""
+        pool = self.hit_effects
+        # De atrás hacia delante: al retirar uno, el que ocupa su hueco ya se dibujó
+        for i in range(pool.n - 1, -1, -1):
+            cx, cy, life = pool.x[i], pool.y[i], pool.vida[i]
+            r = max(4, 16 - (10 - life))
+            zona = pg.draw.circle(surface, (255, 0, 0), (cx, cy), r, 2)
+            if rects is not None:
+                rects.append(zona)
+            pg.draw.circle(surface, (255, 255, 255), (cx, cy), max(2, r//2), 1)
+            pool.vida[i] = life - 1
+            if life <= 1:
+                pool.quitar(i)
 
     def spawn_eat_effect(self, x: int, y: int, life: int = 12):
         """Crear efecto de comer."""
-        self.eat_effects.append({'x': x, 'y': y, 'life': life})
-
-    def _render_eat_effects(self, surface):
-        """Renderizar efectos de comer."""
-        remove = []
-        for e in self.eat_effects:
-            phase = (12 - e['life'])
+        self.eat_effects.crear(x, y, life)
+
+    def _render_eat_effects(self, surface, rects: List[pg.Rect] | None = None):
+        """Renderizar efectos de comer (añade a 'rects' la zona que ocupan)."""
+        pool = self.eat_effects
+        for i in range(pool.n - 1, -1, -1):
+            life = pool.vida[i]
+            phase = (12 - life)
             r = 6 + (phase % 6)
-            pg.draw.circle(surface, (255, 165, 0), (int(e['x']), int(e['y'])), r, 2)
-            e['life'] -= 1
-            if e['life'] <= 0:
-                remove.append(e)
-        for e in remove:
-            self.eat_effects.remove(e)
+            zona = pg.draw.circle(surface, (255, 165, 0), (pool.x[i], pool.y[i]), r, 2)
+            if rects is not None:
+                rects.append(zona)
+            pool.vida[i] = life - 1
+            if life <= 1:
+                pool.quitar(i)
 
     def spawn_ai_attack_effect(self, x: int, y: int, life: int = 10, spokes: int = 8):
         """Crear efecto de ataque de IA."""
-        self.ai_attack_effects.append({'x': x, 'y': y, 'life': life, 'spokes': spokes})
-
-    def _render_ai_attack_effects(self, surface):
-        """Renderizar efectos de ataque de IA."""
-        remove = []
-        for e in self.ai_attack_effects:
-            phase = (10 - e['life'])
+        self.ai_attack_effects.crear(x, y, life, spokes)
+
+    def _render_ai_attack_effects(self, surface, rects: List[pg.Rect] | None = None):
+        """Renderizar efectos de ataque de IA (añade a 'rects' la zona que ocupan)."""
+        pool = self.ai_attack_effects
+        for i in range(pool.n - 1, -1, -1):
+            cx, cy, life, spokes = pool.x[i], pool.y[i], pool.vida[i], pool.extra[i]
+            phase = (10 - life)
             max_r = 18
             r = 6 + int((phase / 10) * max_r)
-            cx, cy = int(e['x']), int(e['y'])
-            for i in range(e['spokes']):
-                ang = (i / e['spokes']) * math.tau
+            for k in range(spokes):
+                ang = (k / spokes) * math.tau
                 x2 = cx + int(r * math.cos(ang))
                 y2 = cy + int(r * math.sin(ang))
                 pg.draw.line(surface, (255, 0, 0), (cx, cy), (x2, y2), 2)
-            e['life'] -= 1
-            if e['life'] <= 0:
-                remove.append(e)
-        for e in remove:
-            self.ai_attack_effects.remove(e)
+            if rects is not None:
+                rects.append(pg.Rect(cx - r - 2, cy - r - 2, 2*r + 5, 2*r + 5))
+            pool.vida[i] = life - 1
+            if life <= 1:
+                pool.quitar(i)
 
     def _draw_skull(self, surface, x, y):
         """Dibujar calavera simple."""
@@ -147,119 +185,231 @@ class VistaEcosistema:
         pg.draw.circle(surface, (0, 0, 0), (x+3, y-2), 2)
         pg.draw.rect(surface, (255, 255, 255), pg.Rect(x-5, y+3, 10, 3))
 
-    def render_corpses(self, surface, corpses: List[Dict[str, Any]]):
-        """Renderizar cadáveres."""
-        for c in corpses:
-            size = max(8, int(20 * (1.0 - 0.3*c['eaten'])))
-            cx, cy = int(c['x']), int(c['y'])
-            spr = self.sprites.get('Cadaver')
-            if spr is not None:
-                rect = spr.get_rect(center=(cx, cy))
-                surface.blit(spr, rect)
-            else:
-                rect = pg.Rect(cx-size, cy-size//2, size*2, int(size))
-                pg.draw.ellipse(surface, (120, 60, 40), rect)
-            bar_w, bar_h = 24, 4
-            bx = cx - bar_w//2
-            by = cy - size - 8
-            pg.draw.rect(surface, (160, 160, 160), pg.Rect(bx, by, bar_w, bar_h), border_radius=2)
-            pg.draw.rect(surface, (255, 0, 0), pg.Rect(bx, by, int(bar_w * c['eaten']), bar_h), border_radius=2)
-            if c['skull_timer'] > 0:
-                self._draw_skull(surface, cx, cy - size - 14)
-
-    def update_corpses(self, corpses: List[Dict[str, Any]]):
-        """Actualizar estado de los cadáveres."""
-        remove = []
+    def _dibujar_cadaver(self, surface, c):
+        """Dibujar un cadáver con su barra de comido y la calavera (los envejece el modelo)."""
+        size = max(8, int(20 * (1.0 - 0.3*c.eaten)))
+        cx, cy = int(c.x), int(c.y)
+        spr = self.sprites.get('Cadaver')
+        if spr is not None:
+            rect = spr.get_rect(center=(cx, cy))
+            surface.blit(spr, rect)
+        else:
+            rect = pg.Rect(cx-size, cy-size//2, size*2, int(size))
+            pg.draw.ellipse(surface, (120, 60, 40), rect)
+        bar_w, bar_h = 24, 4
+        bx = cx - bar_w//2
+        by = cy - size - 8
+        pg.draw.rect(surface, (160, 160, 160), pg.Rect(bx, by, bar_w, bar_h), border_radius=2)
+        pg.draw.rect(surface, (255, 0, 0), pg.Rect(bx, by, int(bar_w * c.eaten), bar_h), border_radius=2)
+        if c.skull_timer > 0:
+            self._draw_skull(surface, cx, cy - size - 14)
+
+    # Cada elemento de la escena es (clave, rect, firma, superficie, objeto):
+    # - clave identifica el elemento entre frames (id del objeto o nombre del texto)
+    # - si la firma cambia respecto al frame anterior, su rect viejo y el nuevo se redibujan
+    # - se dibuja con blit(superficie, rect) o, si superficie es None, con _dibujar_cadaver(objeto)
+
+    def _elementos_cadaveres(self, corpses: List, out: list):
+        _, mw, mh, w, h = self._medidas['Cadaver']
         for c in corpses:
-            c['age'] += 1
-            if c['skull_timer'] > 0:
-                c['skull_timer'] -= 1
-            if c['eaten'] >= 1.0 or c['age'] >= c['max_age']:
-                remove.append(c)
-        for c in remove:
-            corpses.remove(c)
-
-    def render_plants(self, surface, plantas: List):
-        """Renderizar plantas."""
+            size = max(8, int(20 * (1.0 - 0.3*c.eaten)))
+            cx, cy = int(c.x), int(c.y)
+            # Sprite + barra y calavera por encima
+            rect = pg.Rect(cx - mw, cy - mh, w, h).union(pg.Rect(cx - 13, cy - size - 23, 27, 24))
+            out.append((id(c), rect, (cx, cy, size, int(24 * c.eaten), c.skull_timer > 0), None, c))
+
+    def _elementos_plantas(self, plantas: List, out: list):
+        medidas = self._medidas_planta
+        Rect = pg.Rect
         for p in plantas:
             if p.vida <= 0:
                 continue
-            px, py = int(p.x), MARGIN_TOP + int(p.y)
-            key = 'Planta_' + p.estado
-            spr = self.sprites.get(key)
-            if spr is not None:
-                rect = spr.get_rect(center=(px, py))
-                surface.blit(spr, rect)
-            else:
-                if p.estado == 'brote':
-                    color = (90, 200, 90); r = max(3, CELL_SIZE // 3)
-                elif p.estado == 'adulta':
-                    color = (60, 160, 60); r = max(5, CELL_SIZE // 2)
-                else:
-                    color = (150, 120, 80); r = max(2, CELL_SIZE // 4)
-                pg.draw.circle(surface, color, (px, py), r)
-
-    def render_animales(self, surface, animales: List):
-        """Renderizar animales."""
+            spr, mw, mh, w, h = medidas[p.estado]
+            x = int(p.x) - mw
+            y = MARGIN_TOP + int(p.y) - mh
+            out.append((id(p), Rect(x, y, w, h), (spr, x, y), spr, None))
+
+    def _actualizar_capa_plantas(self, eco, sucios: List[pg.Rect]):
+        """Recomponer la capa de plantas si cambiaron y marcar sucias las que cambiaron."""
+        if self._capa_de is not None and self._capa_de[0] is eco and self._capa_de[1] == eco.version_plantas:
+            return
+        self._capa_de = (eco, eco.version_plantas)
+        elementos = []
+        self._elementos_plantas(eco.plantas, elementos)
+        capa = self._capa_plantas
+        capa.fill(FONDO)
+        self._dibujar_elementos(capa, elementos, range(len(elementos)))
+        self._plantas_previas = self._diferencias(self._plantas_previas, elementos, sucios)
+
+    @staticmethod
+    def _diferencias(previos: Dict[Any, tuple], elementos: list, sucios: List[pg.Rect]) -> Dict[Any, tuple]:
+        """Añadir a 'sucios' los rects de elementos nuevos, cambiados o desaparecidos
+        respecto a 'previos' (que se consume) y devolver el nuevo clave -> (rect, firma).
+        """
+        actuales = {}
+        for clave, rect, firma, _, _ in elementos:
+            actuales[clave] = (rect, firma)
+            previo = previos.pop(clave, None)
+            if previo is None:
+                sucios.append(rect)
+            elif previo[1] != firma:
+                sucios.append(previo[0])
+                sucios.append(rect)
+        sucios.extend(rect for rect, _ in previos.values())
+        return actuales
+
+    def _elementos_animales(self, animales: List, out: list):
+        medidas = self._medidas
+        Rect = pg.Rect
         for a in animales:
             if not a.esta_vivo():
                 continue
-            px = int(a.x); py = MARGIN_TOP + int(a.y)
-            key = type(a).__name__
-            spr = self.sprites.get(key)
-            if spr is not None:
-                rect = spr.get_rect(center=(px, py))
-                surface.blit(spr, rect)
-            else:
-                r = max(6, CELL_SIZE // 2)
-                if hasattr(a, '__class__') and a.__class__.__name__ == 'TRexJugador':
-                    pg.draw.circle(surface, (230, 70, 70), (px, py), r)
-                else:
-                    col = (120, 120, 200)
-                    if a.tipo == 'herbivoro': col = (60, 160, 60)
-                    elif a.tipo == 'carnivoro': col = (200, 80, 80)
-                    elif a.tipo == 'omnivoro': col = (200, 170, 90)
-                    pg.draw.circle(surface, col, (px, py), r)
+            spr, mw, mh, w, h = medidas[type(a).__name__]
+            x = int(a.x) - mw
+            y = MARGIN_TOP + int(a.y) - mh
+            out.append((id(a), Rect(x, y, w, h), (spr, x, y), spr, None))
+
+    def _texto(self, clave: str, plantilla: str, valores: tuple, color, fondo=None) -> pg.Surface:
+        """Superficie de plantilla.format(*valores); solo se vuelve a renderizar si cambian los valores."""
+        previo = self._textos.get(clave)
+        if previo is not None and previo[0] == valores:
+            return previo[1]
+        surf = self.font.render(plantilla.format(*valores), True, color, fondo)
+        self._textos[clave] = (valores, surf)
+        return surf
 
-    def render_hud(self, surface, eco, slot_activo, autosave_idx, autosave_intervalos):
-        """Renderizar HUD (interfaz de usuario)."""
-        plantas_vivas = len([p for p in eco.plantas if p.vida > 0])
-        animales_vivos = len([a for a in eco.animales if a.esta_vivo()])
-        intervalo_str = 'OFF' if autosave_intervalos[autosave_idx] == 0 else str(autosave_intervalos[autosave_idx])
-        
+    def _elementos_hud(self, eco, slot_activo, autosave_idx, autosave_intervalos, out: list):
+        """Elementos del HUD (interfaz de usuario), por segmentos.
+        Cada segmento tiene su superficie en caché; si uno cambia de ancho, los de su
+        derecha solo se mueven.
+        """
+        intervalo = autosave_intervalos[autosave_idx]
         # Línea 1: Estadísticas
-        hud_text1 = (
-            f"Ciclo: {eco.ciclo} | Animales: {animales_vivos}/{eco.max_animales} | Plantas: {plantas_vivas} | "
-            f"Slot: [{slot_activo}] | Autosave: {intervalo_str}"
+        segmentos = (
+            ('hud_ciclo', "Ciclo: {}", (eco.ciclo,)),
+            ('hud_animales', "Animales: {}/{}", (eco.total_vivos, eco.max_animales)),
+            ('hud_plantas', "Plantas: {}", (eco.plantas_vivas,)),
+            ('hud_slot', "Slot: [{}]", (slot_activo,)),
+            ('hud_autosave', "Autosave: {}", ('OFF' if intervalo == 0 else intervalo,)),
         )
-        # Línea 2: Controles
-        hud_text2 = "[J] Guardar | [R] Cargar | [H] Auto-save | [1-3] Sel. Slot | [ESC] Salir"
+        sep = self._texto('hud_sep', " | ", (), HUD_COLOR)
+        x = 8
+        for n, (clave, plantilla, valores) in enumerate(segmentos):
+            if n:
+                out.append((f'hud_sep{n}', sep.get_rect(topleft=(x, 5)), x, sep, None))
+                x += sep.get_width()
+            surf = self._texto(clave, plantilla, valores, HUD_COLOR)
+            out.append((clave, surf.get_rect(topleft=(x, 5)), (valores, x), surf, None))
+            x += surf.get_width()
+
+        # Línea 2: Controles (fija)
+        hud2 = self._texto('hud_controles', HUD_CONTROLES, (), HUD_COLOR)
+        out.append(('hud_controles', hud2.get_rect(topleft=(8, 22)), None, hud2, None))
+
+        # Línea opcional de tiempos por fase, al pie de la ventana
+        if self.texto_tiempos:
+            hud3 = self._texto('hud_tiempos', "{}", (self.texto_tiempos,), (255, 255, 120), (0, 0, 0))
+            rect = hud3.get_rect(topleft=(8, self.window_h - hud3.get_height() - 4))
+            out.append(('hud_tiempos', rect, self.texto_tiempos, hud3, None))
 
-        hud1 = self.font.render(hud_text1, True, (230, 230, 230))
-        hud2 = self.font.render(hud_text2, True, (230, 230, 230))
-        
-        surface.blit(hud1, (8, 5))
-        surface.blit(hud2, (8, 22))
+    def render_hud(self, surface, eco, slot_activo, autosave_idx, autosave_intervalos):
+        """Renderizar HUD (interfaz de usuario)."""
+        elementos = []
+        self._elementos_hud(eco, slot_activo, autosave_idx, autosave_intervalos, elementos)
+        self._dibujar_elementos(surface, elementos, range(len(elementos)))
+
+    def _dibujar_elementos(self, surface, elementos: list, indices):
+        """Dibujar en orden los elementos indicados. Los sprites seguidos se envían
+        juntos con Surface.blits() (uno a uno si dibujo_por_lotes es False).
+        """
+        if not self.dibujo_por_lotes:
+            for i in indices:
+                e = elementos[i]
+                if e[3] is not None:
+                    surface.blit(e[3], e[1])
+                else:
+                    self._dibujar_cadaver(surface, e[4])
+            return
+        lote = []
+        for i in indices:
+            e = elementos[i]
+            if e[3] is not None:
+                lote.append((e[3], e[1]))
+            else:
+                if lote:
+                    surface.blits(lote, doreturn=False)
+                    lote = []
+                self._dibujar_cadaver(surface, e[4])
+        if lote:
+            surface.blits(lote, doreturn=False)
+
+    @staticmethod
+    def _fusionar(rects: List[pg.Rect]) -> List[pg.Rect]:
+        """Unir los rectángulos que se solapan para no redibujar dos veces la misma zona."""
+        zonas: List[pg.Rect] = []
+        for r in rects:
+            i = r.collidelist(zonas)
+            while i >= 0:
+                r = r.union(zonas.pop(i))
+                i = r.collidelist(zonas)
+            zonas.append(r)
+        return zonas
 
     def render(self, ecosystem, slot_activo, autosave_idx, autosave_intervalos):
-        """Renderizar todo el ecosistema."""
-        # Limpiar pantalla con fondo oscuro
-        self.screen.fill((25, 25, 25))
-        
-        # Renderizar elementos
-        self.render_plants(self.screen, ecosystem.plantas)
-        self.render_animales(self.screen, ecosystem.animales)
-        self.render_corpses(self.screen, ecosystem.cadaveres)
-        self.render_hud(self.screen, ecosystem, slot_activo, autosave_idx, autosave_intervalos)
-        
-        # Renderizar mensajes
-        self._render_mensajes()
-        
-        # Renderizar efectos
-        self._render_hit_effects(self.screen)
-        self._render_eat_effects(self.screen)
-        self._render_ai_attack_effects(self.screen)
-        
+        """Renderizar el ecosistema redibujando solo las zonas que cambiaron.
+        Las zonas a volcar a la ventana quedan para presentar().
+        """
+        pantalla = self.screen
+        elementos = []
+        self._elementos_animales(ecosystem.animales, elementos)
+        self._elementos_cadaveres(ecosystem.cadaveres, elementos)
+        self._elementos_hud(ecosystem, slot_activo, autosave_idx, autosave_intervalos, elementos)
+        self._elementos_mensaje(elementos)
+
+        # Zonas sucias: elementos nuevos, movidos o desaparecidos, plantas que cambiaron
+        # y los efectos del frame anterior
+        sucios = self._rects_efimeros
+        self._actualizar_capa_plantas(ecosystem, sucios)
+        self._previos = self._diferencias(self._previos, elementos, sucios)
+
+        completo = self._completo or self.mensaje_carga_datos is not None
+        if not completo:
+            pantalla_rect = pantalla.get_rect()
+            zonas = [z for z in (z.clip(pantalla_rect) for z in self._fusionar(sucios)) if z]
+            completo = sum(z.w * z.h for z in zonas) > FRACCION_SUCIA_MAX * self.window_w * self.window_h
+        if completo:
+            zonas = [pantalla.get_rect()]
+
+        # Restaurar cada zona desde la capa de plantas y redibujar, en orden, lo que la toca
+        rects_elementos = [e[1] for e in elementos]
+        for zona in zonas:
+            pantalla.set_clip(zona)
+            pantalla.blit(self._capa_plantas, zona, zona)
+            self._dibujar_elementos(pantalla, elementos, zona.collidelistall(rects_elementos))
+        pantalla.set_clip(None)
+
+        # Confirmación de carga y efectos van encima; su zona se limpia en el frame siguiente
+        self._render_confirmacion_carga()
+        efimeros: List[pg.Rect] = []
+        self._render_hit_effects(pantalla, efimeros)
+        self._render_eat_effects(pantalla, efimeros)
+        self._render_ai_attack_effects(pantalla, efimeros)
+        self._rects_efimeros = efimeros
+
+        self._rects_pantalla = None if completo else zonas + efimeros
+        # Al quitar la confirmación de carga hay que repintar todo una vez más
+        self._completo = self.mensaje_carga_datos is not None
+
+    def presentar(self):
+        """Volcar a la ventana lo último renderizado: solo las zonas sucias o, si hizo falta, todo."""
+        if self._rects_pantalla is None:
+            pg.display.flip()
+        elif self._rects_pantalla:
+            pg.display.update(self._rects_pantalla)
+
+    def invalidar(self):
+        """Forzar que el próximo render redibuje y vuelque la pantalla completa."""
+        self._completo = True
 
     def update_effects(self):
         """Actualizar todos los efectos visuales."""
@@ -304,28 +454,28 @@ class VistaEcosistema:
         lines.append(current_line.strip())
         return lines
 
-    def _render_mensajes(self):
-        """Dibuja los mensajes temporales o de carga en la pantalla."""
-        ahora = pg.time.get_ticks()
+    def _elementos_mensaje(self, out: list):
+        """Líneas del mensaje temporal en el centro de la pantalla."""
+        if not self.mensaje_temporal:
+            return
+        if pg.time.get_ticks() > self.mensaje_temporal["expira"]:
+            self.mensaje_temporal = None
+            return
+        texto_original = self.mensaje_temporal["texto"]
+        lineas = self._wrap_text(texto_original, self.font, self.window_w - 100)
         
-        # Mensaje temporal
-        if self.mensaje_temporal:
-            if ahora > self.mensaje_temporal["expira"]:
-                self.mensaje_temporal = None
-            else:
-                texto_original = self.mensaje_temporal["texto"]
-                lineas = self._wrap_text(texto_original, self.font, self.window_w - 100)
-                
-                # Calcular altura total para centrar el bloque de texto
-                altura_total = len(lineas) * self.font.get_height()
-                y_inicial = (self.window_h - altura_total) // 2
-
-                for i, linea in enumerate(lineas):
-                    # Fondo del mensaje ligeramente más claro que el fondo del juego
-                    superficie_texto = self.font.render(linea, True, (255, 255, 255), (50, 50, 50, 220))
-                    rect = superficie_texto.get_rect(center=(self.window_w // 2, y_inicial + i * self.font.get_height()))
-                    self.screen.blit(superficie_texto, rect)
-
+        # Calcular altura total para centrar el bloque de texto
+        altura_total = len(lineas) * self.font.get_height()
+        y_inicial = (self.window_h - altura_total) // 2
+
+        for i, linea in enumerate(lineas):
+            # Fondo del mensaje ligeramente más claro que el fondo del juego
+            superficie_texto = self._texto(f"mensaje{i}", "{}", (linea,), (255, 255, 255), (50, 50, 50, 220))
+            rect = superficie_texto.get_rect(center=(self.window_w // 2, y_inicial + i * self.font.get_height()))
+            out.append((f"mensaje{i}", rect, linea, superficie_texto, None))
+
+    def _render_confirmacion_carga(self):
+        """Dibuja encima de todo la confirmación de carga, si la hay."""
         # Mensaje de confirmación de carga
         if self.mensaje_carga_datos:
             meta = self.mensaje_carga_datos
@@ -361,7 +511,9 @@ class VistaEcosistema:
 
     def render_menu_guardado(self, estado: str, slot_seleccionado: int, metadatos: dict):
         """Renderiza la pantalla de selección de slot para guardar o cargar."""
-        self.screen.fill((25, 25, 25))
+        self.screen.fill(FONDO)
+        # Al volver al juego hay que repintarlo entero
+        self._completo = True
 
         # Título
         titulo_str = "Guardar Partida" if estado == 'PANTALLA_GUARDAR' else "Cargar Partida"